@@ -0,0 +1,40 @@
+"""
+Compares a chain of geometric actions applied one after the other with the fused single-pass pipeline.
+
+    python benchmarks/bench_geometry.py
+"""
+import logging
+import time
+
+import numpy as np
+
+from pixelpioneers.actions.pipeline import Pipeline
+from pixelpioneers.actions.transformers import CropTransformer, ResizeTransformer, RotateTransformer
+
+
+def sequential(steps: list, image: np.ndarray) -> np.ndarray:
+    for step in steps:
+        image = step.apply(image)
+    return image
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    rng = np.random.default_rng(0)
+
+    print(f"{'megapixels':>10} {'sequential':>11} {'fused':>8} {'speedup':>8}")
+    for megapixels in (3, 12, 24):
+        side = int((megapixels * 1e6) ** 0.5)
+        image = rng.integers(0, 256, (side, side, 3), dtype=np.uint8)
+        steps = [CropTransformer(side // 10, side // 10, -side // 10, -side // 10), RotateTransformer(7),
+                 ResizeTransformer(1024, 1024)]
+        sequential_seconds = timed(sequential, steps, image)
+        fused_seconds = timed(Pipeline(steps).apply, image)
+        print(f"{megapixels:>10} {sequential_seconds:>10.3f}s {fused_seconds:>7.3f}s "
+              f"{sequential_seconds / fused_seconds:>7.1f}x")
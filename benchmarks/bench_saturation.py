@@ -0,0 +1,44 @@
+"""
+Compares the vectorized SaturationAdjustment with the per-pixel colorsys implementation it replaces.
+
+    python benchmarks/bench_saturation.py
+"""
+import colorsys
+import logging
+import time
+
+import numpy as np
+
+from pixelpioneers.actions.adjustments import SaturationAdjustment
+
+
+def colorsys_saturation(image: np.ndarray, factor: float) -> np.ndarray:
+    result = np.empty_like(image)
+    for index in np.ndindex(image.shape[:2]):
+        h, s, v = colorsys.rgb_to_hsv(*(image[index] / 255))
+        rgb = colorsys.hsv_to_rgb(h, min(max(s * factor, 0), 1), v)
+        result[index] = (np.array(rgb) * 255).astype(np.uint8)
+    return result
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    rng = np.random.default_rng(0)
+
+    reference_image = rng.integers(0, 256, (200, 200, 3), dtype=np.uint8)
+    reference_seconds = timed(colorsys_saturation, reference_image, 1.5) / reference_image[..., 0].size
+
+    adjustment = SaturationAdjustment(1.5)
+    print(f"{'megapixels':>10} {'colorsys (est.)':>16} {'vectorized':>11} {'speedup':>8}")
+    for megapixels in (0.3, 3, 12):
+        side = int((megapixels * 1e6) ** 0.5)
+        image = rng.integers(0, 256, (side, side, 3), dtype=np.uint8)
+        vectorized = timed(adjustment.apply, image)
+        colorsys_estimate = reference_seconds * side * side
+        print(f"{megapixels:>10} {colorsys_estimate:>15.2f}s {vectorized:>10.3f}s {colorsys_estimate / vectorized:>7.0f}x")
@@ -0,0 +1,52 @@
+"""
+Measures the start-up time of the command line, the cost paid by every short invocation.
+
+    python benchmarks/bench_startup.py [--target-ms 100]
+
+The time of a bare interpreter is subtracted, what is left is the cost of the package. Exits with status 1 when
+``pixelpioneers --help`` exceeds the target.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Run from a checkout without installing the package
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+
+COMMANDS = {
+    "python": ["-c", "pass"],
+    "import pixelpioneers.main": ["-c", "import pixelpioneers.main"],
+    "pixelpioneers --help": ["-m", "pixelpioneers.main", "--help"],
+}
+
+
+def timed_run(arguments: list) -> float:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SOURCE_DIR, os.environ.get("PYTHONPATH")])))
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + arguments, env=env, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--target-ms", type=float, default=100,
+                        help="Maximum start-up cost of 'pixelpioneers --help' on top of the interpreter")
+    args = parser.parse_args()
+
+    medians = {}
+    for name, arguments in COMMANDS.items():
+        timed_run(arguments)
+        medians[name] = statistics.median(timed_run(arguments) for _ in range(args.repeat)) * 1e3
+
+    interpreter_ms = medians["python"]
+    print(f"{'command':<28} {'median':>9} {'package':>9}")
+    for name, median in medians.items():
+        print(f"{name:<28} {median:>7.1f}ms {median - interpreter_ms:>7.1f}ms")
+
+    help_ms = medians["pixelpioneers --help"] - interpreter_ms
+    print(f"'pixelpioneers --help' costs {help_ms:.1f}ms on top of the interpreter, target {args.target_ms:.0f}ms")
+    sys.exit(0 if help_ms <= args.target_ms else 1)
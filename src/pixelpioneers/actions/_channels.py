@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def has_alpha(channels: int) -> bool:
+    """
+    Tells whether the last channel of an image is an alpha channel: gray and alpha (2) or RGBA (4) images.
+
+    :param channels: Number of channels of the image, 1 for HxW images.
+    """
+    return channels in (2, 4)
+
+
+def batch_channel_count(images: np.ndarray) -> int:
+    """
+    Number of channels of the images of an (N, H, W) or (N, H, W, C) batch.
+    """
+    return 1 if images.ndim == 3 else images.shape[-1]
+
+
+def map_color(function, image: np.ndarray, out: np.ndarray, dtype: np.dtype, channels: int) -> np.ndarray:
+    """
+    Applies a function to the color channels of an image, passing the alpha channel through untouched.
+
+    The function receives views of the color channels of the image and of the result, the alpha channel is
+    copied to the result as is, or left in place when the result is the image itself.
+
+    :param function: Called as ``function(color, color_out)``, writes the result of ``color`` to ``color_out``.
+    :param image: The image, or batch of images.
+    :param out: Optional buffer of the image shape for the result, may be ``image`` itself.
+    :param dtype: Data type of the result, used to allocate it when ``out`` is None.
+    :param channels: Number of channels of the image, see :func:`has_alpha`.
+    :return: The result, ``out`` if it was given.
+    """
+    if out is None:
+        out = np.empty(image.shape, dtype=dtype)
+    if not has_alpha(channels):
+        function(image, out)
+        return out
+    if not np.may_share_memory(out[..., -1], image[..., -1]):
+        np.copyto(out[..., -1], image[..., -1], casting="unsafe")
+    function(image[..., :-1], out[..., :-1])
+    return out
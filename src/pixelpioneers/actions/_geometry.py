@@ -0,0 +1,197 @@
+import numpy as np
+
+# Tolerance used to recognise integer coefficients after composing floating point matrices
+_EPSILON = 1e-6
+
+
+def compose_affine(actions: list, shape: tuple) -> tuple:
+    """
+    Fuses a run of geometric actions into a single affine transform.
+
+    Pixels cropped away by a step are kept out of the result as long as the steps before it only scale, flip
+    or turn the image by quarter turns: the crop then bounds a rectangle of the input. A crop following a
+    free rotation only bounds the output.
+
+    :param actions: Geometric actions, in the order they should be applied.
+    :param shape: Shape of the image the actions will be applied to.
+    :return: ``(matrix, shape, window)`` with the (3, 3) matrix mapping input pixel coordinates to output
+             coordinates, the shape of the output image and the ``(x0, y0, x1, y1)`` rectangle of input
+             pixels that may be sampled.
+    """
+    matrix = np.eye(3)
+    shape = tuple(shape)
+    window = [0, 0, shape[1], shape[0]]
+    for action in actions:
+        matrix = action.affine_matrix(shape) @ matrix
+        shape, _ = action.output_spec(shape, np.uint8)
+        if _is_axis_aligned(matrix):
+            bounds = _source_bounds(np.linalg.inv(matrix), shape)
+            window = [max(window[0], bounds[0]), max(window[1], bounds[1]),
+                      min(window[2], bounds[2]), min(window[3], bounds[3])]
+    return matrix, shape, tuple(window)
+
+
+def affine_runs(actions: list, shape: tuple) -> list:
+    """
+    Splits a run of geometric actions into the runs :func:`compose_affine` fuses without changing the result.
+
+    The canvas of a free rotation clips the rotated image, and that clipping is only kept when the later steps
+    of the run sample inside their own input, e.g. crops and resizes. A step sampling outside of it, such as a
+    second free rotation, starts a new run.
+
+    :param actions: Geometric actions, in the order they should be applied.
+    :param shape: Shape of the image the actions will be applied to.
+    :return: The runs of actions, in order.
+    """
+    runs = []
+    matrix = np.eye(3)
+    shape = tuple(shape)
+    for action in actions:
+        step = action.affine_matrix(shape)
+        output_shape, _ = action.output_spec(shape, np.uint8)
+        bounds = _source_bounds(np.linalg.inv(step), output_shape)
+        inside = bounds[0] >= 0 and bounds[1] >= 0 and bounds[2] <= shape[1] and bounds[3] <= shape[0]
+        if runs and (_is_axis_aligned(matrix) or inside):
+            runs[-1].append(action)
+            matrix = step @ matrix
+        else:
+            runs.append([action])
+            matrix = step
+        shape = output_shape
+    return runs
+
+
+def _is_axis_aligned(matrix: np.ndarray) -> bool:
+    # Scales, flips and quarter turns, the matrix maps rectangles of pixels to rectangles
+    return np.count_nonzero(np.abs(matrix[:2, :2]) > _EPSILON) == 2
+
+
+def _source_bounds(inverse: np.ndarray, shape: tuple) -> list:
+    # Input pixels whose centre falls inside the output image
+    height, width = shape[:2]
+    corners = inverse[:2] @ np.array([[-0.5, -0.5, width - 0.5, width - 0.5],
+                                      [-0.5, height - 0.5, -0.5, height - 0.5],
+                                      [1, 1, 1, 1]])
+    low = np.ceil(corners.min(axis=1) - _EPSILON).astype(int)
+    high = np.floor(corners.max(axis=1) + _EPSILON).astype(int) + 1
+    return [low[0], low[1], high[0], high[1]]
+
+
+def _is_integer(values: np.ndarray) -> bool:
+    return bool(np.all(np.abs(values - np.round(values)) < _EPSILON))
+
+
+def _shifted_view(image: np.ndarray, inverse: np.ndarray, shape: tuple):
+    # Output pixel (x', y') is input pixel inverse @ (x', y', 1), a view if that only flips and shifts
+    view = image
+    for axis, (step, start) in enumerate([(inverse[1, 1], inverse[1, 2]), (inverse[0, 0], inverse[0, 2])]):
+        if abs(step) != 1:
+            return None
+        start, count = int(start), shape[axis]
+        stop = start + int(step) * (count - 1)
+        if count == 0 or min(start, stop) < 0 or max(start, stop) >= image.shape[axis]:
+            return None
+        index = slice(start, stop + 1) if step == 1 else slice(start, stop - 1 if stop > 0 else None, -1)
+        view = view[(slice(None),) * axis + (index,)]
+    return view
+
+
+def _scaled_window(image: np.ndarray, inverse: np.ndarray, shape: tuple):
+    # Region of the input covered by an axis-aligned scaling, None if it does not fall on pixel edges
+    window = []
+    for axis, (scale, translation) in enumerate([(inverse[1, 1], inverse[1, 2]), (inverse[0, 0], inverse[0, 2])]):
+        edges = sorted([scale * -0.5 + translation + 0.5, scale * (shape[axis] - 0.5) + translation + 0.5])
+        if not _is_integer(np.array(edges)):
+            return None
+        start, stop = int(round(edges[0])), int(round(edges[1]))
+        if start < 0 or stop > image.shape[axis] or start >= stop:
+            return None
+        window.append(slice(start, stop) if scale > 0 else slice(stop - 1, start - 1 if start > 0 else None, -1))
+    return image[tuple(window)]
+
+
+def apply_affine(image: np.ndarray, matrix: np.ndarray, shape: tuple, window: tuple = None,
+                 out: np.ndarray = None) -> np.ndarray:
+    """
+    Applies an affine transform of pixel coordinates to an image in a single pass.
+
+    Flips, quarter turns and crops are returned as views of the input. Axis-aligned scaling of a region of
+    the input is resampled with area interpolation, like :class:`ResizeTransformer` does. Any other transform
+    is resampled once with bilinear interpolation, from the region of the input it actually covers.
+
+    :param image: HxW or HxWxC image.
+    :param matrix: (3, 3) matrix mapping input pixel coordinates to output coordinates.
+    :param shape: Shape of the output image.
+    :param window: Optional ``(x0, y0, x1, y1)`` rectangle of input pixels that may be sampled, the rest of
+                   the input is treated as outside the image.
+    :param out: Optional buffer of the output shape and the image type for the result.
+    :return: The transformed image.
+    """
+    # OpenCV is only imported once a transform is applied, it dominates the import time of the package
+    import cv2
+
+    shape = tuple(shape)
+    if window is not None:
+        x0, y0 = max(window[0], 0), max(window[1], 0)
+        image = image[y0:max(window[3], y0), x0:max(window[2], x0)]
+        matrix = matrix @ np.array([[1, 0, x0], [0, 1, y0], [0, 0, 1]])
+    inverse = np.linalg.inv(matrix)
+    height, width = shape[:2]
+
+    aligned = np.abs(inverse[:2, :2]) > _EPSILON
+    if _is_axis_aligned(inverse):
+        swapped, swapped_inverse = image, inverse
+        if not aligned[0, 0]:
+            # Quarter turns: output rows run along the input columns
+            swapped, swapped_inverse = image.swapaxes(0, 1), inverse[[1, 0, 2]]
+        if _is_integer(swapped_inverse[:2]):
+            view = _shifted_view(swapped, np.round(swapped_inverse), shape)
+            if view is not None:
+                return _store(view, out, shape)
+        window = _scaled_window(swapped, swapped_inverse, shape)
+        if window is not None:
+            return _store(cv2.resize(window, (width, height), dst=out, interpolation=cv2.INTER_AREA), out, shape)
+
+    if out is None:
+        out = np.empty(shape, dtype=image.dtype)
+    if out.size == 0:
+        return out
+    if image.size == 0:
+        out[...] = 0
+        return out
+
+    # Input pixels reachable from the output, with a margin for the interpolation
+    corners = inverse[:2] @ np.array([[-0.5, -0.5, width - 0.5, width - 0.5],
+                                      [-0.5, height - 0.5, -0.5, height - 0.5],
+                                      [1, 1, 1, 1]])
+    x0, y0 = np.maximum(np.floor(corners.min(axis=1)).astype(int) - 1, 0)
+    x1, y1 = np.minimum(np.ceil(corners.max(axis=1)).astype(int) + 2, image.shape[1::-1])
+    if x0 >= x1 or y0 >= y1:
+        out[...] = 0
+        return out
+    region = image[y0:y1, x0:x1]
+    matrix = matrix @ np.array([[1, 0, x0], [0, 1, y0], [0, 0, 1]])
+
+    # Large reductions are first shrunk with area interpolation, bilinear sampling alone would alias
+    scale = np.sqrt(abs(np.linalg.det(matrix[:2, :2])))
+    if scale < 0.5:
+        region_height, region_width = region.shape[:2]
+        reduced_size = (max(1, round(region_width * scale)), max(1, round(region_height * scale)))
+        region = cv2.resize(region, reduced_size, interpolation=cv2.INTER_AREA)
+        scale_x, scale_y = reduced_size[0] / region_width, reduced_size[1] / region_height
+        matrix = matrix @ np.linalg.inv(np.array([[scale_x, 0, (scale_x - 1) / 2],
+                                                  [0, scale_y, (scale_y - 1) / 2],
+                                                  [0, 0, 1]]))
+
+    result = cv2.warpAffine(region, matrix[:2], (width, height), dst=out)
+    return _store(result, out, shape)
+
+
+def _store(result: np.ndarray, out: np.ndarray, shape: tuple) -> np.ndarray:
+    # OpenCV returns HxW images for HxWx1 ones, the channel axis is restored to match the output shape
+    if out is None:
+        return result.reshape(shape)
+    if result is out:
+        return result
+    np.copyto(out, result.reshape(out.shape))
+    return out
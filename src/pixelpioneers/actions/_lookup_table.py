@@ -0,0 +1,202 @@
+import numpy as np
+
+from pixelpioneers.actions._channels import has_alpha
+from pixelpioneers.actions.abstract_image_action import AbstractImageAction
+
+# Largest number of values mapped by a single call to OpenCV
+_MAX_LUT_ELEMENTS = 2 ** 30
+
+
+def channel_count(image: np.ndarray) -> int:
+    """
+    Number of channels of an HxW or HxWxC image.
+    """
+    return 1 if image.ndim == 2 else image.shape[-1]
+
+
+def keep_alpha(table: np.ndarray, channels: int) -> np.ndarray:
+    """
+    Makes a lookup table leave the alpha channel of an image untouched, if it has one.
+
+    :param table: (256,) table shared by all channels or (channels, 256) per-channel table, (N, channels, 256)
+                  tables of a batch are also accepted.
+    :param channels: Number of channels of the image, see :func:`has_alpha`.
+    :return: The table, with an identity table for the alpha channel.
+    """
+    if not has_alpha(channels):
+        return table
+    table = np.array(np.broadcast_to(table, np.shape(table)[:-2] + (channels, 256)), dtype=np.uint8)
+    table[..., -1, :] = np.arange(256, dtype=np.uint8)
+    return table
+
+
+def image_histogram(image: np.ndarray) -> np.ndarray:
+    """
+    Computes the per-channel histogram of a uint8 image.
+
+    :param image: HxW or HxWxC uint8 image.
+    :return: (channels, 256) array of value counts.
+    """
+    # OpenCV is only imported once a table is used, it dominates the import time of the package
+    import cv2
+
+    histogram = np.empty((channel_count(image), 256), dtype=np.float64)
+    for c in range(histogram.shape[0]):
+        histogram[c] = cv2.calcHist([image], [c], None, [256], [0, 256]).ravel()
+    return histogram
+
+
+def histogram_mean(histogram: np.ndarray) -> np.ndarray:
+    """
+    Computes the per-channel mean value from a histogram.
+
+    :param histogram: (channels, 256) array of value counts.
+    :return: (channels,) array of mean values.
+    """
+    return histogram @ np.arange(256) / histogram.sum(axis=1)
+
+
+def compile_lookup_table(actions: list, image: np.ndarray) -> np.ndarray:
+    """
+    Fuses a run of pointwise actions into a single lookup table.
+
+    The histogram of the image is only computed when one of the actions depends on image statistics, the
+    histograms of the intermediate images are then derived from it without touching the pixels again.
+
+    :param actions: Pointwise actions, in the order they should be applied.
+    :param image: The uint8 image the actions will be applied to.
+    :return: (channels, 256) uint8 table equivalent to applying all the actions in order, the alpha channel is
+             left untouched.
+    """
+    channels = channel_count(image)
+    histogram = None
+    if any(action.needs_histogram for action in actions):
+        histogram = image_histogram(image)
+
+    table = np.tile(np.arange(256, dtype=np.uint8), (channels, 1))
+    for action in actions:
+        step_table = np.broadcast_to(action.lookup_table(histogram), (channels, 256))
+        if histogram is not None:
+            histogram = np.stack([np.bincount(step_table[c], weights=histogram[c], minlength=256)
+                                  for c in range(channels)])
+        table = np.take_along_axis(step_table, table.astype(np.intp), axis=1)
+    return keep_alpha(table, channels)
+
+
+def apply_lookup_table(image: np.ndarray, table: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Maps every value of a uint8 image through a lookup table in a single pass.
+
+    :param image: HxW or HxWxC uint8 image.
+    :param table: (256,) table shared by all channels or (channels, 256) per-channel table.
+    :param out: Optional uint8 buffer of the image shape for the result, may be ``image`` itself.
+    :return: The mapped uint8 image.
+    """
+    import cv2
+
+    table = np.asarray(table, dtype=np.uint8).reshape(-1, 256)
+    if table.shape[0] > 1 and (table == table[0]).all():
+        table = table[:1]
+
+    if image.ndim > 3:
+        if table.shape[0] == 1:
+            return np.take(table[0], image, out=out)
+        result = table[np.arange(table.shape[0]), image]
+    elif table.shape[0] == 1:
+        result = cv2.LUT(image, table[0], dst=out)
+    else:
+        result = cv2.LUT(image, np.ascontiguousarray(table.T).reshape(1, 256, table.shape[0]), dst=out)
+
+    if out is None:
+        return result.reshape(image.shape)
+    if result is not out:
+        np.copyto(out, result.reshape(out.shape))
+    return out
+
+
+def apply_lookup_table_batch(images: np.ndarray, table: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Maps every value of a batch of uint8 images through a lookup table in a single pass.
+
+    The images are stacked into one tall image, so the whole batch is mapped by a single call unless it is very
+    large.
+
+    :param images: (N, H, W) or (N, H, W, C) uint8 batch.
+    :param table: (256,) table shared by all channels or (channels, 256) per-channel table.
+    :param out: Optional uint8 buffer of the batch shape for the result, may be ``images`` itself.
+    :return: The mapped uint8 batch.
+    """
+    if out is None:
+        out = np.empty(images.shape, dtype=np.uint8)
+    # OpenCV indexes matrices with 32 bit integers, larger batches are mapped a group of images at a time
+    group = max(1, _MAX_LUT_ELEMENTS // max(1, images[0].size))
+    for start in range(0, len(images), group):
+        frames, frames_out = images[start:start + group], out[start:start + group]
+        stacked = frames.reshape((-1,) + frames.shape[2:])
+        if frames_out.flags.c_contiguous:
+            apply_lookup_table(stacked, table, out=frames_out.reshape(stacked.shape))
+        else:
+            np.copyto(frames_out, apply_lookup_table(stacked, table).reshape(frames_out.shape))
+    return out
+
+
+def apply_lookup_tables(images: np.ndarray, tables: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Maps every image of a uint8 batch through its own lookup table.
+
+    :param images: (N, H, W) or (N, H, W, C) uint8 batch.
+    :param tables: (N, channels, 256) uint8 tables, one per image.
+    :param out: Optional uint8 buffer of the batch shape for the result, may be ``images`` itself.
+    :return: The mapped uint8 batch.
+    """
+    if out is None:
+        out = np.empty(images.shape, dtype=np.uint8)
+    # A table lookup per image is much faster than indexing the whole batch with per-image tables in NumPy
+    for image, table, image_out in zip(images, tables, out):
+        apply_lookup_table(image, table, out=image_out)
+    return out
+
+
+def batch_histograms(images: np.ndarray) -> np.ndarray:
+    """
+    Computes the per-channel histogram of every image of a uint8 batch.
+
+    :param images: (N, H, W) or (N, H, W, C) uint8 batch.
+    :return: (N, channels, 256) array of value counts.
+    """
+    return np.stack([image_histogram(image) for image in images])
+
+
+class LookupTableAction(AbstractImageAction):
+    """
+    Pointwise action defined by a fixed lookup table on uint8 values.
+
+    Used to freeze actions whose table depends on image statistics, such as the contrast adjustment, once the
+    statistics are known.
+
+    :param table: (256,) or (channels, 256) uint8 table.
+    """
+    name = "LookupTableAction"
+    pointwise = True
+    supports_inplace = True
+    tileable = True
+
+    def __init__(self, table: np.ndarray):
+        self.table = np.asarray(table, dtype=np.uint8)
+        super(LookupTableAction, self).__init__()
+
+    def apply(self, image: np.ndarray, *args, out: np.ndarray = None, **kwargs) -> np.ndarray:
+        assert image.dtype == np.uint8, f"Expected a uint8 image, Instead got {image.dtype}"
+        self._check_output(image, out)
+        return apply_lookup_table(image, self.table, out=out)
+
+    def apply_batch(self, images: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        assert images.dtype == np.uint8, f"Expected a uint8 batch, Instead got {images.dtype}"
+        self._check_batch(images, out)
+        return apply_lookup_table_batch(images, self.table, out=out)
+
+    def tile_supported(self, shape: tuple, dtype: np.dtype) -> bool:
+        return np.dtype(dtype) == np.uint8
+
+    def lookup_table(self, histogram: np.ndarray = None) -> np.ndarray:
+        return self.table
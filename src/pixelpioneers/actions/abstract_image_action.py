@@ -2,12 +2,172 @@ from abc import ABC
 
 import numpy as np
 
+from pixelpioneers.exceptions import ActionError
+
 
 class AbstractImageAction(ABC):
     name = "AbstractImageAction"
 
+    # Pointwise actions map every uint8 value independently and can describe themselves as a lookup table
+    pointwise = False
+    # Whether lookup_table() depends on the histogram of the image the action is applied to
+    needs_histogram = False
+    # Whether apply(image, out=image) is safe, i.e. the action can overwrite its input
+    supports_inplace = False
+    # Whether the result is a new array, actions returning views of their input need no output buffer
+    needs_output_buffer = True
+    # Whether the action can be applied strip by strip through source_rows() and apply_rows()
+    tileable = False
+    # Geometric actions only move pixels and can describe themselves as an affine transform
+    geometric = False
+
     def __init__(self):
         pass
 
-    def apply(self, image: np.ndarray, *args, **kwargs) -> np.ndarray:
+    def apply(self, image: np.ndarray, *args, out: np.ndarray = None, **kwargs) -> np.ndarray:
         pass
+
+    def apply_batch(self, images: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Applies the action to every image of a batch of same-size images stacked along the first axis.
+
+        This default implementation applies :meth:`apply` frame by frame into a stacked result, actions override
+        it to process the whole batch at once.
+
+        :param images: (N, H, W) or (N, H, W, C) array of N images.
+        :param out: Optional buffer for the results, of the shape and type given by :meth:`batch_output_spec`.
+        :return: (N, ...) array of the N results.
+        :raises ActionError: If the batch or the output buffer is invalid, or the action fails on one of the images.
+        """
+        try:
+            self._check_batch(images, out)
+        except AssertionError as ae:
+            raise ActionError(f"Error applying action to batch: {ae}")
+        if out is None:
+            out = np.empty(*self.batch_output_spec(images.shape, images.dtype))
+        for image, image_out in zip(images, out):
+            self.apply(image, out=image_out)
+        return out
+
+    def output_spec(self, shape: tuple, dtype: np.dtype) -> tuple:
+        """
+        Describes the result of the action for an input of the given shape and type.
+
+        :param shape: Shape of the input image.
+        :param dtype: Data type of the input image.
+        :return: ``(shape, dtype)`` of the result, used to allocate an ``out`` buffer for :meth:`apply`.
+        """
+        return tuple(shape), np.dtype(dtype)
+
+    def batch_output_spec(self, shape: tuple, dtype: np.dtype) -> tuple:
+        """
+        Describes the result of :meth:`apply_batch` for a batch of the given shape and type.
+
+        :param shape: Shape of the batch, the number of images followed by the shape of an image.
+        :param dtype: Data type of the batch.
+        :return: ``(shape, dtype)`` of the stacked results, used to allocate an ``out`` buffer.
+        """
+        image_shape, dtype = self.output_spec(tuple(shape[1:]), dtype)
+        return (shape[0],) + image_shape, dtype
+
+    def size_hint(self):
+        """
+        Gives the smallest input size the action needs, so that the image can be decoded at a reduced size.
+
+        :return: ``(width, height)`` if a reduced input gives the same result up to resampling, None if the
+                 action needs the image at full resolution.
+        """
+        return None
+
+    def tile_supported(self, shape: tuple, dtype: np.dtype) -> bool:
+        """
+        Tells whether the action can be applied strip by strip to an input of the given shape and type.
+
+        :param shape: Shape of the input image.
+        :param dtype: Data type of the input image.
+        :return: True if :meth:`source_rows` and :meth:`apply_rows` can be used.
+        """
+        return self.tileable
+
+    def source_rows(self, start: int, stop: int, shape: tuple) -> tuple:
+        """
+        Gives the input rows needed to compute a strip of output rows.
+
+        :param start: First output row of the strip.
+        :param stop: End (exclusive) of the output rows of the strip.
+        :param shape: Shape of the complete input image.
+        :return: ``(start, stop)`` of the input rows.
+        """
+        return start, stop
+
+    def apply_rows(self, rows: np.ndarray, start: int, stop: int, shape: tuple) -> np.ndarray:
+        """
+        Computes a strip of output rows.
+
+        :param rows: The input rows given by :meth:`source_rows` for the strip.
+        :param start: First output row of the strip.
+        :param stop: End (exclusive) of the output rows of the strip.
+        :param shape: Shape of the complete input image.
+        :return: The output rows ``start`` to ``stop``.
+        """
+        return self.apply(rows)
+
+    def lookup_table(self, histogram: np.ndarray = None) -> np.ndarray:
+        """
+        Describes a pointwise action as a lookup table on uint8 values.
+
+        :param histogram: (channels, 256) value counts of the image the action is applied to, only provided
+                          when ``needs_histogram`` is set.
+        :return: (256,) table shared by all channels or (channels, 256) per-channel uint8 table.
+        :raises NotImplementedError: If the action is not pointwise.
+        """
+        raise NotImplementedError(f"{type(self).__name__} is not a pointwise action")
+
+    def affine_matrix(self, shape: tuple) -> np.ndarray:
+        """
+        Describes a geometric action as an affine transform of pixel coordinates.
+
+        :param shape: Shape of the input image.
+        :return: (3, 3) matrix mapping the ``(x, y, 1)`` coordinates of input pixel centres to output
+                 coordinates, the output shape is given by :meth:`output_spec`.
+        :raises NotImplementedError: If the action is not geometric.
+        """
+        raise NotImplementedError(f"{type(self).__name__} is not a geometric action")
+
+    def _check_output(self, image: np.ndarray, out: np.ndarray) -> None:
+        # Validates a caller-supplied output buffer, raises AssertionError like the other input checks
+        if out is None:
+            return
+        shape, dtype = self.output_spec(image.shape, image.dtype)
+        assert out.shape == shape and out.dtype == dtype, \
+            f"Expected an output buffer of shape {shape} and type {dtype}, Instead got {out.shape} and {out.dtype}"
+        assert out.flags.writeable, "Output buffer is read-only"
+        assert self.supports_inplace or not np.may_share_memory(out, image), \
+            f"{type(self).__name__} cannot be applied in place"
+
+    def _check_batch(self, images: np.ndarray, out: np.ndarray) -> None:
+        # Validates a batch and its output buffer, raises AssertionError like the other input checks
+        assert images is not None, "Function parameter images: cannot be None"
+        assert images.ndim in (3, 4), \
+            f"Expected a (N, H, W) or (N, H, W, C) batch, Instead got a batch with {images.ndim} dimensions"
+        if out is None:
+            return
+        shape, dtype = self.batch_output_spec(images.shape, images.dtype)
+        assert out.shape == shape and out.dtype == dtype, \
+            f"Expected an output buffer of shape {shape} and type {dtype}, Instead got {out.shape} and {out.dtype}"
+        assert out.flags.writeable, "Output buffer is read-only"
+        assert self.supports_inplace or not np.may_share_memory(out, images), \
+            f"{type(self).__name__} cannot be applied in place"
+
+    @staticmethod
+    def _store_output(result: np.ndarray, out: np.ndarray) -> np.ndarray:
+        # Returns out holding the result, OpenCV and NumPy usually wrote into it already
+        if out is None or result is out or np.may_share_memory(result, out):
+            return result if out is None else out
+        np.copyto(out, result.reshape(out.shape), casting="unsafe")
+        return out
+
+    @staticmethod
+    def _keep_channel_axis(result: np.ndarray, image: np.ndarray) -> np.ndarray:
+        # OpenCV returns HxW images for HxWx1 ones, the channel axis is restored to match output_spec
+        return result.reshape(result.shape[:2] + image.shape[2:])
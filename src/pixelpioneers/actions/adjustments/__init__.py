@@ -1,9 +1,14 @@
-from ._brightness_adjustment import BrightnessAdjustment
-from ._contrast_adjustment import ContrastAdjustment
-from ._saturation_adjustment import SaturationAdjustment
+from pixelpioneers.registry import lazy_module_getattr
 
 __all__ = [
     "ContrastAdjustment",
     "BrightnessAdjustment",
     "SaturationAdjustment"
 ]
+
+# The adjustments are imported on first access, only the ones used pay for their dependencies
+__getattr__ = lazy_module_getattr(__name__, {
+    "BrightnessAdjustment": "._brightness_adjustment",
+    "ContrastAdjustment": "._contrast_adjustment",
+    "SaturationAdjustment": "._saturation_adjustment",
+})
@@ -2,11 +2,13 @@ import logging
 
 import numpy as np
 
+from pixelpioneers.actions._channels import batch_channel_count, map_color
+from pixelpioneers.actions._lookup_table import apply_lookup_table, apply_lookup_table_batch, channel_count, keep_alpha
 from pixelpioneers.actions.adjustments._abstract_image_adjustment import AbstractImageAdjustment
 from pixelpioneers.exceptions import ImageAdjustmentError
+from pixelpioneers.precision import WORKING_DTYPE, max_value, result_dtype
 
-# Set up logging configuration
-logging.basicConfig(level=logging.INFO)
+# Set up logging
 logger = logging.getLogger(__name__)
 
 
@@ -22,6 +24,9 @@ class BrightnessAdjustment(AbstractImageAdjustment):
     :type value: int
     """
     name = "BrightnessAdjustment"
+    pointwise = True
+    supports_inplace = True
+    tileable = True
 
     def __init__(self, value: int):
         """
@@ -37,12 +42,15 @@ class BrightnessAdjustment(AbstractImageAdjustment):
         self.value = value
         super(BrightnessAdjustment, self).__init__()
 
-    def apply(self, image: np.ndarray) -> np.ndarray:
+    def apply(self, image: np.ndarray, out: np.ndarray = None) -> np.ndarray:
         """
         Applies the brightness adjustment to the given image.
 
         :param image: The input image to apply the brightness adjustment to.
         :type image: np.ndarray
+        :param out: Optional buffer for the result, of the type given by :meth:`output_spec`, may be the input
+                    image itself.
+        :type out: np.ndarray
         :return: The adjusted image with the brightness adjustment applied.
         :rtype: np.ndarray
         :raises ImageTransformationError: If the input image is None or if any error occurs during
@@ -50,19 +58,17 @@ class BrightnessAdjustment(AbstractImageAdjustment):
         """
         try:
             assert image is not None, "Function parameter image: cannot be None"
+            self._check_output(image, out)
             logger.info("Applying brightness adjustment to the image.")
 
-            # Convert image to float to avoid overflow
-            img_float = image.astype(np.float32)
-
-            # Apply brightness adjustment
-            img_float += self.value
+            channels = channel_count(image)
             logger.info(f"Brightness adjustment value: {self.value}")
+            if image.dtype == np.uint8:
+                # Single byte-indexed pass, no float intermediates
+                return apply_lookup_table(image, keep_alpha(self.lookup_table(), channels), out=out)
 
-            # Clip the values to [0, 255] and convert back to uint8
-            img_adjusted = np.clip(img_float, 0, 255).astype(np.uint8)
+            img_adjusted = self._adjust(image, out, channels)
             logger.info("Brightness adjustment applied successfully.")
-
             return img_adjusted
 
         except AssertionError as ae:
@@ -71,7 +77,78 @@ class BrightnessAdjustment(AbstractImageAdjustment):
 
         except Exception as e:
             logger.error("Error transforming Image: Unknown Error")
-            raise ImageAdjustmentError(f"Error adjusting Image: {ae}")
+            raise ImageAdjustmentError(f"Error adjusting Image: Unknown Error")
 
         except Exception as e:
             raise ImageAdjustmentError(f"Error adjusting Image: Unknown Error")
+
+    def apply_batch(self, images: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Adjusts the brightness of a batch of images at once.
+
+        :param images: (N, H, W) or (N, H, W, C) batch of images.
+        :type images: np.ndarray
+        :param out: Optional buffer of the batch shape for the result, may be the batch itself.
+        :type out: np.ndarray
+        :return: The adjusted batch.
+        :rtype: np.ndarray
+        :raises ImageAdjustmentError: If the batch is invalid or an unknown error occurs during the adjustment.
+        """
+        try:
+            self._check_batch(images, out)
+            channels = batch_channel_count(images)
+            if images.dtype == np.uint8:
+                # The whole batch is mapped through the table in a single pass
+                return apply_lookup_table_batch(images, keep_alpha(self.lookup_table(), channels), out=out)
+            # The arithmetic path is elementwise and works on any shape
+            return self._adjust(images, out, channels)
+        except AssertionError as ae:
+            logger.error(f"Error adjusting batch: {ae}")
+            raise ImageAdjustmentError(f"Error adjusting Image: {ae}")
+        except Exception:
+            logger.exception("Error adjusting batch: Unknown Error")
+            raise ImageAdjustmentError("Error adjusting Image: Unknown Error")
+
+    def _adjust(self, image: np.ndarray, out: np.ndarray, channels: int) -> np.ndarray:
+        # Arithmetic path of the types other than uint8, the offset is scaled to their value range
+        peak = max_value(image.dtype)
+        offset = np.float32(self.value * peak / 255)
+
+        def adjust(color, color_out):
+            if color.dtype == WORKING_DTYPE:
+                # Working precision values in [0, 1] stay float32, nothing is rounded
+                np.add(color, offset, out=color_out)
+                np.clip(color_out, 0, peak, out=color_out)
+                return
+
+            # Convert image to float to avoid overflow
+            img_float = color.astype(np.float32)
+            img_float += offset
+
+            # Clip the values to the value range and convert back
+            np.clip(img_float, 0, peak, out=img_float)
+            np.copyto(color_out, img_float, casting="unsafe")
+
+        return map_color(adjust, image, out, result_dtype(image.dtype), channels)
+
+    def lookup_table(self, histogram: np.ndarray = None) -> np.ndarray:
+        """
+        Returns the brightness adjustment as a lookup table on uint8 values.
+
+        :param histogram: Unused, the table does not depend on the image.
+        :type histogram: np.ndarray
+        :return: The (256,) uint8 lookup table.
+        :rtype: np.ndarray
+        """
+        return np.clip(np.arange(256, dtype=np.float32) + self.value, 0, 255).astype(np.uint8)
+
+    def output_spec(self, shape: tuple, dtype: np.dtype) -> tuple:
+        """
+        Describes the result of the adjustment, an image of the input shape and type for uint8, uint16 and working
+        precision images, a uint8 one for the others.
+
+        :param shape: Shape of the input image.
+        :param dtype: Data type of the input image.
+        :return: ``(shape, dtype)`` of the result.
+        """
+        return tuple(shape), result_dtype(dtype)
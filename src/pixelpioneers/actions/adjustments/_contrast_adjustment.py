@@ -1,7 +1,11 @@
 import numpy as np
 
+from pixelpioneers.actions._channels import batch_channel_count, map_color
+from pixelpioneers.actions._lookup_table import (apply_lookup_table, apply_lookup_tables, batch_histograms,
+                                                 channel_count, histogram_mean, keep_alpha)
 from pixelpioneers.actions.adjustments._abstract_image_adjustment import AbstractImageAdjustment
 from pixelpioneers.exceptions import ImageAdjustmentError
+from pixelpioneers.precision import WORKING_DTYPE, max_value, result_dtype
 
 
 class ContrastAdjustment(AbstractImageAdjustment):
@@ -9,6 +13,7 @@ class ContrastAdjustment(AbstractImageAdjustment):
     Adjusts the contrast of an image based on a given factor.
 
     This class inherits from `AbstractImageAdjustment` and provides the functionality to adjust the contrast of an image.
+    The alpha channel of gray and alpha or RGBA images is left untouched.
 
     Args:
         factor (float): The factor by which to adjust the contrast of the image.
@@ -20,6 +25,9 @@ class ContrastAdjustment(AbstractImageAdjustment):
         ImageAdjustmentError: If the image is None, has an incorrect number of dimensions, or an unknown error occurs during transformation.
     """
     name = "ContrastAdjustment"
+    pointwise = True
+    needs_histogram = True
+    supports_inplace = True
 
     def __init__(self, factor: float):
         """
@@ -31,13 +39,15 @@ class ContrastAdjustment(AbstractImageAdjustment):
         self.factor = factor
         super(ContrastAdjustment, self).__init__()
 
-    def apply(self, image: np.ndarray, *args, **kwargs) -> np.ndarray:
+    def apply(self, image: np.ndarray, *args, out: np.ndarray = None, **kwargs) -> np.ndarray:
         """
         Applies the contrast adjustment to the given image.
 
         Args:
             image (np.ndarray): The image to which the contrast adjustment should be applied.
             *args: Additional positional arguments.
+            out (np.ndarray): Optional buffer for the result, of the type given by :meth:`output_spec`, may be the
+                input image itself.
             **kwargs: Additional keyword arguments.
 
         Returns:
@@ -49,19 +59,107 @@ class ContrastAdjustment(AbstractImageAdjustment):
         try:
 
             assert image is not None, "Function parameter image: cannot be None"
-            assert image.ndim == 3, f"Expected a 3 dimensional image, Instead got a image with {image.ndim} dimensions"
-            assert image.shape[-1] == 3, f"Expected a 3, Instead got a image with {image.shape[-1]} dimensions "
-            # Calculate the mean color value for each channel
-            mean = np.mean(image, axis=(0, 1), keepdims=True)
+            assert image.ndim in (2, 3), f"Expected a 2 or 3 dimensional image, Instead got a image with {image.ndim} dimensions"
+            assert image.ndim == 2 or image.shape[-1] <= 4, \
+                f"Expected 1 to 4 channels, Instead got a image with {image.shape[-1]} channels "
+            self._check_output(image, out)
+            channels = channel_count(image)
 
-            # Adjust the contrast
-            adjusted_image = mean + (image - mean) * self.factor
-            adjusted_image = np.clip(adjusted_image, 0, 255).astype(np.uint8)
+            if image.dtype == np.uint8:
+                # Calculate the mean color value for each channel
+                mean = np.mean(image, axis=(0, 1), keepdims=True)
+                # Single byte-indexed pass, no float intermediates
+                table = keep_alpha(self._table_for_mean(mean.reshape(-1, 1)), channels)
+                return apply_lookup_table(image, table, out=out)
 
-            return adjusted_image
+            return self._adjust(image, (0, 1), out, channels)
 
         except AssertionError as ae:
             raise ImageAdjustmentError(f"Error transforming Image: {ae}")
 
         except Exception as e:
             raise ImageAdjustmentError(f"Error transforming Image: Unknown Error")
+
+    def apply_batch(self, images: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Applies the contrast adjustment to a batch of images at once, around the channel means of each image.
+
+        Args:
+            images (np.ndarray): (N, H, W) or (N, H, W, C) batch of images.
+            out (np.ndarray): Optional buffer of the batch shape for the result, may be the batch itself.
+
+        Returns:
+            np.ndarray: The adjusted batch.
+
+        Raises:
+            ImageAdjustmentError: If the batch is invalid or an unknown error occurs during transformation.
+        """
+        try:
+            self._check_batch(images, out)
+            assert images.ndim == 3 or images.shape[-1] <= 4, \
+                f"Expected 1 to 4 channels, Instead got a image with {images.shape[-1]} channels "
+            channels = batch_channel_count(images)
+            if images.dtype == np.uint8:
+                # The channel means of each image come from its histogram, which is much cheaper than np.mean
+                # on uint8 data and gives the same values
+                tables = np.stack([self.lookup_table(histogram) for histogram in batch_histograms(images)])
+                return apply_lookup_tables(images, keep_alpha(tables, channels), out=out)
+            # Around the mean color value for each channel of each image
+            return self._adjust(images, (1, 2), out, channels)
+        except AssertionError as ae:
+            raise ImageAdjustmentError(f"Error transforming Image: {ae}")
+        except Exception as e:
+            raise ImageAdjustmentError(f"Error transforming Image: Unknown Error")
+
+    def lookup_table(self, histogram: np.ndarray = None) -> np.ndarray:
+        """
+        Returns the contrast adjustment as a per-channel lookup table on uint8 values.
+
+        Args:
+            histogram (np.ndarray): (channels, 256) value counts of the image, used for the channel means.
+
+        Returns:
+            np.ndarray: The (channels, 256) uint8 lookup table.
+        """
+        return self._table_for_mean(histogram_mean(histogram).reshape(-1, 1))
+
+    def output_spec(self, shape: tuple, dtype: np.dtype) -> tuple:
+        """
+        Describes the result of the adjustment, an image of the input shape and type for uint8, uint16 and working
+        precision images, a uint8 one for the others.
+
+        Args:
+            shape (tuple): Shape of the input image.
+            dtype (np.dtype): Data type of the input image.
+
+        Returns:
+            tuple: ``(shape, dtype)`` of the result.
+        """
+        return tuple(shape), result_dtype(dtype)
+
+    def _adjust(self, image: np.ndarray, axis: tuple, out: np.ndarray, channels: int) -> np.ndarray:
+        # Arithmetic path of the types other than uint8, clipped to their value range, the alpha channel is
+        # neither adjusted nor part of the means
+        peak = max_value(image.dtype)
+
+        def adjust(color, color_out):
+            mean = np.mean(color, axis=axis, keepdims=True)
+            if color.dtype == WORKING_DTYPE:
+                # Working precision values in [0, 1] stay float32, written straight to the result
+                mean = mean.astype(WORKING_DTYPE)
+                np.subtract(color, mean, out=color_out)
+                color_out *= np.float32(self.factor)
+                color_out += mean
+                np.clip(color_out, 0, peak, out=color_out)
+                return
+
+            adjusted_image = mean + (color - mean) * self.factor
+            np.clip(adjusted_image, 0, peak, out=adjusted_image)
+            np.copyto(color_out, adjusted_image, casting="unsafe")
+
+        return map_color(adjust, image, out, result_dtype(image.dtype), channels)
+
+    def _table_for_mean(self, mean: np.ndarray) -> np.ndarray:
+        # Same arithmetic as the float path, evaluated once per value instead of once per pixel
+        table = mean + (np.arange(256, dtype=np.uint8) - mean) * self.factor
+        return np.clip(table, 0, 255).astype(np.uint8)
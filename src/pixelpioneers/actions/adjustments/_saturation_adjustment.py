@@ -1,47 +1,44 @@
-import colorsys
 import logging
 
 import numpy as np
 
+from pixelpioneers.actions._channels import batch_channel_count, map_color
+from pixelpioneers.actions._lookup_table import channel_count
 from pixelpioneers.actions.adjustments._abstract_image_adjustment import AbstractImageAdjustment
+from pixelpioneers.colorspace import hsv_to_rgb, rgb_to_hsv
 from pixelpioneers.exceptions import ImageAdjustmentError
+from pixelpioneers.precision import WORKING_DTYPE, max_value, result_dtype
 
 logger = logging.getLogger(__name__)
 
 
 class SaturationAdjustment(AbstractImageAdjustment):
     name = "SaturationAdjustment"
+    supports_inplace = True
+    tileable = True
 
     def __init__(self, factor: float):
         if not (isinstance(factor, int) or isinstance(factor, float)):
             raise ValueError("Invalid factor. Expected a numeric value.")
         self.factor = factor
 
-    def apply(self, image: np.ndarray) -> np.ndarray:
+    def apply(self, image: np.ndarray, out: np.ndarray = None) -> np.ndarray:
         try:
 
             assert image is not None, "Function parameter image: cannot be None"
-            assert image.ndim == 3, f"Expected a 3 dimensional image, Insted got a image with {image.ndim} dimensions"
+            assert image.ndim in (2, 3), f"Expected a 2 or 3 dimensional image, Insted got a image with {image.ndim} dimensions"
+            assert image.size > 0, "Function parameter image: cannot be empty"
+            self._check_output(image, out)
 
-            # Convert the image to float32 for processing
-            logger.info("Converting image to float32 for processing")
-            float_image = image.astype(np.float32) / 255
+            channels = channel_count(image)
+            if channels < 3:
+                # Single channel images, with or without alpha, have no saturation to adjust
+                logger.info("Image is single channel, nothing to adjust")
+                return self._store_output(image.astype(result_dtype(image.dtype)), out)
 
-            # Convert RGB to HSV
-            logger.info("Converting RGB to HSV")
-            hsv_image = np.apply_along_axis(colorsys.rgb_to_hsv, 2, float_image)
+            assert channels in (3, 4), f"Expected a 3 or 4 channel image, Instead got a image with {channels} channels"
 
-            # Adjust the saturation
-            logger.info("Adjusting the saturation")
-            hsv_image[:, :, 1] = np.clip(hsv_image[:, :, 1] * self.factor, 0, 1)
-
-            # Convert HSV back to RGB
-            logger.info("Converting HSV back to RGB")
-            adjusted_image = np.apply_along_axis(colorsys.hsv_to_rgb, 2, hsv_image)
-
-            # Convert back to uint8 and return
-            logger.info("Converting back to uint8 and returning")
-            return (adjusted_image * 255).astype(np.uint8)
+            return self._adjust_rgb(image, out, channels)
 
         except AssertionError as ae:
             logger.error(f"Error transforming image: {ae}")
@@ -50,3 +47,69 @@ class SaturationAdjustment(AbstractImageAdjustment):
         except Exception as e:
             logger.exception("Error transforming image: Unknown Error")
             raise ImageAdjustmentError(f"Error transforming Image: Unknown Error")
+
+    def apply_batch(self, images: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        try:
+            self._check_batch(images, out)
+            assert images.size > 0, "Function parameter images: cannot be empty"
+
+            channels = batch_channel_count(images)
+            if channels < 3:
+                # Batches of single channel images have no saturation to adjust
+                logger.info("Batch is single channel, nothing to adjust")
+                return self._store_output(images.astype(result_dtype(images.dtype)), out)
+
+            assert channels in (3, 4), \
+                f"Expected a batch of 3 or 4 channel images, Instead got images with {channels} channels"
+            # The colorspace conversions work on the whole batch at once
+            return self._adjust_rgb(images, out, channels)
+
+        except AssertionError as ae:
+            logger.error(f"Error transforming batch: {ae}")
+            raise ImageAdjustmentError(f"Error transforming Image: {ae}")
+
+        except Exception as e:
+            logger.exception("Error transforming batch: Unknown Error")
+            raise ImageAdjustmentError(f"Error transforming Image: Unknown Error")
+
+    def output_spec(self, shape: tuple, dtype: np.dtype) -> tuple:
+        return tuple(shape), result_dtype(dtype)
+
+    def _adjust_rgb(self, image: np.ndarray, out: np.ndarray, channels: int) -> np.ndarray:
+        # Values are scaled to [0, 1] from the value range of the type, the alpha channel is passed through
+        peak = max_value(image.dtype)
+
+        def adjust(color, color_out):
+            if color.dtype == WORKING_DTYPE and color_out.flags.c_contiguous:
+                # Working precision images are converted straight into the result, which is never rounded
+                logger.info("Converting RGB to HSV")
+                hsv_image = rgb_to_hsv(color, out=color_out)
+            else:
+                # Convert the image to float32 for processing, all conversions below reuse this buffer, which is
+                # C-contiguous whatever the layout of the image, e.g. a rotated or flipped view
+                logger.info("Converting image to float32 for processing")
+                float_image = np.array(color, dtype=np.float32, order="C")
+                float_image /= peak
+
+                # Convert RGB to HSV
+                logger.info("Converting RGB to HSV")
+                hsv_image = rgb_to_hsv(float_image, out=float_image)
+
+            # Adjust the saturation
+            logger.info("Adjusting the saturation")
+            saturation = hsv_image[..., 1]
+            saturation *= self.factor
+            np.clip(saturation, 0, 1, out=saturation)
+
+            # Convert HSV back to RGB
+            logger.info("Converting HSV back to RGB")
+            adjusted_image = hsv_to_rgb(hsv_image, out=hsv_image)
+            if adjusted_image is color_out:
+                return
+
+            # Convert back to the type of the image
+            logger.info("Converting back to the image type")
+            adjusted_image *= peak
+            np.copyto(color_out, adjusted_image, casting="unsafe")
+
+        return map_color(adjust, image, out, result_dtype(image.dtype), channels)
@@ -0,0 +1,299 @@
+import logging
+
+import numpy as np
+
+from pixelpioneers import instrumentation
+from pixelpioneers.actions._geometry import affine_runs, apply_affine, compose_affine
+from pixelpioneers.actions._lookup_table import (apply_lookup_table, apply_lookup_table_batch, apply_lookup_tables,
+                                                 compile_lookup_table)
+from pixelpioneers.actions.abstract_image_action import AbstractImageAction
+from pixelpioneers.exceptions import ActionError
+from pixelpioneers.precision import PRECISIONS, WORKING_DTYPE, to_working
+
+logger = logging.getLogger(__name__)
+
+
+class Pipeline(AbstractImageAction):
+    """
+    Applies a sequence of actions to an image in a single pass.
+
+    The image is decoded and encoded once by the caller, every step works on the in-memory array returned by
+    the previous one. Consecutive pointwise steps applied to a uint8 image are fused into a single lookup
+    table, so the run costs one pass over the image. Consecutive geometric steps are fused into a single
+    affine transform, so the image is resampled once, except that a step sampling outside the canvas of an
+    earlier free rotation, e.g. a second free rotation, starts a new transform.
+
+    With the ``float32`` precision the image is converted once to float32 values in [0, 1], which flow between
+    the steps without being rounded, and the result is only quantized when it is written by
+    :meth:`UnifiedIO.write`. Chains of steps then lose no precision on the way, at the cost of float arithmetic
+    instead of fused lookup tables.
+
+    :param steps: The actions to apply, in order.
+    :type steps: list
+    :param precision: ``native`` applies every step to the type returned by the previous one, ``float32`` works
+                      in float32 throughout.
+    :type precision: str
+    """
+    name = "Pipeline"
+    tileable = True
+
+    def __init__(self, steps: list, precision: str = "native"):
+        """
+        Initialize the Pipeline instance.
+
+        :param steps: The actions to apply, in order.
+        :type steps: list
+        :param precision: Working precision, one of ``native`` and ``float32``.
+        :type precision: str
+        :raises ActionError: If the pipeline has no steps, a step is not an action or the precision is unknown.
+        """
+        if len(steps) == 0:
+            raise ActionError("Action Error: A pipeline needs at least one step")
+        for step in steps:
+            if not isinstance(step, AbstractImageAction):
+                raise ActionError(f"Action Error: Invalid pipeline step - {step!r}")
+        if precision not in PRECISIONS:
+            raise ActionError(f"Action Error: Unknown precision - {precision} (choose from {', '.join(PRECISIONS)})")
+        self.steps = list(steps)
+        self.precision = precision
+        self.supports_inplace = all(step.supports_inplace for step in self.steps)
+        self.needs_output_buffer = self.steps[-1].needs_output_buffer
+        super(Pipeline, self).__init__()
+
+    def apply(self, image: np.ndarray, *args, out: np.ndarray = None, **kwargs) -> np.ndarray:
+        """
+        Apply every step of the pipeline to the given image.
+
+        :param image: The input image as a NumPy array.
+        :type image: np.ndarray
+        :param out: Optional buffer for the result. When every step can work in place it also holds the
+                    intermediate images, and it may be the input image itself.
+        :type out: np.ndarray
+        :return: The image returned by the last step.
+        :rtype: np.ndarray
+        :raises ActionError: If the image is None or one of the steps fails.
+        """
+        try:
+            assert image is not None, "Function parameter image: cannot be None"
+            self._check_output(image, out)
+        except AssertionError as ae:
+            logger.error(f"Error applying pipeline: {ae}")
+            raise ActionError(f"Error applying pipeline: {ae}")
+
+        image = self._to_working(image)
+        stages = self._stages()
+        for i, stage in enumerate(stages):
+            # Runs of pointwise steps on uint8 images and of geometric steps are fused, other steps are applied
+            # on their own
+            fused = len(stage) > 1 and (stage[0].geometric or image.dtype == np.uint8)
+            units = [stage] if fused else [[step] for step in stage]
+            if fused and stage[0].geometric:
+                units = affine_runs(stage, image.shape)
+
+            for unit in units:
+                last = i == len(stages) - 1 and unit is units[-1]
+                unit_out = None
+                if out is not None and (last or self.supports_inplace and
+                                        self._fold_specs(unit, image.shape, image.dtype) == (out.shape, out.dtype)):
+                    unit_out = out
+
+                # Fused steps are timed together
+                with instrumentation.timer("action:" + "+".join(type(step).__name__ for step in unit)):
+                    if len(unit) > 1 and unit[0].geometric:
+                        logger.info(f"Applying fused geometric steps: "
+                                    f"{', '.join(type(step).__name__ for step in unit)}")
+                        image = apply_affine(image, *compose_affine(unit, image.shape), out=unit_out)
+                    elif len(unit) > 1:
+                        logger.info(f"Applying fused pipeline steps: {', '.join(type(step).__name__ for step in unit)}")
+                        image = apply_lookup_table(image, compile_lookup_table(unit, image), out=unit_out)
+                    else:
+                        logger.info(f"Applying pipeline step: {type(unit[0]).__name__}")
+                        image = unit[0].apply(image, out=unit_out)
+        return image
+
+    def apply_batch(self, images: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Apply every step of the pipeline to a batch of images.
+
+        Runs of pointwise steps on uint8 batches are fused into a lookup table, shared by the whole batch unless
+        a step depends on image statistics, in which case every image gets its own table. Runs of geometric
+        steps are fused into one affine transform applied image by image. Other steps are applied to the whole
+        batch by their own :meth:`apply_batch`.
+
+        :param images: (N, H, W) or (N, H, W, C) batch of images.
+        :type images: np.ndarray
+        :param out: Optional buffer for the result of the last step.
+        :type out: np.ndarray
+        :return: The batch returned by the last step.
+        :rtype: np.ndarray
+        :raises ActionError: If the batch is invalid or one of the steps fails.
+        """
+        try:
+            self._check_batch(images, out)
+        except AssertionError as ae:
+            logger.error(f"Error applying pipeline: {ae}")
+            raise ActionError(f"Error applying pipeline: {ae}")
+
+        images = self._to_working(images)
+        stages = self._stages()
+        for i, stage in enumerate(stages):
+            fused = len(stage) > 1 and (stage[0].geometric or images.dtype == np.uint8)
+            units = [stage] if fused else [[step] for step in stage]
+            if fused and stage[0].geometric:
+                units = affine_runs(stage, images.shape[1:])
+
+            for unit in units:
+                unit_out = out if i == len(stages) - 1 and unit is units[-1] else None
+                with instrumentation.timer("action:" + "+".join(type(step).__name__ for step in unit)):
+                    if len(unit) > 1 and unit[0].geometric:
+                        logger.info(f"Applying fused geometric steps: "
+                                    f"{', '.join(type(step).__name__ for step in unit)}")
+                        images = self._apply_affine_batch(unit, images, unit_out)
+                    elif len(unit) > 1:
+                        logger.info(f"Applying fused pipeline steps: {', '.join(type(step).__name__ for step in unit)}")
+                        if any(step.needs_histogram for step in unit):
+                            tables = np.stack([compile_lookup_table(unit, image) for image in images])
+                            images = apply_lookup_tables(images, tables, out=unit_out)
+                        else:
+                            images = apply_lookup_table_batch(images, compile_lookup_table(unit, images[0]),
+                                                              out=unit_out)
+                    else:
+                        logger.info(f"Applying pipeline step: {type(unit[0]).__name__}")
+                        images = unit[0].apply_batch(images, out=unit_out)
+        return images
+
+    def _apply_affine_batch(self, unit: list, images: np.ndarray, out: np.ndarray) -> np.ndarray:
+        # The transform only depends on the image shape, it is composed once for the whole batch
+        transform = compose_affine(unit, images.shape[1:])
+        if out is None:
+            shape, dtype = self._fold_specs(unit, images.shape[1:], images.dtype)
+            out = np.empty((len(images),) + shape, dtype)
+        for image, image_out in zip(images, out):
+            apply_affine(image, *transform, out=image_out)
+        return out
+
+    def output_spec(self, shape: tuple, dtype: np.dtype) -> tuple:
+        """
+        Describe the result of the pipeline for an input of the given shape and type.
+
+        :param shape: Shape of the input image.
+        :type shape: tuple
+        :param dtype: Data type of the input image.
+        :type dtype: np.dtype
+        :return: ``(shape, dtype)`` of the image returned by the last step.
+        :rtype: tuple
+        """
+        return self._fold_specs(self.steps, shape, self._working_dtype(dtype))
+
+    def size_hint(self):
+        """
+        Give the smallest input size the pipeline needs, the one of its first step that depends on the size.
+
+        Pointwise steps give the same result at any resolution, so they are skipped.
+
+        :return: ``(width, height)`` if a reduced input gives the same result up to resampling, None if the
+                 pipeline needs the image at full resolution.
+        :rtype: tuple
+        """
+        for step in self.steps:
+            if not step.pointwise:
+                return step.size_hint()
+        return None
+
+    def tile_supported(self, shape: tuple, dtype: np.dtype) -> bool:
+        """
+        Tell whether every step of the pipeline can be applied strip by strip.
+
+        :param shape: Shape of the input image.
+        :type shape: tuple
+        :param dtype: Data type of the input image.
+        :type dtype: np.dtype
+        :return: True if :meth:`source_rows` and :meth:`apply_rows` can be used.
+        :rtype: bool
+        """
+        spec = tuple(shape), self._working_dtype(dtype)
+        for step in self.steps:
+            if not step.tile_supported(*spec):
+                return False
+            spec = step.output_spec(*spec)
+        return True
+
+    def source_rows(self, start: int, stop: int, shape: tuple) -> tuple:
+        """
+        Give the input rows needed to compute a strip of the final image.
+
+        :param start: First output row of the strip.
+        :type start: int
+        :param stop: End (exclusive) of the output rows of the strip.
+        :type stop: int
+        :param shape: Shape of the complete input image.
+        :type shape: tuple
+        :return: ``(start, stop)`` of the input rows.
+        :rtype: tuple
+        """
+        return self._row_ranges(start, stop, shape)[0][0]
+
+    def apply_rows(self, rows: np.ndarray, start: int, stop: int, shape: tuple) -> np.ndarray:
+        """
+        Compute a strip of the final image, passing it through every step.
+
+        :param rows: The input rows given by :meth:`source_rows` for the strip.
+        :type rows: np.ndarray
+        :param start: First output row of the strip.
+        :type start: int
+        :param stop: End (exclusive) of the output rows of the strip.
+        :type stop: int
+        :param shape: Shape of the complete input image.
+        :type shape: tuple
+        :return: The output rows ``start`` to ``stop``.
+        :rtype: np.ndarray
+        """
+        rows = self._to_working(rows)
+        for step, (_, (step_start, step_stop), step_shape) in zip(self.steps, self._row_ranges(start, stop, shape)):
+            rows = step.apply_rows(rows, step_start, step_stop, step_shape)
+        return rows
+
+    def _row_ranges(self, start: int, stop: int, shape: tuple) -> list:
+        # For every step: the input rows it needs, the output rows it computes and the shape of its input
+        shapes = [tuple(shape)]
+        dtype = self._working_dtype(np.uint8)
+        for step in self.steps[:-1]:
+            step_shape, dtype = step.output_spec(shapes[-1], dtype)
+            shapes.append(step_shape)
+
+        ranges = []
+        for step, step_shape in zip(reversed(self.steps), reversed(shapes)):
+            source = step.source_rows(start, stop, step_shape)
+            ranges.append((source, (start, stop), step_shape))
+            start, stop = source
+        return ranges[::-1]
+
+    def _working_dtype(self, dtype: np.dtype) -> np.dtype:
+        # Type of the image the first step is applied to
+        return WORKING_DTYPE if self.precision == "float32" else np.dtype(dtype)
+
+    def _to_working(self, image: np.ndarray) -> np.ndarray:
+        # The only conversion of a float32 pipeline, the steps then keep the float32 type
+        if self.precision != "float32" or image.dtype == WORKING_DTYPE:
+            return image
+        with instrumentation.timer("action:ToWorkingPrecision"):
+            return to_working(image)
+
+    @staticmethod
+    def _fold_specs(steps: list, shape: tuple, dtype: np.dtype) -> tuple:
+        spec = tuple(shape), np.dtype(dtype)
+        for step in steps:
+            spec = step.output_spec(*spec)
+        return spec
+
+    def _stages(self) -> list:
+        # Groups runs of consecutive pointwise steps and of consecutive geometric steps, every other step forms
+        # a stage of its own
+        stages = []
+        for step in self.steps:
+            if stages and (step.pointwise and stages[-1][-1].pointwise or
+                           step.geometric and stages[-1][-1].geometric):
+                stages[-1].append(step)
+            else:
+                stages.append([step])
+        return stages
@@ -1,9 +1,4 @@
-from ._crop import CropTransformer
-from ._flip import FlipTransformer
-from ._grayscale import GrayscaleTransformer
-from ._invert import InvertTransformer
-from ._resize import ResizeTransformer
-from ._rotate import RotateTransformer
+from pixelpioneers.registry import lazy_module_getattr
 
 __all__ = [
     "CropTransformer",
@@ -13,3 +8,13 @@ __all__ = [
     "ResizeTransformer",
     "RotateTransformer"
 ]
+
+# The transformers are imported on first access, only the ones used pay for their dependencies
+__getattr__ = lazy_module_getattr(__name__, {
+    "CropTransformer": "._crop",
+    "FlipTransformer": "._flip",
+    "GrayscaleTransformer": "._grayscale",
+    "InvertTransformer": "._invert",
+    "ResizeTransformer": "._resize",
+    "RotateTransformer": "._rotate",
+})
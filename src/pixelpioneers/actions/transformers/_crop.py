@@ -21,6 +21,10 @@ class CropTransformer(AbstractImageTransformer):
     :param y2: The ending y-coordinate of the crop box.
     :type y2: int
     """
+    # The crop is a view of the input image
+    needs_output_buffer = False
+    tileable = True
+    geometric = True
 
     def __init__(self, x1: int, y1: int, x2: int, y2: int):
         """
@@ -38,13 +42,15 @@ class CropTransformer(AbstractImageTransformer):
         self.box = (x1, y1, x2, y2)
         super(CropTransformer, self).__init__()
 
-    def apply(self, image: np.ndarray, *args, **kwargs) -> np.ndarray:
+    def apply(self, image: np.ndarray, *args, out: np.ndarray = None, **kwargs) -> np.ndarray:
         """
         Apply the crop transformation to the given image.
 
         :param image: The input image as a NumPy array.
         :type image: np.ndarray
         :param args: Additional positional arguments.
+        :param out: Optional buffer the cropped region is copied to, without it a view is returned.
+        :type out: np.ndarray
         :param kwargs: Additional keyword arguments.
         :return: The cropped image as a NumPy array.
         :rtype: np.ndarray
@@ -53,9 +59,10 @@ class CropTransformer(AbstractImageTransformer):
         try:
 
             assert image is not None, "Function parameter image: cannot be None"
+            self._check_output(image, out)
             logger.info("Applying crop transformation")
             x1, y1, x2, y2 = self.box
-            return image[y1:y2, x1:x2]
+            return self._store_output(image[y1:y2, x1:x2], out)
 
         except AssertionError as ae:
             logger.error(f"Error transforming Image: {ae}")
@@ -68,3 +75,93 @@ class CropTransformer(AbstractImageTransformer):
         except Exception as e:
             logger.error("Error transforming Image: Unknown Error")
             raise ImageTransformationError("Error transforming Image: Unknown Error")
+
+    def apply_batch(self, images: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Apply the crop transformation to every image of a batch.
+
+        :param images: (N, H, W) or (N, H, W, C) batch of images.
+        :type images: np.ndarray
+        :param out: Optional buffer the cropped regions are copied to, without it a view is returned.
+        :type out: np.ndarray
+        :return: The batch of cropped images.
+        :rtype: np.ndarray
+        :raises ImageTransformationError: If there is an error during the transformation.
+        """
+        try:
+            self._check_batch(images, out)
+            x1, y1, x2, y2 = self.box
+            return self._store_output(images[:, y1:y2, x1:x2], out)
+
+        except AssertionError as ae:
+            logger.error(f"Error transforming Image: {ae}")
+            raise ImageTransformationError(f"Error transforming Image: {ae}")
+
+        except Exception as e:
+            logger.error("Error transforming Image: Unknown Error")
+            raise ImageTransformationError("Error transforming Image: Unknown Error")
+
+    def output_spec(self, shape: tuple, dtype: np.dtype) -> tuple:
+        """
+        Describe the result of the crop for an input of the given shape and type.
+
+        :param shape: Shape of the input image.
+        :type shape: tuple
+        :param dtype: Data type of the input image.
+        :type dtype: np.dtype
+        :return: ``(shape, dtype)`` of the cropped image.
+        :rtype: tuple
+        """
+        x1, y1, x2, y2 = self.box
+        height = len(range(shape[0])[y1:y2])
+        width = len(range(shape[1])[x1:x2])
+        return (height, width) + tuple(shape[2:]), np.dtype(dtype)
+
+    def source_rows(self, start: int, stop: int, shape: tuple) -> tuple:
+        """
+        Give the input rows needed for a strip of the cropped image.
+
+        :param start: First output row of the strip.
+        :type start: int
+        :param stop: End (exclusive) of the output rows of the strip.
+        :type stop: int
+        :param shape: Shape of the complete input image.
+        :type shape: tuple
+        :return: ``(start, stop)`` of the input rows.
+        :rtype: tuple
+        """
+        x1, y1, x2, y2 = self.box
+        first_row = range(shape[0])[y1:y2].start
+        return first_row + start, first_row + stop
+
+    def apply_rows(self, rows: np.ndarray, start: int, stop: int, shape: tuple) -> np.ndarray:
+        """
+        Crop a strip of input rows to the columns of the crop box.
+
+        :param rows: The input rows given by :meth:`source_rows`.
+        :type rows: np.ndarray
+        :param start: First output row of the strip.
+        :type start: int
+        :param stop: End (exclusive) of the output rows of the strip.
+        :type stop: int
+        :param shape: Shape of the complete input image.
+        :type shape: tuple
+        :return: The output rows ``start`` to ``stop``.
+        :rtype: np.ndarray
+        """
+        x1, y1, x2, y2 = self.box
+        return rows[:, x1:x2]
+
+    def affine_matrix(self, shape: tuple) -> np.ndarray:
+        """
+        Describe the crop as a translation of pixel coordinates.
+
+        :param shape: Shape of the input image.
+        :type shape: tuple
+        :return: The (3, 3) affine matrix.
+        :rtype: np.ndarray
+        """
+        x1, y1, x2, y2 = self.box
+        return np.array([[1, 0, -range(shape[1])[x1:x2].start],
+                         [0, 1, -range(shape[0])[y1:y2].start],
+                         [0, 0, 1]], dtype=np.float64)
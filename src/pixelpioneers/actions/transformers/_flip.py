@@ -1,13 +1,11 @@
 import logging
 
-import cv2
 import numpy as np
 
 from pixelpioneers.actions.transformers._abstract_image_transformer import AbstractImageTransformer
 from pixelpioneers.exceptions import ImageTransformationError
 
 # Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -15,6 +13,8 @@ class FlipTransformer(AbstractImageTransformer):
     """
     Transformer that flips an image horizontally or vertically.
 
+    The flipped image is a strided view of the input, no pixel is copied unless an output buffer is given.
+
     Args:
         mode (str): The mode of the flip transformation. Supported values are "horizontal" and "vertical".
 
@@ -22,6 +22,10 @@ class FlipTransformer(AbstractImageTransformer):
         ImageTransformationError: If there is an error during the image transformation.
 
     """
+    # The flip is a view of the input image
+    needs_output_buffer = False
+    tileable = True
+    geometric = True
 
     def __init__(self, mode: str):
         """
@@ -31,17 +35,18 @@ class FlipTransformer(AbstractImageTransformer):
         """
         self.mode = mode
 
-    def apply(self, image: np.ndarray, *args, **kwargs) -> np.ndarray:
+    def apply(self, image: np.ndarray, *args, out: np.ndarray = None, **kwargs) -> np.ndarray:
         """
         Applies the flip transformation to the given image.
 
         Args:
             image (np.ndarray): The input image to be transformed.
             *args: Additional positional arguments (unused).
+            out (np.ndarray): Optional buffer the flipped image is copied to, without it a view is returned.
             **kwargs: Additional keyword arguments (unused).
 
         Returns:
-            np.ndarray: The transformed image.
+            np.ndarray: The transformed image, a read-only view when the input is read-only.
 
         Raises:
             ImageTransformationError: If there is an error during the image transformation.
@@ -49,13 +54,14 @@ class FlipTransformer(AbstractImageTransformer):
         """
         try:
             assert image is not None, "Function parameter image: cannot be None"
+            self._check_output(image, out)
             logger.info("Image received for transformation")
             if self.mode == "horizontal":
                 logger.info("Applying horizontal flip transformation")
-                return cv2.flip(image, 1)
+                return self._store_output(image[:, ::-1], out)
             elif self.mode == "vertical":
                 logger.info("Applying vertical flip transformation")
-                return cv2.flip(image, 0)
+                return self._store_output(image[::-1], out)
             raise ImageTransformationError(f"Invalid flip mode: {self.mode}")
 
         except AssertionError as ae:
@@ -65,3 +71,63 @@ class FlipTransformer(AbstractImageTransformer):
         except Exception as e:
             logger.error(f"Unknown Error: {e}")
             raise ImageTransformationError(f"Error transforming Image: Unknown Error")
+
+    def apply_batch(self, images: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Applies the flip transformation to every image of a batch.
+
+        Args:
+            images (np.ndarray): (N, H, W) or (N, H, W, C) batch of images.
+            out (np.ndarray): Optional buffer the flipped images are copied to, without it a view is returned.
+
+        Returns:
+            np.ndarray: The batch of flipped images.
+
+        Raises:
+            ImageTransformationError: If there is an error during the image transformation.
+        """
+        try:
+            self._check_batch(images, out)
+            if self.mode == "horizontal":
+                return self._store_output(images[:, :, ::-1], out)
+            elif self.mode == "vertical":
+                return self._store_output(images[:, ::-1], out)
+            raise ImageTransformationError(f"Invalid flip mode: {self.mode}")
+
+        except AssertionError as ae:
+            logger.error(f"AssertionError: {ae}")
+            raise ImageTransformationError(f"Error transforming Image: {ae}")
+
+        except Exception as e:
+            logger.error(f"Unknown Error: {e}")
+            raise ImageTransformationError(f"Error transforming Image: Unknown Error")
+
+    def source_rows(self, start: int, stop: int, shape: tuple) -> tuple:
+        """
+        Gives the input rows needed for a strip of the flipped image.
+
+        Args:
+            start (int): First output row of the strip.
+            stop (int): End (exclusive) of the output rows of the strip.
+            shape (tuple): Shape of the complete input image.
+
+        Returns:
+            tuple: ``(start, stop)`` of the input rows.
+        """
+        if self.mode == "vertical":
+            return shape[0] - stop, shape[0] - start
+        return start, stop
+
+    def affine_matrix(self, shape: tuple) -> np.ndarray:
+        """
+        Describes the flip as a reflection of pixel coordinates.
+
+        Args:
+            shape (tuple): Shape of the input image.
+
+        Returns:
+            np.ndarray: The (3, 3) affine matrix.
+        """
+        if self.mode == "vertical":
+            return np.array([[1, 0, 0], [0, -1, shape[0] - 1], [0, 0, 1]], dtype=np.float64)
+        return np.array([[-1, 0, shape[1] - 1], [0, 1, 0], [0, 0, 1]], dtype=np.float64)
@@ -4,14 +4,28 @@ import numpy as np
 
 from pixelpioneers.actions.transformers._abstract_image_transformer import AbstractImageTransformer
 from pixelpioneers.exceptions import ImageTransformationError
+from pixelpioneers.precision import WORKING_DTYPE, result_dtype
+
+# Luma weights for R, G and B, and the same weights in 16 bit fixed point for uint8 images and 32 bit fixed
+# point for uint16 images
+LUMA_WEIGHTS = (0.2989, 0.5870, 0.1140)
+LUMA_WEIGHTS_FIXED = tuple(round(weight * (1 << 16)) for weight in LUMA_WEIGHTS)
+LUMA_WEIGHTS_FIXED_WIDE = tuple(round(weight * (1 << 32)) for weight in LUMA_WEIGHTS)
+# The weights the uint8 fixed-point kernel actually applies, so that float images give the same luma
+LUMA_WEIGHTS_ROUNDED = tuple(weight / (1 << 16) for weight in LUMA_WEIGHTS_FIXED)
+# Number of pixels converted at once by apply_batch
+LUMA_GROUP_PIXELS = 1 << 18
 
 
 class GrayscaleTransformer(AbstractImageTransformer):
     """
     GrayscaleTransformer is a class that applies grayscale transformation to an image.
 
-    This class inherits from the AbstractImageTransformer class.
+    This class inherits from the AbstractImageTransformer class. The result is a single channel HxW image, or a
+    gray and alpha HxWx2 image for RGBA images. uint8 and uint16 images are converted with integer fixed-point
+    arithmetic.
     """
+    tileable = True
 
     def __init__(self):
         """
@@ -19,12 +33,13 @@ class GrayscaleTransformer(AbstractImageTransformer):
         """
         super(GrayscaleTransformer, self).__init__()
 
-    def apply(self, image: np.ndarray, *args, **kwargs) -> np.ndarray:
+    def apply(self, image: np.ndarray, *args, out: np.ndarray = None, **kwargs) -> np.ndarray:
         """
         Applies grayscale transformation to the input image.
 
         Args:
             image (np.ndarray): The input image as a NumPy array.
+            out (np.ndarray): Optional buffer for the result, of the shape and type given by :meth:`output_spec`.
 
         Returns:
             np.ndarray: The grayscale transformed image as a NumPy array.
@@ -38,11 +53,17 @@ class GrayscaleTransformer(AbstractImageTransformer):
             assert image is not None, "Function parameter image: cannot be None"
             logging.info("Image parameter is not None")
 
+            self._check_output(image, out)
+            if image.ndim == 2 or image.shape[-1] in (1, 2):
+                logging.info("Image is already single channel")
+                # A copy, like the result of the other actions, that the caller may modify
+                return image.copy() if out is None else self._store_output(image, out)
+
             assert image.ndim == 3, f"Expected a 3 dimensional image, Instead got a image with {image.ndim} dimensions"
             logging.info(f"Image dimensions: {image.ndim}")
 
             logging.info("Grayscale transformation applied successfully")
-            return np.dot(image[..., :3], [0.2989, 0.5870, 0.1140]).astype(np.uint8)
+            return self._luma(image, out)
 
         except AssertionError as ae:
             logging.error(f"Error transforming Image: {ae}")
@@ -55,3 +76,101 @@ class GrayscaleTransformer(AbstractImageTransformer):
         except Exception as e:
             logging.error("Error transforming Image: Unknown Error")
             raise ImageTransformationError("Error transforming Image: Unknown Error")
+
+    def apply_batch(self, images: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Applies grayscale transformation to a batch of images, in a single pass over the whole batch.
+
+        Args:
+            images (np.ndarray): (N, H, W) or (N, H, W, C) batch of images.
+            out (np.ndarray): Optional buffer for the result, of the shape and type given by :meth:`batch_output_spec`.
+
+        Returns:
+            np.ndarray: The (N, H, W) batch of grayscale images, (N, H, W, 2) for RGBA images.
+
+        Raises:
+            ImageTransformationError: If the batch is invalid or an unknown error occurs during the transformation.
+        """
+        try:
+            self._check_batch(images, out)
+            if images.ndim == 3 or images.shape[-1] in (1, 2):
+                logging.info("Batch is already single channel")
+                return images.copy() if out is None else self._store_output(images, out)
+            if out is None:
+                out = np.empty(*self.batch_output_spec(images.shape, images.dtype))
+            # Groups of images small enough for the uint32 intermediates to stay in the CPU cache
+            group = max(1, LUMA_GROUP_PIXELS // (images.shape[1] * images.shape[2] or 1))
+            for start in range(0, len(images), group):
+                self._luma(images[start:start + group], out[start:start + group])
+            return out
+
+        except AssertionError as ae:
+            logging.error(f"Error transforming Image: {ae}")
+            raise ImageTransformationError(f"Error transforming Image: {ae}")
+
+        except Exception as e:
+            logging.error("Error transforming Image: Unknown Error")
+            raise ImageTransformationError("Error transforming Image: Unknown Error")
+
+    def output_spec(self, shape: tuple, dtype: np.dtype) -> tuple:
+        """
+        Describes the result of the transformation, a single channel image of the input height and width, with
+        the alpha channel of RGBA images kept as a second channel.
+
+        Args:
+            shape (tuple): Shape of the input image.
+            dtype (np.dtype): Data type of the input image.
+
+        Returns:
+            tuple: ``(shape, dtype)`` of the result.
+        """
+        if len(shape) == 2 or shape[-1] in (1, 2):
+            return tuple(shape), np.dtype(dtype)
+        if shape[-1] == 4:
+            return tuple(shape[:2]) + (2,), result_dtype(dtype)
+        return tuple(shape[:2]), result_dtype(dtype)
+
+    def _luma(self, image: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        # The luma of RGB images, or the luma and the untouched alpha of RGBA images
+        if out is None:
+            out = np.empty(image.shape[:-1] + ((2,) if image.shape[-1] == 4 else ()), dtype=result_dtype(image.dtype))
+        luma = out[..., 0] if image.shape[-1] == 4 else out
+        if image.shape[-1] == 4:
+            np.copyto(out[..., 1], image[..., 3], casting="unsafe")
+        if image.dtype in (np.uint8, np.uint16):
+            self._fixed_point_luma(image, luma)
+        else:
+            np.copyto(luma, self._float_luma(image), casting="unsafe")
+        return out
+
+    @staticmethod
+    def _float_luma(image: np.ndarray) -> np.ndarray:
+        # Working precision images keep their float32 luma, quantized once when written, others are rounded to
+        # uint8 like the fixed-point kernel does
+        if image.dtype == WORKING_DTYPE:
+            return np.dot(image[..., :3], np.asarray(LUMA_WEIGHTS_ROUNDED, dtype=WORKING_DTYPE))
+        luma = np.dot(image[..., :3], LUMA_WEIGHTS_ROUNDED)
+        # Halves are rounded up, the float64 sums of integer values are exact
+        luma += 0.5
+        np.floor(luma, out=luma)
+        np.clip(luma, 0, 255, out=luma)
+        return luma.astype(np.uint8)
+
+    @staticmethod
+    def _fixed_point_luma(image: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        # Accumulates the weighted channels in uint32 and rounds the 16 bit fraction away, which avoids the
+        # float64 intermediate of np.dot. uint16 values need the finer weights, and a uint64 accumulator
+        if image.dtype == np.uint16:
+            weights, bits, accumulator = LUMA_WEIGHTS_FIXED_WIDE, 32, np.uint64
+        else:
+            weights, bits, accumulator = LUMA_WEIGHTS_FIXED, 16, np.uint32
+        acc = np.multiply(image[..., 0], weights[0], dtype=accumulator)
+        tmp = np.multiply(image[..., 1], weights[1], dtype=accumulator)
+        acc += tmp
+        np.multiply(image[..., 2], weights[2], out=tmp, dtype=accumulator)
+        acc += tmp
+        acc += 1 << (bits - 1)
+
+        result = np.empty(image.shape[:-1], dtype=image.dtype) if out is None else out
+        np.right_shift(acc, bits, out=result, casting="unsafe")
+        return result
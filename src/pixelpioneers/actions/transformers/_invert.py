@@ -2,8 +2,11 @@ import logging
 
 import numpy as np
 
+from pixelpioneers.actions._channels import batch_channel_count, map_color
+from pixelpioneers.actions._lookup_table import channel_count
 from pixelpioneers.actions.transformers._abstract_image_transformer import AbstractImageTransformer
 from pixelpioneers.exceptions import ImageTransformationError
+from pixelpioneers.precision import max_value
 
 
 class InvertTransformer(AbstractImageTransformer):
@@ -17,6 +20,9 @@ class InvertTransformer(AbstractImageTransformer):
 
     :param AbstractImageTransformer: The base class for image transformers.
     """
+    pointwise = True
+    supports_inplace = True
+    tileable = True
 
     def __init__(self):
         """
@@ -24,16 +30,19 @@ class InvertTransformer(AbstractImageTransformer):
         """
         super(InvertTransformer, self).__init__()
 
-    def apply(self, image: np.ndarray, *args, **kwargs) -> np.ndarray:
+    def apply(self, image: np.ndarray, *args, out: np.ndarray = None, **kwargs) -> np.ndarray:
         """
         Apply the inversion operation on the input image.
 
         This method takes an input image as a NumPy array and applies the inversion operation by subtracting each pixel
-        value from 255. The resulting image will have inverted colors.
+        value from 255, 65535 for uint16 images or 1 for working precision images. The resulting image will have
+        inverted colors, the alpha channel of gray and alpha or RGBA images is left untouched.
 
         :param image: The input image as a NumPy array.
         :type image: np.ndarray
         :param args: Additional positional arguments.
+        :param out: Optional buffer for the result, may be the input image itself.
+        :type out: np.ndarray
         :param kwargs: Additional keyword arguments.
         :return: The inverted image as a NumPy array.
         :rtype: np.ndarray
@@ -42,9 +51,10 @@ class InvertTransformer(AbstractImageTransformer):
         try:
 
             assert image is not None, "Function parameter image: cannot be None"
-            assert image.ndim == 3, f"Expected a 3 dimensional image, Instead got a image with {image.ndim} dimensions"
+            assert image.ndim in (2, 3), f"Expected a 2 or 3 dimensional image, Instead got a image with {image.ndim} dimensions"
+            self._check_output(image, out)
             logging.info("Image transformation started")
-            return 255 - image
+            return self._invert(image, out, channel_count(image))
 
         except AssertionError as ae:
             logging.error(f"AssertionError occurred: {ae}")
@@ -57,3 +67,56 @@ class InvertTransformer(AbstractImageTransformer):
         except Exception as e:
             logging.error(f"Exception occurred: {e}")
             raise ImageTransformationError("Error transforming Image: Unknown Error")
+
+    def apply_batch(self, images: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Apply the inversion operation on a batch of images, in a single pass over the whole batch.
+
+        :param images: (N, H, W) or (N, H, W, C) batch of images.
+        :type images: np.ndarray
+        :param out: Optional buffer for the result, may be the batch itself.
+        :type out: np.ndarray
+        :return: The inverted batch.
+        :rtype: np.ndarray
+        :raises ImageTransformationError: If an error occurs during the image transformation.
+        """
+        try:
+            self._check_batch(images, out)
+            return self._invert(images, out, batch_channel_count(images))
+
+        except AssertionError as ae:
+            logging.error(f"AssertionError occurred: {ae}")
+            raise ImageTransformationError(f"Error transforming Image: {ae}")
+
+        except Exception as e:
+            logging.error(f"Exception occurred: {e}")
+            raise ImageTransformationError("Error transforming Image: Unknown Error")
+
+    def lookup_table(self, histogram: np.ndarray = None) -> np.ndarray:
+        """
+        Return the inversion as a lookup table on uint8 values.
+
+        :param histogram: Unused, the table does not depend on the image.
+        :type histogram: np.ndarray
+        :return: The (256,) uint8 lookup table.
+        :rtype: np.ndarray
+        """
+        return 255 - np.arange(256, dtype=np.uint8)
+
+    def output_spec(self, shape: tuple, dtype: np.dtype) -> tuple:
+        """
+        Describe the result of the inversion for an input of the given shape and type.
+
+        :param shape: Shape of the input image.
+        :type shape: tuple
+        :param dtype: Data type of the input image.
+        :type dtype: np.dtype
+        :return: ``(shape, dtype)`` of the inverted image.
+        :rtype: tuple
+        """
+        return tuple(shape), np.result_type(max_value(dtype), np.empty(0, dtype=dtype))
+
+    def _invert(self, image: np.ndarray, out: np.ndarray, channels: int) -> np.ndarray:
+        peak = max_value(image.dtype)
+        dtype = self.output_spec(image.shape, image.dtype)[1]
+        return map_color(lambda color, color_out: np.subtract(peak, color, out=color_out), image, out, dtype, channels)
@@ -1,4 +1,5 @@
 import logging
+from math import gcd
 
 import cv2
 import numpy as np
@@ -6,8 +7,6 @@ import numpy as np
 from pixelpioneers.actions.transformers._abstract_image_transformer import AbstractImageTransformer
 from pixelpioneers.exceptions import ImageTransformationError
 
-logging.basicConfig(level=logging.INFO)  # Set the desired logging level
-
 
 class ResizeTransformer(AbstractImageTransformer):
     """
@@ -18,16 +17,19 @@ class ResizeTransformer(AbstractImageTransformer):
         height (int): The desired height of the resized image.
     """
 
+    geometric = True
+
     def __init__(self, width: int, height: int):
         self.size = [width, height]
         super(ResizeTransformer, self).__init__()
 
-    def apply(self, image: np.ndarray, *args, **kwargs) -> np.ndarray:
+    def apply(self, image: np.ndarray, *args, out: np.ndarray = None, **kwargs) -> np.ndarray:
         """
         Applies the resizing transformation to the given image.
 
         Args:
             image (numpy.ndarray): The input image to be resized.
+            out (numpy.ndarray): Optional buffer for the resized image.
 
         Returns:
             numpy.ndarray: The resized image.
@@ -38,9 +40,11 @@ class ResizeTransformer(AbstractImageTransformer):
         try:
 
             assert image is not None, "Function parameter image: cannot be None"
+            self._check_output(image, out)
             logging.info("Resizing image")
             logging.info("Image resized successfully")
-            return cv2.resize(image, self.size, interpolation=cv2.INTER_AREA)
+            result = cv2.resize(image, self.size, dst=out, interpolation=cv2.INTER_AREA)
+            return self._store_output(self._keep_channel_axis(result, image), out)
 
         except AssertionError as ae:
             logging.error(f"Error transforming Image: {ae}")
@@ -49,3 +53,129 @@ class ResizeTransformer(AbstractImageTransformer):
         except Exception as e:
             logging.error("Error transforming Image: Unknown Error")
             raise ImageTransformationError("Error transforming Image: Unknown Error")
+
+    def apply_batch(self, images: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Resizes every image of a batch, one image at a time as OpenCV works on single images.
+
+        Args:
+            images (numpy.ndarray): (N, H, W) or (N, H, W, C) batch of images.
+            out (numpy.ndarray): Optional buffer for the resized images.
+
+        Returns:
+            numpy.ndarray: The batch of resized images.
+
+        Raises:
+            ImageTransformationError: If the batch is invalid or if an error occurs during the transformation.
+        """
+        try:
+            self._check_batch(images, out)
+            if out is None:
+                out = np.empty(*self.batch_output_spec(images.shape, images.dtype))
+            for image, image_out in zip(images, out):
+                self._store_output(cv2.resize(image, self.size, dst=image_out, interpolation=cv2.INTER_AREA),
+                                   image_out)
+            return out
+
+        except AssertionError as ae:
+            logging.error(f"Error transforming Image: {ae}")
+            raise ImageTransformationError(f"Error transforming Image: {ae}")
+
+        except Exception as e:
+            logging.error("Error transforming Image: Unknown Error")
+            raise ImageTransformationError("Error transforming Image: Unknown Error")
+
+    def output_spec(self, shape: tuple, dtype: np.dtype) -> tuple:
+        """
+        Describes the result of the resizing for an input of the given shape and type.
+
+        Args:
+            shape (tuple): Shape of the input image.
+            dtype (numpy.dtype): Data type of the input image.
+
+        Returns:
+            tuple: ``(shape, dtype)`` of the resized image.
+        """
+        width, height = self.size
+        return (height, width) + tuple(shape[2:]), np.dtype(dtype)
+
+    def size_hint(self):
+        """
+        Gives the smallest input size the resizing needs, the target size itself.
+
+        Returns:
+            tuple: ``(width, height)`` of the resized image.
+        """
+        return tuple(self.size)
+
+    def tile_supported(self, shape: tuple, dtype: np.dtype) -> bool:
+        """
+        Tells whether the resizing can be applied strip by strip.
+
+        Only downscaling is supported: area interpolation then only depends on the source rows covered by an
+        output row, so blocks of rows aligned on the scale ratio are resized exactly like the whole image.
+
+        Args:
+            shape (tuple): Shape of the input image.
+            dtype (numpy.dtype): Data type of the input image.
+
+        Returns:
+            bool: True if the image can be resized strip by strip.
+        """
+        width, height = self.size
+        return height <= shape[0] and width <= shape[1]
+
+    def source_rows(self, start: int, stop: int, shape: tuple) -> tuple:
+        """
+        Gives the input rows needed for a strip of the resized image.
+
+        Args:
+            start (int): First output row of the strip.
+            stop (int): End (exclusive) of the output rows of the strip.
+            shape (tuple): Shape of the complete input image.
+
+        Returns:
+            tuple: ``(start, stop)`` of the input rows.
+        """
+        block_start, block_stop, source_block, output_block = self._aligned_rows(start, stop, shape)
+        return block_start // output_block * source_block, block_stop // output_block * source_block
+
+    def apply_rows(self, rows: np.ndarray, start: int, stop: int, shape: tuple) -> np.ndarray:
+        """
+        Computes a strip of the resized image.
+
+        Args:
+            rows (numpy.ndarray): The input rows given by :meth:`source_rows`.
+            start (int): First output row of the strip.
+            stop (int): End (exclusive) of the output rows of the strip.
+            shape (tuple): Shape of the complete input image.
+
+        Returns:
+            numpy.ndarray: The output rows ``start`` to ``stop``.
+        """
+        block_start, block_stop, _, _ = self._aligned_rows(start, stop, shape)
+        block = cv2.resize(rows, (self.size[0], block_stop - block_start), interpolation=cv2.INTER_AREA)
+        return self._keep_channel_axis(block, rows)[start - block_start:stop - block_start]
+
+    def _aligned_rows(self, start: int, stop: int, shape: tuple) -> tuple:
+        # Extends the strip to whole blocks of output_block rows, which are resized from source_block rows
+        divisor = gcd(shape[0], self.size[1])
+        source_block, output_block = shape[0] // divisor, self.size[1] // divisor
+        block_start = start // output_block * output_block
+        block_stop = -(-stop // output_block) * output_block
+        return block_start, block_stop, source_block, output_block
+
+    def affine_matrix(self, shape: tuple) -> np.ndarray:
+        """
+        Describes the resizing as a scaling of pixel coordinates.
+
+        Args:
+            shape (tuple): Shape of the input image.
+
+        Returns:
+            numpy.ndarray: The (3, 3) affine matrix, pixel centres are mapped like OpenCV does.
+        """
+        scale_x, scale_y = self.size[0] / shape[1], self.size[1] / shape[0]
+        return np.array([[scale_x, 0, (scale_x - 1) / 2],
+                         [0, scale_y, (scale_y - 1) / 2],
+                         [0, 0, 1]], dtype=np.float64)
@@ -15,11 +15,14 @@ class RotateTransformer(AbstractImageTransformer):
     """
     A class representing an image rotation transformer.
 
-    This transformer rotates an input image by a specified angle using OpenCV.
+    This transformer rotates an input image by a specified angle using OpenCV. Rotations by a multiple of 90
+    degrees are exact: the rotated image is a strided view of the input and takes its rotated shape.
 
-    :param angle: The angle (in degrees) by which to rotate the image.
+    :param angle: The angle (in degrees) by which to rotate the image, counterclockwise.
     """
 
+    geometric = True
+
     def __init__(self, angle):
         """
         Initialize the RotateTransformer instance.
@@ -27,14 +30,17 @@ class RotateTransformer(AbstractImageTransformer):
         :param angle: The angle (in degrees) by which to rotate the image.
         """
         self.angle = angle
+        # Quarter turns are views of the input image
+        self.needs_output_buffer = self._quarter_turns() is None
         super(RotateTransformer, self).__init__()
 
-    def apply(self, image: np.ndarray, *args, **kwargs) -> np.ndarray:
+    def apply(self, image: np.ndarray, *args, out: np.ndarray = None, **kwargs) -> np.ndarray:
         """
         Apply the rotation transformation to the input image.
 
         :param image: The input image to be rotated.
         :param args: Additional positional arguments (unused).
+        :param out: Optional buffer for the rotated image, without it quarter turns return a view.
         :param kwargs: Additional keyword arguments (unused).
         :return: The rotated image.
         :raises ImageTransformationError: If an error occurs during the image transformation.
@@ -42,14 +48,21 @@ class RotateTransformer(AbstractImageTransformer):
         try:
 
             assert image is not None, "Function parameter image: cannot be None"
+            self._check_output(image, out)
             logger.info("Starting image rotation")
 
+            quarter_turns = self._quarter_turns()
+            if quarter_turns is not None:
+                logger.info("Image rotation successful")
+                return self._store_output(np.rot90(image, quarter_turns), out)
+
             height, width = image.shape[:2]
             center = (width // 2, height // 2)
             rotation_matrix = cv2.getRotationMatrix2D(center, self.angle, 1.0)
             logger.info("Image rotation successful")
 
-            return cv2.warpAffine(image, rotation_matrix, (width, height))
+            result = cv2.warpAffine(image, rotation_matrix, (width, height), dst=out)
+            return self._store_output(self._keep_channel_axis(result, image), out)
 
         except AssertionError as ae:
             logger.error(f"Error transforming Image: {ae}")
@@ -58,3 +71,99 @@ class RotateTransformer(AbstractImageTransformer):
         except Exception as e:
             logger.error("Error transforming Image: Unknown Error")
             raise ImageTransformationError("Error transforming Image: Unknown Error")
+
+    def apply_batch(self, images: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Apply the rotation transformation to every image of a batch.
+
+        Quarter turns rotate the whole batch at once, other angles are applied by OpenCV one image at a time.
+
+        :param images: (N, H, W) or (N, H, W, C) batch of images.
+        :param out: Optional buffer for the rotated images, without it quarter turns return a view.
+        :return: The batch of rotated images.
+        :raises ImageTransformationError: If an error occurs during the image transformation.
+        """
+        try:
+            self._check_batch(images, out)
+
+            quarter_turns = self._quarter_turns()
+            if quarter_turns is not None:
+                return self._store_output(np.rot90(images, quarter_turns, axes=(1, 2)), out)
+
+            height, width = images.shape[1:3]
+            rotation_matrix = cv2.getRotationMatrix2D((width // 2, height // 2), self.angle, 1.0)
+            if out is None:
+                out = np.empty(*self.batch_output_spec(images.shape, images.dtype))
+            for image, image_out in zip(images, out):
+                self._store_output(cv2.warpAffine(image, rotation_matrix, (width, height), dst=image_out), image_out)
+            return out
+
+        except AssertionError as ae:
+            logger.error(f"Error transforming Image: {ae}")
+            raise ImageTransformationError(f"Error transforming Image: {ae}")
+
+        except Exception as e:
+            logger.error("Error transforming Image: Unknown Error")
+            raise ImageTransformationError("Error transforming Image: Unknown Error")
+
+    def output_spec(self, shape: tuple, dtype: np.dtype) -> tuple:
+        """
+        Describe the result of the rotation for an input of the given shape and type.
+
+        :param shape: Shape of the input image.
+        :param dtype: Data type of the input image.
+        :return: ``(shape, dtype)`` of the rotated image, height and width are swapped by odd quarter turns.
+        """
+        if self._quarter_turns() in (1, 3):
+            return (shape[1], shape[0]) + tuple(shape[2:]), np.dtype(dtype)
+        return tuple(shape), np.dtype(dtype)
+
+    def tile_supported(self, shape: tuple, dtype: np.dtype) -> bool:
+        """
+        Tell whether the rotation can be applied strip by strip, which is the case of half turns.
+
+        :param shape: Shape of the input image.
+        :param dtype: Data type of the input image.
+        :return: True if :meth:`source_rows` and :meth:`apply_rows` can be used.
+        """
+        return self._quarter_turns() in (0, 2)
+
+    def source_rows(self, start: int, stop: int, shape: tuple) -> tuple:
+        """
+        Give the input rows needed for a strip of the rotated image.
+
+        :param start: First output row of the strip.
+        :param stop: End (exclusive) of the output rows of the strip.
+        :param shape: Shape of the complete input image.
+        :return: ``(start, stop)`` of the input rows.
+        """
+        if self._quarter_turns() == 2:
+            return shape[0] - stop, shape[0] - start
+        return start, stop
+
+    def affine_matrix(self, shape: tuple) -> np.ndarray:
+        """
+        Describe the rotation as an affine transform of pixel coordinates.
+
+        :param shape: Shape of the input image.
+        :return: The (3, 3) affine matrix.
+        """
+        height, width = shape[:2]
+        quarter_turns = self._quarter_turns()
+        if quarter_turns == 1:
+            matrix = [[0, 1, 0], [-1, 0, width - 1]]
+        elif quarter_turns == 2:
+            matrix = [[-1, 0, width - 1], [0, -1, height - 1]]
+        elif quarter_turns == 3:
+            matrix = [[0, -1, height - 1], [1, 0, 0]]
+        elif quarter_turns == 0:
+            matrix = [[1, 0, 0], [0, 1, 0]]
+        else:
+            matrix = cv2.getRotationMatrix2D((width // 2, height // 2), self.angle, 1.0)
+        return np.vstack([matrix, [0, 0, 1]]).astype(np.float64)
+
+    def _quarter_turns(self):
+        # Number of counterclockwise quarter turns, None for other angles
+        if self.angle % 90 != 0:
+            return None
+        return int(self.angle // 90) % 4
@@ -1,21 +1,22 @@
 from pixelpioneers.actions.abstract_image_action import AbstractImageAction
-from pixelpioneers.actions.adjustments import *
-from pixelpioneers.actions.transformers import *
+from pixelpioneers.actions.pipeline import Pipeline
 from pixelpioneers.exceptions import ActionError
+from pixelpioneers.registry import LazyRegistry
 
 
 class UnifiedActions:
-    actions = {
-        "brightness": BrightnessAdjustment,
-        "contrast": ContrastAdjustment,
-        "saturation": SaturationAdjustment,
-        "crop": CropTransformer,
-        "flip": FlipTransformer,
-        "grayscale": GrayscaleTransformer,
-        "invert": InvertTransformer,
-        "resize": ResizeTransformer,
-        "rotate": RotateTransformer
-    }
+    # Actions by name, each action module is only imported when the action is used
+    actions = LazyRegistry({
+        "brightness": "pixelpioneers.actions.adjustments._brightness_adjustment:BrightnessAdjustment",
+        "contrast": "pixelpioneers.actions.adjustments._contrast_adjustment:ContrastAdjustment",
+        "saturation": "pixelpioneers.actions.adjustments._saturation_adjustment:SaturationAdjustment",
+        "crop": "pixelpioneers.actions.transformers._crop:CropTransformer",
+        "flip": "pixelpioneers.actions.transformers._flip:FlipTransformer",
+        "grayscale": "pixelpioneers.actions.transformers._grayscale:GrayscaleTransformer",
+        "invert": "pixelpioneers.actions.transformers._invert:InvertTransformer",
+        "resize": "pixelpioneers.actions.transformers._resize:ResizeTransformer",
+        "rotate": "pixelpioneers.actions.transformers._rotate:RotateTransformer"
+    })
 
     @staticmethod
     def get_action_instance(action: str, action_args: dict) -> AbstractImageAction:
@@ -28,3 +29,18 @@ class UnifiedActions:
 
         except AssertionError as ae:
             raise ActionError(f"Action Error: {ae}")
+
+    @staticmethod
+    def get_pipeline_instance(actions: list, precision: str = "native") -> AbstractImageAction:
+        """
+        Builds the action for a chain of registered actions.
+
+        :param actions: List of ``(action, action_args)`` pairs, in the order they should be applied.
+        :param precision: Working precision of the chain, see :class:`Pipeline`.
+        :return: The action itself for a single entry in native precision, a Pipeline otherwise.
+        :raises ActionError: If an action is not supported, the list is empty or the precision is unknown.
+        """
+        steps = [UnifiedActions.get_action_instance(action, action_args) for action, action_args in actions]
+        if len(steps) == 1 and precision == "native":
+            return steps[0]
+        return Pipeline(steps, precision)
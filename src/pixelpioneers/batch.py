@@ -0,0 +1,381 @@
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from pixelpioneers import instrumentation
+from pixelpioneers.actions.abstract_image_action import AbstractImageAction
+from pixelpioneers.actions.pipeline import Pipeline
+from pixelpioneers.buffer_pool import BufferPool
+from pixelpioneers.image_io.unified_io import UnifiedIO
+from pixelpioneers.result_cache import ResultCache
+from pixelpioneers.tiling import apply_tiled, prepare_tiled
+
+logger = logging.getLogger(__name__)
+
+# Action instance, buffer pool and options shared by the jobs of a worker process, set by _init_worker
+_worker_action = None
+_worker_pool = None
+_worker_strip_bytes = None
+_worker_cache = None
+
+
+def process_image(action_ob: AbstractImageAction, input_path, output_path, pool: BufferPool = None,
+                  strip_bytes: int = None, cache: ResultCache = None) -> bool:
+    """
+    Reads an image, applies the action to it and writes the result.
+
+    With a strip budget, images that do not fit in it are processed strip by strip when the action allows
+    it, see :mod:`pixelpioneers.tiling`.
+
+    Actions that downscale the image let it be decoded at a reduced resolution, see
+    :meth:`AbstractImageAction.size_hint`.
+
+    The decoded image is only used by this call, so actions that support it are applied in place. Otherwise
+    the result is written to a buffer taken from the pool, if one is given.
+
+    :param action_ob: The action to apply.
+    :param input_path: Path of the source image.
+    :param output_path: Path the transformed image is written to.
+    :param pool: Optional pool the output buffers are taken from and returned to.
+    :param strip_bytes: Optional memory budget of a strip, None always processes the whole image.
+    :param cache: Optional cache the result is taken from, without decoding the image, or added to.
+    :return: True if the result was taken from the cache.
+    """
+    with instrumentation.timer("image"):
+        return _process_image(action_ob, input_path, output_path, pool, strip_bytes, cache)
+
+
+def _process_image(action_ob: AbstractImageAction, input_path, output_path, pool: BufferPool = None,
+                   strip_bytes: int = None, cache: ResultCache = None) -> bool:
+    key = None
+    if cache is not None:
+        key = cache.key(input_path, action_ob, output_path)
+        if cache.fetch(key, output_path):
+            return True
+
+    image, plan = _load(action_ob, input_path, strip_bytes)
+    if plan is not None:
+        _apply_tiled(image, plan, output_path)
+    else:
+        _save(output_path, *_transform(action_ob, image, pool), pool)
+
+    if cache is not None:
+        cache.store(key, output_path)
+    return False
+
+
+def _load(action_ob: AbstractImageAction, input_path, strip_bytes: int = None) -> tuple:
+    # Read stage, returns the image and the strip plan when it is processed strip by strip
+    size_hint = action_ob.size_hint()
+    if not strip_bytes:
+        image = UnifiedIO.read(input_path, size_hint)
+        instrumentation.count("pixels", image.shape[0] * image.shape[1])
+        return image, None
+
+    image = UnifiedIO.open(input_path, size_hint)
+    instrumentation.count("pixels", image.shape[0] * image.shape[1])
+    plan = prepare_tiled(action_ob, image, strip_bytes)
+    if plan is None and not image.flags.c_contiguous:
+        # Mapped files can be bottom-up or channel-reversed views, the actions get a regular array
+        image = np.ascontiguousarray(image)
+    return image, plan
+
+
+def _apply_tiled(image, plan: tuple, output_path) -> None:
+    # Reads, computes and writes strip by strip, memory stays within the strip budget
+    tiled_action, strips = plan
+    # An error drops the partial result, the output path is only replaced by a complete image
+    with UnifiedIO.open_writer(output_path, *tiled_action.output_spec(image.shape, image.dtype)) as writer:
+        apply_tiled(tiled_action, image, writer, strips)
+        # Formats that are not streamed are encoded when the writer is closed
+        with instrumentation.timer("write"):
+            writer.close()
+    if instrumentation.enabled():
+        instrumentation.count("bytes_written", os.path.getsize(output_path))
+
+
+def _transform(action_ob: AbstractImageAction, image, pool: BufferPool = None) -> tuple:
+    # Compute stage, returns the result and the pool buffer holding it, if any
+    spec = action_ob.output_spec(image.shape, image.dtype)
+
+    out = None
+    if action_ob.supports_inplace and image.flags.writeable and spec == (image.shape, image.dtype):
+        out = image
+    elif pool is not None and action_ob.needs_output_buffer:
+        out = pool.acquire(*spec)
+
+    # Pipelines time each of their steps
+    names = ("compute",) if isinstance(action_ob, Pipeline) else ("compute", f"action:{type(action_ob).__name__}")
+    try:
+        with instrumentation.timer(*names):
+            return action_ob.apply(image, out=out), (None if out is image else out)
+    except Exception:
+        if out is not None and out is not image:
+            pool.release(out)
+        raise
+
+
+def _save(output_path, image_transformed, buffer, pool: BufferPool = None) -> None:
+    # Write stage, hands the output buffer back to the pool once encoded
+    try:
+        UnifiedIO.write(output_path, image_transformed)
+    finally:
+        if buffer is not None:
+            pool.release(buffer)
+
+
+def _load_or_fetch(action_ob: AbstractImageAction, input_path, output_path, strip_bytes: int = None,
+                   cache: ResultCache = None) -> tuple:
+    # Read stage of run_staged, the image is None when the result was taken from the cache
+    key = None
+    if cache is not None:
+        key = cache.key(input_path, action_ob, output_path)
+        if cache.fetch(key, output_path):
+            return None, None, key
+    return _load(action_ob, input_path, strip_bytes) + (key,)
+
+
+def _save_and_store(output_path, image_transformed, buffer, pool: BufferPool = None, cache: ResultCache = None,
+                    key: str = None) -> None:
+    # Write stage of run_staged
+    _save(output_path, image_transformed, buffer, pool)
+    if cache is not None:
+        cache.store(key, output_path)
+
+
+def run_staged(action_ob: AbstractImageAction, input_paths, output_paths, io_threads: int = 2,
+               queue_depth: int = 4, strip_bytes: int = None, cache: ResultCache = None):
+    """
+    Applies an action to a batch of images, overlapping decoding, computing and encoding.
+
+    Images are decoded by a pool of reader threads and encoded and saved by a pool of writer threads while
+    the calling thread applies the action. PIL and OpenCV release the GIL in their codecs, so disk and
+    network reads and encoding run alongside the computation.
+
+    At most ``queue_depth`` images are decoded ahead of the computation, and at most ``queue_depth``
+    results wait to be written, which caps the memory in use.
+
+    :param action_ob: The action to apply.
+    :param input_paths: The source image paths, a list or an iterable consumed as the images are read.
+    :param output_paths: The destination paths, one per source image.
+    :param io_threads: Number of reader threads, and of writer threads.
+    :param queue_depth: Maximum number of images waiting in each queue, at least 1.
+    :param strip_bytes: Optional memory budget of a strip, see :func:`process_image`.
+    :param cache: Optional result cache, see :func:`process_image`.
+    :return: A generator of ``(input_path, output_path, error)`` tuples in input order, ``error`` is None on
+             success.
+    """
+    assert queue_depth >= 1, f"Expected a queue depth of at least 1, Instead got {queue_depth}"
+    pool = BufferPool(max_buffers=queue_depth + 1)
+    # Paths are taken from the iterables only as reads are submitted
+    jobs = zip(input_paths, output_paths)
+    next_job = next(jobs, None)
+    reads = deque()
+    writes = deque()
+
+    with ThreadPoolExecutor(io_threads, thread_name_prefix="reader") as readers, \
+            ThreadPoolExecutor(io_threads, thread_name_prefix="writer") as writers:
+        while next_job is not None or reads:
+            while next_job is not None and len(reads) < queue_depth:
+                input_path, output_path = next_job
+                next_job = next(jobs, None)
+                reads.append((input_path, output_path, time.perf_counter(),
+                              readers.submit(_load_or_fetch, action_ob, input_path, output_path, strip_bytes, cache)))
+
+            input_path, output_path, started, read = reads.popleft()
+            try:
+                image, plan, key = read.result()
+                write = None
+                if plan is not None:
+                    _apply_tiled(image, plan, output_path)
+                    if cache is not None:
+                        cache.store(key, output_path)
+                elif image is not None:
+                    write = writers.submit(_save_and_store, output_path, *_transform(action_ob, image, pool), pool,
+                                           cache, key)
+                writes.append((input_path, output_path, started, write, None))
+            except Exception as e:
+                writes.append((input_path, output_path, started, None, e))
+            # Only the queues keep images alive while waiting for the writers
+            image = plan = None
+
+            while len(writes) > queue_depth or writes and next_job is None and not reads:
+                yield _finish_write(*writes.popleft())
+
+
+def _finish_write(input_path, output_path, started, write, error) -> tuple:
+    if write is not None:
+        try:
+            write.result()
+        except Exception as e:
+            error = e
+    # Latency from the submission of the read, waiting in the queues included
+    instrumentation.record("image", time.perf_counter() - started)
+    return input_path, output_path, error
+
+
+def estimate_cost(path) -> int:
+    """
+    Estimates the relative cost of processing an image.
+
+    The pixel count from the image header is used when it can be read, as it reflects the decoded size
+    independently of the compression. Otherwise the file size is used.
+
+    :param path: Path of the source image.
+    :return: The estimated cost, larger is more expensive.
+    """
+    # Only parallel batches need PIL here, the formats used import it otherwise
+    from PIL import Image
+
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            return width * height * len(img.getbands())
+    except Exception:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+
+def schedule_largest_first(input_paths: list) -> list:
+    """
+    Orders the indices of the input paths so that the most expensive images come first.
+
+    Handing out the largest images first avoids a single large image at the end of the batch keeping one
+    worker busy while the others sit idle. Ties keep the input order, so the schedule is deterministic.
+
+    :param input_paths: The source image paths.
+    :return: The indices of ``input_paths``, largest image first.
+    """
+    costs = [estimate_cost(path) for path in input_paths]
+    return sorted(range(len(input_paths)), key=lambda i: -costs[i])
+
+
+def _init_worker(action_ob: AbstractImageAction, strip_bytes: int = None, cache: ResultCache = None,
+                 stats: bool = False, profile: str = None) -> None:
+    global _worker_action, _worker_pool, _worker_strip_bytes, _worker_cache
+    UnifiedIO.set_encoding_profile(profile)
+    _worker_action = action_ob
+    _worker_pool = BufferPool()
+    _worker_strip_bytes = strip_bytes
+    _worker_cache = cache.detach() if cache is not None else None
+    if stats:
+        instrumentation.enable()
+
+
+def _process_job(input_path, output_path):
+    # Returns the error, if any, whether the result was taken from the cache, the cache entries used and the
+    # statistics of the job
+    try:
+        error, hit = None, process_image(_worker_action, input_path, output_path, _worker_pool,
+                                         _worker_strip_bytes, _worker_cache)
+    except Exception as e:
+        error, hit = e, None
+    uses = _worker_cache.take_uses() if _worker_cache is not None else None
+    stats = instrumentation.get_stats()
+    return error, hit, uses, (stats.snapshot(reset=True) if stats is not None else None)
+
+
+def run_batch(action_ob: AbstractImageAction, input_paths, output_paths, jobs: int = 1,
+              strip_bytes: int = None, io_threads: int = 0, queue_depth: int = 4, cache: ResultCache = None):
+    """
+    Applies an action to a batch of images.
+
+    With ``jobs`` greater than one the images are processed by a pool of worker processes, largest image
+    first when the paths are given as lists. In a single process, ``io_threads`` overlaps decoding and encoding
+    with the computation, see :func:`run_staged`. Results are always reported in input order.
+
+    The paths may also be given as iterators, e.g. generators walking a directory. They are then consumed as
+    images are processed, so the first results are reported before every path is known and memory does not
+    grow with the number of images. Worker processes are then fed in input order, ``queue_depth`` images
+    per worker ahead of the results.
+
+    :param action_ob: The action to apply.
+    :param input_paths: The source image paths, a list or an iterable.
+    :param output_paths: The destination paths, one per source image, a list or an iterable.
+    :param jobs: Number of worker processes, 0 uses one per CPU core.
+    :param strip_bytes: Optional memory budget of a strip, see :func:`process_image`.
+    :param io_threads: Number of reader and writer threads of a single process, 0 processes the images one
+                       after the other.
+    :param queue_depth: Maximum number of images, at least 1, waiting to be computed, and to be written, with
+                        ``io_threads``, or submitted per worker process when the paths are iterators.
+    :param cache: Optional result cache, see :func:`process_image`. Its counters include the lookups of
+                  the worker processes.
+    :return: A generator of ``(input_path, output_path, error)`` tuples, ``error`` is None on success.
+    """
+    assert queue_depth >= 1, f"Expected a queue depth of at least 1, Instead got {queue_depth}"
+    for input_path, output_path, error in _run_batch(action_ob, input_paths, output_paths, jobs, strip_bytes,
+                                                     io_threads, queue_depth, cache):
+        instrumentation.count("images")
+        if error is not None:
+            instrumentation.count("errors")
+        yield input_path, output_path, error
+
+
+def _run_batch(action_ob: AbstractImageAction, input_paths, output_paths, jobs: int, strip_bytes: int,
+               io_threads: int, queue_depth: int, cache: ResultCache):
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    # Lists can be scheduled as a whole, other iterables are consumed as their paths are produced
+    sized = hasattr(input_paths, "__len__")
+    single = jobs == 1 or sized and len(input_paths) <= 1
+
+    if single and io_threads > 0:
+        yield from run_staged(action_ob, input_paths, output_paths, io_threads, queue_depth, strip_bytes, cache)
+        return
+
+    if single:
+        pool = BufferPool()
+        for input_path, output_path in zip(input_paths, output_paths):
+            try:
+                process_image(action_ob, input_path, output_path, pool, strip_bytes, cache)
+                yield input_path, output_path, None
+            except Exception as e:
+                yield input_path, output_path, e
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(action_ob, strip_bytes, cache, instrumentation.enabled(),
+                                       UnifiedIO.encoding_profile)) as executor:
+        if sized:
+            schedule = schedule_largest_first(input_paths)
+            logger.info(f"Processing {len(input_paths)} images with {jobs} worker processes")
+            futures = {}
+            for i in schedule:
+                futures[i] = executor.submit(_process_job, input_paths[i], output_paths[i])
+            for i in range(len(input_paths)):
+                yield input_paths[i], output_paths[i], _job_result(futures[i], cache)
+            return
+
+        # At most queue_depth images per worker are submitted ahead of the results
+        logger.info(f"Processing images with {jobs} worker processes as they are found")
+        submitted = deque()
+        for input_path, output_path in zip(input_paths, output_paths):
+            submitted.append((input_path, output_path, executor.submit(_process_job, input_path, output_path)))
+            if len(submitted) >= jobs * queue_depth:
+                input_path, output_path, future = submitted.popleft()
+                yield input_path, output_path, _job_result(future, cache)
+        while submitted:
+            input_path, output_path, future = submitted.popleft()
+            yield input_path, output_path, _job_result(future, cache)
+
+
+def _job_result(future, cache: ResultCache):
+    # Waits for a job of a worker process, merges its counters, cache uses and statistics and returns its error
+    try:
+        error, cached, uses, worker_stats = future.result()
+    except Exception as e:
+        error, cached, uses, worker_stats = e, None, None, None
+    if cache is not None and cached is not None:
+        cache.count(cached)
+    if cache is not None and uses:
+        cache.record_uses(uses)
+    stats = instrumentation.get_stats()
+    if stats is not None and worker_stats is not None:
+        stats.merge(worker_stats)
+    return error
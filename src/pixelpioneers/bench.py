@@ -0,0 +1,254 @@
+import logging
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from pixelpioneers import __version__
+from pixelpioneers.actions.unified_actions import UnifiedActions
+from pixelpioneers.image_io._abstract_io import ENCODING_PROFILES
+from pixelpioneers.image_io.unified_io import UnifiedIO
+
+logger = logging.getLogger(__name__)
+
+# Default image sizes in megapixels, from thumbnails to large scans
+DEFAULT_RESOLUTIONS = (0.3, 3, 12, 50)
+
+# Channel layouts of the synthetic images
+LAYOUTS = {
+    "gray": 1,
+    "rgb": 3,
+}
+
+# Arguments of the registered actions, built from the (height, width) of the image they are applied to
+ACTION_ARGS = {
+    "brightness": lambda height, width: {"value": 20},
+    "contrast": lambda height, width: {"factor": 1.5},
+    "saturation": lambda height, width: {"factor": 1.5},
+    "crop": lambda height, width: {"x1": width // 4, "y1": height // 4, "x2": width * 3 // 4, "y2": height * 3 // 4},
+    "flip": lambda height, width: {"mode": "horizontal"},
+    "resize": lambda height, width: {"width": max(1, width // 2), "height": max(1, height // 2)},
+    "rotate": lambda height, width: {"angle": 30},
+}
+
+
+def synthetic_image(megapixels: float, channels: int, seed: int = 0) -> np.ndarray:
+    """
+    Generates a 4:3 test image of smooth gradients with noise on top.
+
+    Unlike pure noise, the gradients compress like a photograph would, so the encoders are timed on realistic
+    content.
+
+    :param megapixels: Size of the image in millions of pixels.
+    :param channels: Number of channels, 1 gives a HxW grayscale image.
+    :param seed: Seed of the noise, the same seed gives the same image.
+    :return: The uint8 image.
+    """
+    height = max(1, round((megapixels * 1e6 * 3 / 4) ** 0.5))
+    width = max(1, round(megapixels * 1e6 / height))
+    rows = np.linspace(0, 191, height).astype(np.uint8)[:, np.newaxis]
+    cols = np.linspace(0, 191, width).astype(np.uint8)[np.newaxis, :]
+    gradients = [rows // 2 + cols // 2, rows + np.zeros_like(cols), cols + np.zeros_like(rows)]
+
+    image = np.stack(gradients[:channels], axis=-1) if channels > 1 else gradients[0]
+    image += np.random.default_rng(seed).integers(0, 64, image.shape, dtype=np.uint8)
+    return image
+
+
+def measure(func, repeat: int) -> tuple:
+    """
+    Times a function and measures the memory it allocates.
+
+    A first call, traced with :mod:`tracemalloc`, measures the peak memory and warms up the caches, the timed
+    calls follow without tracing. Memory allocated by NumPy, and by OpenCV for the arrays it returns, is
+    traced, scratch memory internal to OpenCV and the codecs is not.
+
+    :param func: Function called without arguments.
+    :param repeat: Number of timed calls.
+    :return: ``(timings, peak_bytes)`` with the duration of each call in seconds.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings, peak_bytes
+
+
+def _result(name: str, megapixels: float, layout: str, image: np.ndarray, timings: list, peak_bytes: int) -> dict:
+    median = float(np.median(timings))
+    return {
+        "name": name,
+        "megapixels": megapixels,
+        "layout": layout,
+        "shape": list(image.shape),
+        "runs": len(timings),
+        "median_ms": round(median * 1e3, 3),
+        "p95_ms": round(float(np.percentile(timings, 95)) * 1e3, 3),
+        "megapixels_per_s": round(image.shape[0] * image.shape[1] / 1e6 / median, 3) if median > 0 else None,
+        "peak_memory_mb": round(peak_bytes / 2 ** 20, 3),
+    }
+
+
+def run_encoding_benchmarks(sample_paths: list, formats=None, repeat: int = 5) -> list:
+    """
+    Times the writing of sample images with every encoding profile and measures the size of the files.
+
+    Only the formats whose encoder has options are timed, combinations a format does not support are skipped.
+
+    :param sample_paths: Paths of the sample images, typically the images of ``data/``.
+    :param formats: File extensions to time, every format with encoding profiles by default.
+    :param repeat: Number of timed runs of each benchmark.
+    :return: One result per image, format and profile, holding the median and 95th percentile latency, the
+             size of the file and its size relative to the ``balanced`` profile.
+    """
+    formats = list(UnifiedIO.io_handlers) if formats is None else formats
+    formats = [extension for extension in formats if UnifiedIO.io_handlers[extension].encoding_profiles]
+    results = []
+
+    tmp_dir = tempfile.mkdtemp(prefix="pixelpioneers-bench-")
+    try:
+        for sample_path in sample_paths:
+            image = UnifiedIO.read(sample_path)
+            for extension in formats:
+                path = os.path.join(tmp_dir, "image" + extension)
+                profile_results = []
+                for profile in ENCODING_PROFILES:
+                    try:
+                        timings, _ = measure(lambda: UnifiedIO.write(path, image, profile), repeat)
+                    except Exception as e:
+                        logger.info(f"Skipping {extension} for {sample_path}: {e}")
+                        break
+                    profile_results.append({
+                        "name": f"encode:{extension}:{profile}",
+                        "image": os.path.basename(sample_path),
+                        "shape": list(image.shape),
+                        "runs": len(timings),
+                        "median_ms": round(float(np.median(timings)) * 1e3, 3),
+                        "p95_ms": round(float(np.percentile(timings, 95)) * 1e3, 3),
+                        "bytes": os.path.getsize(path),
+                    })
+                else:
+                    balanced_bytes = profile_results[ENCODING_PROFILES.index("balanced")]["bytes"]
+                    for result in profile_results:
+                        result["size_vs_balanced"] = round(result["bytes"] / balanced_bytes, 3)
+                    results.extend(profile_results)
+            logger.info(f"Benchmarked the encoding profiles on {sample_path}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return results
+
+
+def run_benchmarks(resolutions=DEFAULT_RESOLUTIONS, layouts=tuple(LAYOUTS), actions=None, formats=None,
+                   repeat: int = 5, sample_paths: list = None) -> dict:
+    """
+    Times every registered action and the reading and writing of every image format on synthetic images.
+
+    Combinations an action or format does not support are skipped.
+
+    :param resolutions: Image sizes in megapixels.
+    :param layouts: Channel layouts, keys of :data:`LAYOUTS`.
+    :param actions: Names of the actions to time, all actions of :attr:`UnifiedActions.actions` by default.
+    :param formats: File extensions to time, all formats of :attr:`UnifiedIO.io_handlers` by default.
+    :param repeat: Number of timed runs of each benchmark.
+    :param sample_paths: Optional sample images the encoding profiles are compared on, see
+                         :func:`run_encoding_benchmarks`.
+    :return: JSON-serializable report with the environment and one result per benchmark, holding the median
+             and 95th percentile latency, the throughput in megapixels per second and the peak memory. The
+             ``encoding`` results compare the encoding profiles when sample images are given.
+    """
+    actions = list(UnifiedActions.actions) if actions is None else actions
+    formats = list(UnifiedIO.io_handlers) if formats is None else formats
+    results = []
+
+    # Reads must decode the file every time
+    decoded_cache, UnifiedIO.decoded_cache = UnifiedIO.decoded_cache, None
+    tmp_dir = tempfile.mkdtemp(prefix="pixelpioneers-bench-")
+    try:
+        for megapixels in resolutions:
+            for layout in layouts:
+                image = synthetic_image(megapixels, LAYOUTS[layout])
+                height, width = image.shape[:2]
+
+                for name in actions:
+                    make_args = ACTION_ARGS.get(name, lambda height, width: {})
+                    action_ob = UnifiedActions.get_action_instance(name, make_args(height, width))
+                    try:
+                        timings, peak_bytes = measure(lambda: action_ob.apply(image), repeat)
+                    except Exception as e:
+                        logger.info(f"Skipping {name} on {layout} images: {e}")
+                        continue
+                    results.append(_result(f"action:{name}", megapixels, layout, image, timings, peak_bytes))
+
+                for extension in formats:
+                    path = os.path.join(tmp_dir, "image" + extension)
+                    try:
+                        timings, peak_bytes = measure(lambda: UnifiedIO.write(path, image), repeat)
+                    except Exception as e:
+                        logger.info(f"Skipping {extension} on {layout} images: {e}")
+                        continue
+                    results.append(_result(f"write:{extension}", megapixels, layout, image, timings, peak_bytes))
+                    timings, peak_bytes = measure(lambda: UnifiedIO.read(path), repeat)
+                    results.append(_result(f"read:{extension}", megapixels, layout, image, timings, peak_bytes))
+                    os.remove(path)
+                logger.info(f"Benchmarked {megapixels} MP {layout} images")
+    finally:
+        UnifiedIO.decoded_cache = decoded_cache
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    encoding = run_encoding_benchmarks(sample_paths, formats, repeat) if sample_paths else []
+
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "results": results,
+        "encoding": encoding,
+    }
+
+
+def compare_results(report: dict, baseline: dict, tolerance: float = 0.1) -> list:
+    """
+    Finds the benchmarks that got slower than in a baseline report.
+
+    Benchmarks are matched by name, resolution and layout, those missing from either report are ignored.
+    Medians are compared, they are less sensitive to outliers than the 95th percentiles.
+
+    :param report: Report returned by :func:`run_benchmarks`.
+    :param baseline: Earlier report to compare with.
+    :param tolerance: Relative slowdown tolerated before a benchmark counts as a regression, 0.1 is 10%.
+    :return: One entry per regression with the baseline and current medians and the relative change.
+    """
+    baseline_results = {(r["name"], r["megapixels"], r["layout"]): r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        previous = baseline_results.get((result["name"], result["megapixels"], result["layout"]))
+        if previous is None or not previous["median_ms"]:
+            continue
+        change = result["median_ms"] / previous["median_ms"] - 1
+        if change > tolerance:
+            regressions.append({
+                "name": result["name"],
+                "megapixels": result["megapixels"],
+                "layout": result["layout"],
+                "baseline_ms": previous["median_ms"],
+                "median_ms": result["median_ms"],
+                "change": round(change, 3),
+            })
+    return regressions
@@ -0,0 +1,69 @@
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+
+class BufferPool:
+    """
+    Pool of reusable image buffers keyed by shape and data type.
+
+    Batches of same-size images need an output buffer of the same size for every image, handing a released
+    buffer back out avoids allocating (and page faulting) a fresh array per image.
+
+    :param max_buffers: Maximum number of idle buffers kept per shape and data type.
+    :type max_buffers: int
+    """
+
+    def __init__(self, max_buffers: int = 2):
+        """
+        Initialize the BufferPool instance.
+
+        :param max_buffers: Maximum number of idle buffers kept per shape and data type.
+        :type max_buffers: int
+        """
+        self.max_buffers = max_buffers
+        self.hits = 0
+        self.misses = 0
+        self._buffers = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def acquire(self, shape: tuple, dtype: np.dtype) -> np.ndarray:
+        """
+        Hand out a buffer of the given shape and type, reusing a released one when possible.
+
+        The content of the buffer is undefined.
+
+        :param shape: Shape of the buffer.
+        :type shape: tuple
+        :param dtype: Data type of the buffer.
+        :type dtype: np.dtype
+        :return: A writeable C-contiguous buffer.
+        :rtype: np.ndarray
+        """
+        key = (tuple(shape), np.dtype(dtype))
+        with self._lock:
+            if self._buffers[key]:
+                self.hits += 1
+                return self._buffers[key].pop()
+            self.misses += 1
+        return np.empty(key[0], dtype=key[1])
+
+    def release(self, buffer: np.ndarray) -> None:
+        """
+        Return a buffer to the pool once its content is no longer needed.
+
+        :param buffer: A buffer previously handed out by :meth:`acquire`.
+        :type buffer: np.ndarray
+        """
+        key = (buffer.shape, buffer.dtype)
+        with self._lock:
+            if len(self._buffers[key]) < self.max_buffers:
+                self._buffers[key].append(buffer)
+
+    def clear(self) -> None:
+        """
+        Drop every idle buffer.
+        """
+        with self._lock:
+            self._buffers.clear()
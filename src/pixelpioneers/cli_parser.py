@@ -1,14 +1,53 @@
 import argparse
 import logging
+import sys
+from argparse import _HelpAction, _SubParsersAction
+
+# Encoding profiles of the image writers, see UnifiedIO.set_encoding_profile
+ENCODING_PROFILES = ["fast", "balanced", "small"]
+
+# Working precisions of an action pipeline, see Pipeline
+PRECISIONS = ["native", "float32"]
+
+# Separates the steps of an action pipeline, e.g. "resize 800 600 : grayscale : brightness 20"
+ACTION_SEPARATOR = ":"
+
+
+def non_negative_int(value: str) -> int:
+    # Argument type of counts and sizes where 0 has a meaning of its own and negative values have none
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"expected an integer >= 0, got {value}")
+    return number
+
+
+def positive_int(value: str) -> int:
+    # Argument type of counts that must be at least 1
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected an integer >= 1, got {value}")
+    return number
 
 
 class MyArgumentParser(argparse.ArgumentParser):
-    def parse_args(self, *args, **kw):
-        res = argparse.ArgumentParser.parse_args(self, *args, **kw)
-        from argparse import _HelpAction, _SubParsersAction
-        for x in parser._subparsers._actions:
+    def parse_args(self, args=None, namespace=None):
+        if args is None:
+            args = sys.argv[1:]
+
+        # Split the command line into the global options plus first action, and the chained actions
+        segments = [[]]
+        for arg in args:
+            if arg == ACTION_SEPARATOR:
+                segments.append([])
+            else:
+                segments[-1].append(arg)
+
+        res = argparse.ArgumentParser.parse_args(self, segments[0], namespace)
+        for x in self._subparsers._actions:
             if not isinstance(x, _SubParsersAction):
                 continue
+            if res.action is None:
+                self.error("an action is required")
             v = x.choices[res.action]  # select the subparser name
             action_args = {}
             for x1 in v._optionals._actions:  # loop over the actions
@@ -19,6 +58,15 @@ class MyArgumentParser(argparse.ArgumentParser):
                     action_args[n] = getattr(res, n)
                     delattr(res, n)
             res.action_args = action_args
+            res.actions = [(res.action, action_args)]
+
+            for segment in segments[1:]:
+                if len(segment) == 0 or segment[0] not in x.choices:
+                    self.error(f"invalid pipeline step: '{' '.join(segment)}' "
+                               f"(choose from {', '.join(map(repr, x.choices))})")
+                step_parser = x.choices[segment[0]]
+                step_args = vars(argparse.ArgumentParser.parse_args(step_parser, segment[1:]))
+                res.actions.append((segment[0], step_args))
         return res
 
 
@@ -37,8 +85,45 @@ logging_arg_group.add_argument(
     action="store_const", dest="loglevel", const=logging.INFO,
 )
 
-parser.add_argument("-i", "--images", nargs="+", required=True, help="List of source images")
+parser.add_argument("-i", "--images", nargs="+", required=True,
+                    help="List of source images, directories and quoted glob patterns, images of directories and "
+                         "patterns are filtered by extension and processed as they are found")
+parser.add_argument("-r", "--recursive", action="store_true",
+                    help="Walk the subdirectories of the source directories, and match ** in patterns, keeping "
+                         "their layout under the destination directory")
 parser.add_argument("-dest", required=True, type=str, help="Destination directory")
+parser.add_argument("--incremental", action="store_true",
+                    help="Record the completed images in a manifest of the destination directory and skip the "
+                         "images whose result is up to date, to resume an interrupted run or update a previous one")
+parser.add_argument("-j", "--jobs", type=non_negative_int, default=1,
+                    help="Number of worker processes, 0 = one per CPU core (default: 1)")
+parser.add_argument("--io-threads", type=non_negative_int, default=0, metavar="N",
+                    help="Number of reader and writer threads overlapping decoding and encoding with the "
+                         "computation, 0 = process images one after the other (default: 0)")
+parser.add_argument("--queue-depth", type=positive_int, default=4, metavar="N",
+                    help="Maximum number of decoded images, and of results, waiting with --io-threads (default: 4)")
+parser.add_argument("--strip-budget", type=non_negative_int, default=0, metavar="MB",
+                    help="Memory budget in MB of a strip when processing large images strip by strip, which saves "
+                         "memory with BMP and NPY files, 0 = always process whole images (default: 0)")
+parser.add_argument("--cache-dir", type=str, default=None, metavar="DIR",
+                    help="Directory of a result cache, results of unchanged images and actions are copied from it "
+                         "instead of being computed again")
+parser.add_argument("--cache-size", type=non_negative_int, default=1024, metavar="MB",
+                    help="Size cap in MB of the result cache, the least recently used results are evicted "
+                         "(default: 1024)")
+parser.add_argument("--cache-link", action="store_true",
+                    help="Hard-link cached results to the destination instead of copying them")
+parser.add_argument("--profile", choices=ENCODING_PROFILES, default=None,
+                    help="Encoding profile of the results: fast encodes quickest, small gives the smallest files "
+                         "(default: balanced)")
+parser.add_argument("--precision", choices=PRECISIONS, default="native",
+                    help="Working precision of the actions: native rounds the image to uint8 after every action, "
+                         "float32 passes float values between them and rounds the result once (default: native)")
+parser.add_argument("--stats", action="store_true",
+                    help="Print the time spent per stage and action, the throughput and the latency histogram at "
+                         "the end of the run")
+parser.add_argument("--stats-json", type=str, default=None, metavar="FILE",
+                    help="Write the statistics of the run to a JSON file")
 
 subparser = parser.add_subparsers(dest="action")
 
@@ -52,7 +137,10 @@ saturation_parser = subparser.add_parser("saturation")
 saturation_parser.add_argument("factor", type=float, help="Saturation Factor")
 
 crop_parser = subparser.add_parser("crop")
-crop_parser.add_argument("box", type=list, help="Bounding box (x1, y1, x2, y2)")
+crop_parser.add_argument("x1", type=int, help="Left edge of the bounding box")
+crop_parser.add_argument("y1", type=int, help="Top edge of the bounding box")
+crop_parser.add_argument("x2", type=int, help="Right edge (exclusive) of the bounding box")
+crop_parser.add_argument("y2", type=int, help="Bottom edge (exclusive) of the bounding box")
 
 flip_parser = subparser.add_parser("flip")
 flip_parser.add_argument("mode", type=str, choices=["vertical", "horizontal"],
@@ -67,6 +155,48 @@ resize_parser.add_argument("width", type=int, help="new width")
 resize_parser.add_argument("height", type=int, help="new height")
 
 rotate_parser = subparser.add_parser("rotate")
-rotate_parser.add_argument("angle", type=int, help="Angle in degrees")
-
-args = parser.parse_args()
+rotate_parser.add_argument("angle", type=int, help="Angle in degrees, counterclockwise. Multiples of 90 are exact")
+
+# "pixelpioneers bench ..." times the actions and image formats instead of processing images
+bench_parser = argparse.ArgumentParser(prog="pixelpioneers bench",
+                                       description="Time the actions and image formats on synthetic images")
+bench_parser.add_argument("-v", "--verbose", help="Report the progress", action="store_const", dest="loglevel",
+                          const=logging.INFO, default=logging.WARNING)
+bench_parser.add_argument("--resolutions", nargs="+", type=float, default=[0.3, 3, 12, 50], metavar="MP",
+                          help="Image sizes in megapixels (default: 0.3 3 12 50)")
+bench_parser.add_argument("--layouts", nargs="+", choices=["gray", "rgb"], default=["gray", "rgb"],
+                          help="Channel layouts of the images (default: gray rgb)")
+bench_parser.add_argument("--actions", nargs="+", default=None, metavar="ACTION",
+                          help="Actions to time (default: all)")
+bench_parser.add_argument("--formats", nargs="+", default=None, metavar="EXT",
+                          help="Image formats to time, by file extension e.g. .png (default: all)")
+bench_parser.add_argument("--samples", nargs="+", default=None, metavar="FILE",
+                          help="Sample images the encoding profiles are compared on (default: the images of ./data "
+                               "if it exists)")
+bench_parser.add_argument("--repeat", type=int, default=5, metavar="N",
+                          help="Number of timed runs of each benchmark (default: 5)")
+bench_parser.add_argument("-o", "--output", type=str, default=None, metavar="FILE",
+                          help="Write the JSON report to a file instead of the standard output")
+bench_parser.add_argument("--compare", type=str, default=None, metavar="BASELINE",
+                          help="JSON report of an earlier run, exit with status 1 if a benchmark got slower")
+bench_parser.add_argument("--tolerance", type=float, default=10, metavar="PCT",
+                          help="Slowdown in percent tolerated by --compare (default: 10)")
+
+# "pixelpioneers serve ..." answers requests on a socket, see pixelpioneers.server
+serve_parser = argparse.ArgumentParser(prog="pixelpioneers serve",
+                                       description="Process images on request, over a Unix domain socket")
+serve_parser.add_argument("-v", "--verbose", help="Log the requests", action="store_const", dest="loglevel",
+                          const=logging.INFO, default=logging.WARNING)
+serve_parser.add_argument("--socket", type=str, required=True, metavar="PATH", help="Path of the Unix domain socket")
+serve_parser.add_argument("-w", "--workers", type=positive_int, default=1, metavar="N",
+                          help="Number of images processed at once (default: 1)")
+serve_parser.add_argument("--processes", action="store_true",
+                          help="Process the images in worker processes instead of threads")
+serve_parser.add_argument("--max-queue", type=positive_int, default=64, metavar="N",
+                          help="Maximum number of images waiting or in progress, requests beyond are rejected "
+                               "(default: 64)")
+serve_parser.add_argument("--profile", choices=ENCODING_PROFILES, default=None,
+                          help="Encoding profile of the results (default: balanced)")
+serve_parser.add_argument("--strip-budget", type=non_negative_int, default=0, metavar="MB",
+                          help="Memory budget in MB of a strip when processing large images strip by strip, which "
+                               "saves memory with BMP and NPY files, 0 = always process whole images (default: 0)")
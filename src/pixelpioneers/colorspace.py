@@ -0,0 +1,59 @@
+import cv2
+import numpy as np
+
+
+def _as_image(array: np.ndarray) -> np.ndarray:
+    # OpenCV works on HxWx3 images, other leading dimensions are folded into the rows
+    if array.ndim == 3:
+        return array
+    if array.ndim < 3:
+        return array.reshape(-1, 1, 3)
+    return array.reshape(-1, array.shape[-2], 3)
+
+
+def _output_buffer(array: np.ndarray, out: np.ndarray) -> np.ndarray:
+    assert array.shape[-1] == 3, f"Expected 3 channels, Instead got {array.shape[-1]} channels"
+    if out is None:
+        return np.empty(array.shape, dtype=np.float32)
+    assert out.shape == array.shape, f"Expected an output buffer of shape {array.shape}, Instead got {out.shape}"
+    assert out.dtype == np.float32, f"Expected a float32 output buffer, Instead got {out.dtype}"
+    assert out.flags.c_contiguous, "Expected a C-contiguous output buffer"
+    return out
+
+
+def rgb_to_hsv(rgb: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Converts RGB values to HSV, following the conventions of :func:`colorsys.rgb_to_hsv`.
+
+    The conversion works on whole arrays in float32, the last axis holds the three channels.
+
+    :param rgb: (..., 3) array of RGB values in [0, 1].
+    :param out: Optional C-contiguous float32 (..., 3) buffer for the result, may be ``rgb`` itself for an
+                in-place conversion.
+    :return: (..., 3) float32 array of HSV values in [0, 1].
+    """
+    out = _output_buffer(rgb, out)
+    cv2.cvtColor(_as_image(rgb.astype(np.float32, copy=False)), cv2.COLOR_RGB2HSV, dst=_as_image(out))
+    # OpenCV returns the hue in degrees
+    out[..., 0] *= np.float32(1 / 360)
+    return out
+
+
+def hsv_to_rgb(hsv: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Converts HSV values to RGB, following the conventions of :func:`colorsys.hsv_to_rgb`.
+
+    The conversion works on whole arrays in float32, the last axis holds the three channels.
+
+    :param hsv: (..., 3) array of HSV values in [0, 1].
+    :param out: Optional C-contiguous float32 (..., 3) buffer for the result, may be ``hsv`` itself for an
+                in-place conversion.
+    :return: (..., 3) float32 array of RGB values in [0, 1].
+    """
+    out = _output_buffer(hsv, out)
+    if out is not hsv:
+        np.copyto(out, hsv)
+    # OpenCV expects the hue in degrees
+    out[..., 0] *= 360
+    cv2.cvtColor(_as_image(out), cv2.COLOR_HSV2RGB, dst=_as_image(out))
+    return out
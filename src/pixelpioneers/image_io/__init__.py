@@ -1,9 +1,18 @@
-from ._bmp_io import BMPHandler
-from ._jpeg_io import JPEGHandler
-from ._png_io import PNGHandler
+from pixelpioneers.registry import lazy_module_getattr
 
 __all__ = [
     "BMPHandler",
+    "DecodedImageCache",
     "JPEGHandler",
+    "NPYHandler",
     "PNGHandler"
 ]
+
+# The handlers are imported on first access, only the formats used pay for their dependencies
+__getattr__ = lazy_module_getattr(__name__, {
+    "BMPHandler": "._bmp_io",
+    "DecodedImageCache": "._decoded_cache",
+    "JPEGHandler": "._jpeg_io",
+    "NPYHandler": "._npy_io",
+    "PNGHandler": "._png_io",
+})
@@ -1,7 +1,15 @@
+import os
 from abc import ABC, abstractmethod
 
 import numpy as np
 
+from pixelpioneers.precision import WORKING_DTYPE, quantize
+
+# Named encoding profiles, from the fastest encoding to the smallest file
+ENCODING_PROFILES = ("fast", "balanced", "small")
+# Profile used when none is given
+DEFAULT_ENCODING_PROFILE = "balanced"
+
 
 class AbstractImageReader(ABC):
     """
@@ -21,21 +29,189 @@ class AbstractImageReader(ABC):
         """
         pass
 
+    def read_reduced(self, path: str, size: tuple) -> np.ndarray:
+        """
+        Function to read an image that will be downscaled
+        Readers that can do so decode the image at a reduced resolution, at least the given size, by default
+        the image is decoded at full resolution.
+        :param str path: path of file to read
+        :param tuple size: smallest (width, height) needed by the caller
+        :return: np.ndarray - RGB image
+        """
+        return self.read(path)
+
+    def open(self, path: str, size_hint: tuple = None) -> np.ndarray:
+        """
+        Function to open an image for row-wise access
+        Readers that can do so return a memory-mapped array whose rows are only loaded when accessed,
+        by default the whole image is decoded.
+        :param str path: path of file to open
+        :param tuple size_hint: optional smallest (width, height) needed by the caller, see read_reduced
+        :return: np.ndarray - RGB image, possibly memory-mapped
+        """
+        if size_hint is not None:
+            return self.read_reduced(path, size_hint)
+        return self.read(path)
+
 
 class AbstractImageWriter(ABC):
     """
     Abstract Image Writer Class
     """
+    # Encoder options of each profile of ENCODING_PROFILES, formats without options leave it empty
+    encoding_profiles = {}
 
     def __init__(self):
         pass
 
     @abstractmethod
-    def write(self, path: str, image: np.ndarray) -> bool:
+    def write(self, path: str, image: np.ndarray, profile: str = None) -> bool:
         """
         Function used to write a given RGB array to file
         :param str path: destination file path
         :param np.ndarray image: RGB image array
+        :param str profile: name of the encoding profile, DEFAULT_ENCODING_PROFILE by default
         :return:
         """
         pass
+
+    def encoding_options(self, profile: str = None) -> dict:
+        """
+        Function giving the encoder options of a profile
+        :param str profile: name of the encoding profile, DEFAULT_ENCODING_PROFILE by default
+        :return: dict - keyword arguments of the encoder, empty if the format has no options
+        :raises AssertionError: if the profile is unknown
+        """
+        profile = profile or DEFAULT_ENCODING_PROFILE
+        assert profile in ENCODING_PROFILES, \
+            f"Unknown encoding profile: {profile} (choose from {', '.join(ENCODING_PROFILES)})"
+        return dict(self.encoding_profiles.get(profile, {}))
+
+    def open_writer(self, path: str, shape: tuple, dtype: np.dtype, profile: str = None) -> "AbstractStripWriter":
+        """
+        Function used to write an image strip by strip
+        Writers that can stream rows to the file override this, by default the strips are collected in
+        memory and the image is written when the strip writer is closed.
+        :param str path: destination file path
+        :param tuple shape: shape of the complete image
+        :param np.dtype dtype: data type of the image
+        :param str profile: name of the encoding profile, DEFAULT_ENCODING_PROFILE by default
+        :return: AbstractStripWriter - writer accepting the rows of the image
+        """
+        return BufferedStripWriter(self, path, shape, dtype, profile)
+
+
+class AbstractStripWriter(ABC):
+    """
+    Abstract Strip Writer Class, receives the rows of an image in strips
+    Usable as a context manager, the image is finalized when the context exits without error.
+    """
+
+    def __init__(self, path: str, shape: tuple, dtype: np.dtype):
+        self.path = path
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+
+    @abstractmethod
+    def write_rows(self, start: int, rows: np.ndarray) -> None:
+        """
+        Function used to write a strip of rows
+        :param int start: index of the first row of the strip
+        :param np.ndarray rows: rows of the image, the shape matches the image apart from the first axis
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> bool:
+        """
+        Function used to finalize the image once every row was written
+        :return: bool - True if the image was written
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+
+
+class BufferedStripWriter(AbstractStripWriter):
+    """
+    Strip writer for formats that can only be encoded as a whole, collects the strips in memory
+    """
+
+    def __init__(self, writer: AbstractImageWriter, path: str, shape: tuple, dtype: np.dtype, profile: str = None):
+        super(BufferedStripWriter, self).__init__(path, shape, dtype)
+        self.writer = writer
+        self.profile = profile
+        self.image = np.empty(self.shape, dtype=self.dtype)
+
+    def write_rows(self, start: int, rows: np.ndarray) -> None:
+        self.image[start:start + len(rows)] = rows.reshape((len(rows),) + self.shape[1:])
+
+    def close(self) -> bool:
+        return self.writer.write(self.path, self.image, self.profile)
+
+
+class QuantizingStripWriter(AbstractStripWriter):
+    """
+    Strip writer receiving the rows of a working precision image, quantized to uint8 for the wrapped writer
+    """
+
+    def __init__(self, writer: AbstractStripWriter):
+        super(QuantizingStripWriter, self).__init__(writer.path, writer.shape, WORKING_DTYPE)
+        self.writer = writer
+
+    def write_rows(self, start: int, rows: np.ndarray) -> None:
+        self.writer.write_rows(start, quantize(rows))
+
+    def close(self) -> bool:
+        return self.writer.close()
+
+
+class AtomicStripWriter(AbstractStripWriter):
+    """
+    Strip writer writing the image to a temporary file, renamed to the destination path once it is closed
+    Readers never see a partially written image, the destination is left untouched if the image is aborted.
+    """
+
+    def __init__(self, writer: AbstractStripWriter, path: str):
+        super(AtomicStripWriter, self).__init__(path, writer.shape, writer.dtype)
+        self.writer = writer
+
+    def write_rows(self, start: int, rows: np.ndarray) -> None:
+        self.writer.write_rows(start, rows)
+
+    def close(self) -> bool:
+        if self.writer is None:
+            return True
+        try:
+            written = self.writer.close()
+            os.replace(self.writer.path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+        self.writer = None
+        return written
+
+    def abort(self) -> None:
+        """
+        Function used to drop the image, removing the temporary file
+        :return:
+        """
+        if self.writer is None:
+            return
+        temporary_path, self.writer = self.writer.path, None
+        try:
+            os.unlink(temporary_path)
+        except FileNotFoundError:
+            pass
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -1,17 +1,126 @@
 import logging
+import os
+import struct
 
 import numpy as np
 from PIL import Image, UnidentifiedImageError
 
 from pixelpioneers.exceptions import ImageIOError
-from pixelpioneers.image_io._abstract_io import AbstractImageReader, AbstractImageWriter
+from pixelpioneers.image_io._abstract_io import AbstractImageReader, AbstractImageWriter, AbstractStripWriter
+from pixelpioneers.precision import to_uint8
 
 logger = logging.getLogger(__name__)
 
+# BITMAPFILEHEADER and BITMAPINFOHEADER
+_FILE_HEADER = struct.Struct("<2sIHHI")
+_INFO_HEADER = struct.Struct("<IiiHHIIiiII")
+_BI_RGB = 0
+# Pixels per metre written to the header, 72 DPI
+_RESOLUTION = 2835
+_GRAY_PALETTE = np.repeat(np.arange(256, dtype=np.uint8), 4).reshape(256, 4) * np.array([1, 1, 1, 0], np.uint8)
+
+
+def _row_stride(width: int, bits_per_pixel: int) -> int:
+    # Rows are padded to a multiple of 4 bytes
+    return (width * bits_per_pixel + 31) // 32 * 4
+
+
+def _pixel_view(buffer: np.ndarray, offset: int, width: int, height: int, bits_per_pixel: int) -> np.ndarray:
+    """
+    Builds a top-down RGB (or grayscale) view of the pixel rows of an uncompressed BMP without copying them.
+
+    Bottom-up rows are reversed through a negative row stride and BGR pixels through a reversed channel view.
+    """
+    top_down = height < 0
+    height = abs(height)
+    stride = _row_stride(width, bits_per_pixel)
+    if bits_per_pixel == 8:
+        view = np.ndarray((height, width), np.uint8, buffer, offset, (stride, 1))
+    else:
+        channels = bits_per_pixel // 8
+        view = np.ndarray((height, width, channels), np.uint8, buffer, offset, (stride, channels, 1))[..., 2::-1]
+    return view if top_down else view[::-1]
+
+
+def map_bmp(path: str):
+    """
+    Memory-maps the pixels of an uncompressed 24 or 32-bit BMP, or an 8-bit BMP with a grayscale palette.
+
+    :param str path: Path of the BMP file.
+    :return: Read-only HxWx3 RGB (or HxW grayscale) view of the file, None if the file needs to be decoded.
+    :rtype: np.ndarray
+    """
+    with open(path, "rb") as f:
+        header = f.read(_FILE_HEADER.size + _INFO_HEADER.size)
+        if len(header) < _FILE_HEADER.size + _INFO_HEADER.size:
+            return None
+        signature, _, _, _, offset = _FILE_HEADER.unpack_from(header)
+        (info_size, width, height, _, bits_per_pixel, compression, _, _, _, colors,
+         _) = _INFO_HEADER.unpack_from(header, _FILE_HEADER.size)
+        if signature != b"BM" or info_size < _INFO_HEADER.size or compression != _BI_RGB or width <= 0 \
+                or height == 0 or bits_per_pixel not in (8, 24, 32):
+            return None
+
+        if bits_per_pixel == 8:
+            colors = colors or 256
+            f.seek(_FILE_HEADER.size + info_size)
+            palette = np.frombuffer(f.read(colors * 4), dtype=np.uint8)
+            if colors != 256 or not np.array_equal(palette.reshape(-1, 4)[:, :3], _GRAY_PALETTE[:, :3]):
+                return None
+
+    if offset + _row_stride(width, bits_per_pixel) * abs(height) > os.path.getsize(path):
+        return None
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    return _pixel_view(buffer, offset, width, height, bits_per_pixel)
+
+
+class BMPStripWriter(AbstractStripWriter):
+    """
+    Strip writer storing the rows of a 24-bit RGB or 8-bit grayscale image directly in a memory-mapped BMP file
+    """
+
+    def __init__(self, path: str, shape: tuple, dtype: np.dtype):
+        super(BMPStripWriter, self).__init__(path, shape, dtype)
+        height, width = self.shape[:2]
+        bits_per_pixel = 8 if len(self.shape) == 2 else 24
+        palette = _GRAY_PALETTE.tobytes() if bits_per_pixel == 8 else b""
+        offset = _FILE_HEADER.size + _INFO_HEADER.size + len(palette)
+        image_size = _row_stride(width, bits_per_pixel) * height
+
+        with open(path, "wb") as f:
+            f.write(_FILE_HEADER.pack(b"BM", offset + image_size, 0, 0, offset))
+            f.write(_INFO_HEADER.pack(_INFO_HEADER.size, width, height, 1, bits_per_pixel, _BI_RGB, image_size,
+                                      _RESOLUTION, _RESOLUTION, len(palette) // 4, 0))
+            f.write(palette)
+            f.truncate(offset + image_size)
+
+        self._buffer = np.memmap(path, dtype=np.uint8, mode="r+")
+        self.image = _pixel_view(self._buffer, offset, width, height, bits_per_pixel)
+
+    @staticmethod
+    def supports(shape: tuple, dtype: np.dtype) -> bool:
+        """
+        Tells whether images of the given shape and type can be streamed, others are encoded by PIL.
+        """
+        return np.dtype(dtype) == np.uint8 and (len(shape) == 2 or len(shape) == 3 and shape[-1] == 3) \
+            and all(shape)
+
+    def write_rows(self, start: int, rows: np.ndarray) -> None:
+        self.image[start:start + len(rows)] = rows.reshape((len(rows),) + self.shape[1:])
+
+    def close(self) -> bool:
+        if self._buffer is not None:
+            self._buffer.flush()
+            self._buffer = self.image = None
+        return True
+
 
 class BMPHandler(AbstractImageReader, AbstractImageWriter):
     """
         BMPHandler class implements the AbstractImageReader and AbstractImageWriter interfaces to handle BMP image files.
+
+        Uncompressed 24/32-bit and 8-bit grayscale files are mapped directly instead of being decoded, other
+        files are decoded by PIL.
      """
 
     def read(self, path: str) -> np.ndarray:
@@ -23,8 +132,29 @@ class BMPHandler(AbstractImageReader, AbstractImageWriter):
         :rtype: np.ndarray
         :raises ImageIOError: If there is an error reading the image.
         """
+        image = self.open(path)
+        if not image.flags.writeable or not image.flags.c_contiguous:
+            # A single copy out of the mapped file
+            return np.ascontiguousarray(image)
+        return image
+
+    def open(self, path: str, size_hint: tuple = None) -> np.ndarray:
+        """
+        Open an image for row-wise access.
+
+        :param str path: Path of the image file to open.
+        :param tuple size_hint: Unused, mapping the file is cheaper than decoding it at a reduced size.
+        :return: The RGB image as a numpy ndarray, a read-only view of the file when it is uncompressed.
+        :rtype: np.ndarray
+        :raises ImageIOError: If there is an error reading the image.
+        """
         try:
             logger.debug(f"Reading Image from Path -> {path}")
+            image = map_bmp(path)
+            if image is not None:
+                return image
+
+            logger.debug("Compressed or palette BMP, decoding it")
             img = Image.open(path, formats=["bmp"])
             img_array = np.array(img)
             return img_array
@@ -41,22 +171,34 @@ class BMPHandler(AbstractImageReader, AbstractImageWriter):
             logger.error("Error reading image.")
             raise ImageIOError
 
-    def write(self, path: str, image: np.ndarray) -> bool:
+    def write(self, path: str, image: np.ndarray, profile: str = None) -> bool:
         """
         Write the given RGB image array to a file.
 
         :param str path: Destination file path to write the image.
-        :param np.ndarray image: The RGB image as a numpy ndarray.
+        :param np.ndarray image: The RGB image as a numpy ndarray, uint16 images are reduced to 8 bits.
+        :param str profile: Name of the encoding profile, BMP files are uncompressed whatever the profile.
         :return: True if the image is successfully written, False otherwise.
         :rtype: bool
         :raises ImageIOError: If there is an error writing the image.
         """
         try:
             logger.debug(f"Writing Image -> {path}")
+            self.encoding_options(profile)
+            image = to_uint8(image)
+            if BMPStripWriter.supports(image.shape, image.dtype):
+                with BMPStripWriter(path, image.shape, image.dtype) as writer:
+                    writer.write_rows(0, image)
+                return True
+
             img = Image.fromarray(image)
-            img.save(path)
+            img.save(path, format="BMP")
             return True
 
+        except AssertionError as ae:
+            logger.error(f"Error writing image: {ae}")
+            raise ImageIOError(f"Error writing image: {ae}")
+
         except IOError as ioe:
             logger.error(f"Error writing image: {ioe}")
             raise ImageIOError(f"Error writing image: {ioe}")
@@ -65,6 +207,27 @@ class BMPHandler(AbstractImageReader, AbstractImageWriter):
             logger.error("Error writing image.")
             raise ImageIOError
 
+    def open_writer(self, path: str, shape: tuple, dtype: np.dtype, profile: str = None) -> AbstractStripWriter:
+        """
+        Open a file to be written strip by strip.
+
+        :param str path: Destination file path to write the image.
+        :param tuple shape: Shape of the complete image.
+        :param np.dtype dtype: Data type of the image.
+        :param str profile: Name of the encoding profile, BMP files are uncompressed whatever the profile.
+        :return: The strip writer, rows are written straight to the file when the image is RGB or grayscale.
+        :rtype: AbstractStripWriter
+        :raises ImageIOError: If there is an error creating the file.
+        """
+        if not BMPStripWriter.supports(shape, dtype):
+            return super(BMPHandler, self).open_writer(path, shape, dtype, profile)
+        try:
+            return BMPStripWriter(path, shape, dtype)
+
+        except IOError as ioe:
+            logger.error(f"Error writing image: {ioe}")
+            raise ImageIOError(f"Error writing image: {ioe}")
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
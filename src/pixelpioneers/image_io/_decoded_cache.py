@@ -0,0 +1,124 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+
+class DecodedImageCache:
+    """
+    Memory-bounded LRU cache of decoded images.
+
+    Entries are keyed by the resolved path of the file along with its modification time, size and inode, so a
+    file replaced or modified on disk is decoded again. Cached images are read-only: every reader gets a read-only
+    view of the same array, an in-place action would otherwise alter the cached image. The flag of the views
+    cannot be set back since the cached array itself is never handed out.
+
+    :param max_bytes: Maximum total size of the cached images.
+    :type max_bytes: int
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the DecodedImageCache instance.
+
+        :param max_bytes: Maximum total size of the cached images.
+        :type max_bytes: int
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path, size_hint: tuple = None) -> tuple:
+        """
+        Compute the key of an image file.
+
+        :param path: Path of the image file.
+        :param size_hint: Size hint the image is decoded with, images decoded at a reduced size are distinct
+                          entries.
+        :return: The cache key.
+        :rtype: tuple
+        :raises FileNotFoundError: If the file does not exist.
+        """
+        path = Path(path).resolve()
+        stat = os.stat(path)
+        return str(path), stat.st_mtime_ns, stat.st_size, stat.st_ino, size_hint
+
+    def get(self, key: tuple):
+        """
+        Look up a decoded image, marking it as the most recently used one.
+
+        :param key: Key returned by :meth:`key`.
+        :return: The read-only image, None if it is not cached.
+        :rtype: np.ndarray
+        """
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _read_only_view(image)
+
+    def put(self, key: tuple, image: np.ndarray) -> np.ndarray:
+        """
+        Add a decoded image, evicting the least recently used images to stay within the size cap.
+
+        Images larger than the cap are not cached, they are returned as they are and stay writeable.
+
+        :param key: Key returned by :meth:`key`.
+        :param image: The decoded image, owned by the cache from now on if it is cached.
+        :return: The image, a read-only view of it if it was cached.
+        :rtype: np.ndarray
+        """
+        if image.nbytes > self.max_bytes:
+            return image
+
+        # Shared by every later read of the same file, only views of it are handed out
+        image.flags.writeable = False
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+            self._entries[key] = image
+            self.nbytes += image.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+        return _read_only_view(image)
+
+    def clear(self) -> None:
+        """
+        Drop every cached image.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        """
+        Report the cache statistics.
+
+        :return: The number of hits, misses and evictions, the number of cached images, their total size and
+                 the size cap.
+        :rtype: dict
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "nbytes": self.nbytes, "max_bytes": self.max_bytes}
+
+
+def _read_only_view(image: np.ndarray) -> np.ndarray:
+    # numpy refuses to make a view of a read-only array writeable again
+    view = image.view()
+    view.flags.writeable = False
+    return view
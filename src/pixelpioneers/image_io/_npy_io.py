@@ -0,0 +1,121 @@
+import logging
+
+import numpy as np
+
+from pixelpioneers.exceptions import ImageIOError
+from pixelpioneers.image_io._abstract_io import AbstractImageReader, AbstractImageWriter, AbstractStripWriter
+
+logger = logging.getLogger(__name__)
+
+
+class NPYHandler(AbstractImageReader, AbstractImageWriter):
+    """
+    NPYHandler class implements the AbstractImageReader and AbstractImageWriter interfaces to handle NumPy
+    ``.npy`` files.
+
+    The pixels are stored without any encoding, images are memory-mapped instead of decoded: opening them is
+    immediate and only the rows actually accessed are read from disk. Meant for intermediate results passed
+    between processing stages.
+    """
+
+    def read(self, path: str) -> np.ndarray:
+        """
+        Read an image from the given path.
+
+        :param str path: Path of the image file to read.
+        :return: The image as a read-only memory-mapped numpy ndarray.
+        :rtype: np.ndarray
+        :raises ImageIOError: If there is an error reading the image.
+        """
+        try:
+            logger.debug(f"Mapping Image from Path -> {path}")
+            image = np.load(path, mmap_mode="r", allow_pickle=False)
+            assert image.ndim in (2, 3), f"Expected a HxW or HxWxC image, Instead got {image.ndim} dimensions"
+            return image
+
+        except FileNotFoundError as fnfe:
+            logger.error(f"Error reading image: File '{path}' not found.")
+            raise ImageIOError(f"Error reading image: File '{path}' not found.")
+
+        except AssertionError as ae:
+            logger.error(f"Error reading image: {ae}")
+            raise ImageIOError(f"Error reading image: {ae}")
+
+        except ValueError as ve:
+            logger.error(f"Error reading image: Unrecognized file format.")
+            raise ImageIOError(f"Error reading image: Unrecognized file format.")
+
+        except Exception as e:
+            logger.error("Error reading image.")
+            raise ImageIOError
+
+    def write(self, path: str, image: np.ndarray, profile: str = None) -> bool:
+        """
+        Write the given image array to a file.
+
+        :param str path: Destination file path to write the image.
+        :param np.ndarray image: The image as a numpy ndarray.
+        :param str profile: Name of the encoding profile, arrays are stored as is whatever the profile.
+        :return: True if the image is successfully written, False otherwise.
+        :rtype: bool
+        :raises ImageIOError: If there is an error writing the image.
+        """
+        try:
+            logger.debug(f"Writing Image -> {path}")
+            assert image.ndim in (2, 3), f"Expected a HxW or HxWxC image, Instead got {image.ndim} dimensions"
+            self.encoding_options(profile)
+            with open(path, "wb") as f:
+                np.save(f, image, allow_pickle=False)
+            return True
+
+        except AssertionError as ae:
+            logger.error(f"Error writing image: {ae}")
+            raise ImageIOError(f"Error writing image: {ae}")
+
+        except IOError as ioe:
+            logger.error(f"Error writing image: {ioe}")
+            raise ImageIOError(f"Error writing image: {ioe}")
+
+        except Exception as e:
+            logger.error("Error writing image.")
+            raise ImageIOError
+
+    def open_writer(self, path: str, shape: tuple, dtype: np.dtype, profile: str = None) -> AbstractStripWriter:
+        """
+        Open a file to be written strip by strip, the rows are written directly to a memory-mapped file.
+
+        :param str path: Destination file path to write the image.
+        :param tuple shape: Shape of the complete image.
+        :param np.dtype dtype: Data type of the image.
+        :param str profile: Name of the encoding profile, arrays are stored as is whatever the profile.
+        :return: The strip writer.
+        :rtype: AbstractStripWriter
+        :raises ImageIOError: If there is an error creating the file.
+        """
+        try:
+            logger.debug(f"Mapping Image for writing -> {path}")
+            return NPYStripWriter(path, shape, dtype)
+
+        except (IOError, ValueError) as e:
+            logger.error(f"Error writing image: {e}")
+            raise ImageIOError(f"Error writing image: {e}")
+
+
+class NPYStripWriter(AbstractStripWriter):
+    """
+    Strip writer storing the rows of an image in a memory-mapped ``.npy`` file
+    """
+
+    def __init__(self, path: str, shape: tuple, dtype: np.dtype):
+        super(NPYStripWriter, self).__init__(path, shape, dtype)
+        self.image = np.lib.format.open_memmap(path, mode="w+", dtype=self.dtype, shape=self.shape)
+
+    def write_rows(self, start: int, rows: np.ndarray) -> None:
+        self.image[start:start + len(rows)] = rows.reshape((len(rows),) + self.shape[1:])
+
+    def close(self) -> bool:
+        if self.image is not None:
+            self.image.flush()
+            self.image = None
+        return True
+
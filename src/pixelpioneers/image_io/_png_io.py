@@ -8,13 +8,34 @@ from pixelpioneers.image_io._abstract_io import AbstractImageReader, AbstractIma
 
 logger = logging.getLogger(__name__)
 
+# PNG color types of 16 bit images that PIL reduces to 8 bits: gray and alpha, RGB and RGBA
+_PIL_REDUCED_COLOR_TYPES = (2, 4, 6)
+
+
+def _bit_depth(path: str) -> tuple:
+    # Bit depth and color type of a PNG file, from its IHDR chunk right after the 8 byte signature
+    with open(path, "rb") as f:
+        header = f.read(26)
+    if len(header) < 26 or header[12:16] != b"IHDR":
+        return None, None
+    return header[24], header[25]
+
 
 class PNGHandler(AbstractImageReader, AbstractImageWriter):
     """Handler for reading and writing PNG images.
 
     This class implements the AbstractImageReader and AbstractImageWriter interfaces
-    for reading and writing PNG images, respectively.
+    for reading and writing PNG images, respectively. 16 bit images are read to and written
+    from uint16 arrays, OpenCV encodes and decodes those PIL would reduce to 8 bits.
     """
+    # zlib level and strategy of each encoding profile, Z_RLE (3) with a low level trades little size for speed
+    encoding_profiles = {
+        "fast": {"compress_level": 1, "compress_type": 3},
+        "balanced": {"compress_level": 6},
+        "small": {"compress_level": 9, "optimize": True},
+    }
+    # OpenCV parameters of the encoding options, used for 16 bit images
+    _cv2_options = {"compress_level": "IMWRITE_PNG_COMPRESSION", "compress_type": "IMWRITE_PNG_STRATEGY"}
 
     def read(self, path: str) -> np.ndarray:
         """Reads a PNG image from the specified path and returns it as a NumPy array.
@@ -23,7 +44,7 @@ class PNGHandler(AbstractImageReader, AbstractImageWriter):
             path (str): The path to the PNG image file.
 
         Returns:
-            np.ndarray: The image data as a NumPy array.
+            np.ndarray: The image data as a NumPy array, uint16 for 16 bit images.
 
         Raises:
             ImageIOError: If there is an error reading the image.
@@ -31,6 +52,9 @@ class PNGHandler(AbstractImageReader, AbstractImageWriter):
         """
         try:
             logger.debug(f"Reading Image from Path -> {path}")
+            bit_depth, color_type = _bit_depth(path)
+            if bit_depth == 16 and color_type in _PIL_REDUCED_COLOR_TYPES:
+                return self._read_16_bit(path, color_type)
             img = Image.open(path, formats=["png"])
             img_array = np.array(img)
             return img_array
@@ -47,12 +71,14 @@ class PNGHandler(AbstractImageReader, AbstractImageWriter):
             logger.error(f"Error reading image: {str(e)}")
             raise ImageIOError
 
-    def write(self, path: str, image: np.ndarray) -> bool:
+    def write(self, path: str, image: np.ndarray, profile: str = None) -> bool:
         """Writes a given NumPy array image to the specified path as a PNG image.
 
         Args:
             path (str): The path to save the PNG image file.
-            image (np.ndarray): The image data as a NumPy array.
+            image (np.ndarray): The image data as a NumPy array, uint16 images are written with 16 bits,
+                gray and alpha ones as RGBA.
+            profile (str): Name of the encoding profile, ``balanced`` by default.
 
         Returns:
             bool: True if the image was successfully written, False otherwise.
@@ -63,10 +89,17 @@ class PNGHandler(AbstractImageReader, AbstractImageWriter):
         """
         try:
             logger.debug(f"Writing Image -> {path}")
+            options = self.encoding_options(profile)
+            if image is not None and image.dtype == np.uint16:
+                return self._write_16_bit(path, image, options)
             img = Image.fromarray(image)
-            img.save(path)
+            img.save(path, format="PNG", **options)
             return True
 
+        except AssertionError as ae:
+            logger.error(f"Error writing image: {ae}")
+            raise ImageIOError(f"Error writing image: {ae}")
+
         except IOError as ioe:
             logger.error(f"Error writing image: {str(ioe)}")
             raise ImageIOError(f"Error writing image: {ioe}")
@@ -75,6 +108,41 @@ class PNGHandler(AbstractImageReader, AbstractImageWriter):
             logger.error(f"Error writing image: {str(e)}")
             raise ImageIOError
 
+    @staticmethod
+    def _read_16_bit(path: str, color_type: int) -> np.ndarray:
+        import cv2
+
+        image = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+        assert image is not None, f"Could not decode the 16 bit image '{path}'"
+        if color_type == 4:
+            # Gray and alpha images are expanded to BGRA, the gray value is the same in the three colors
+            return np.ascontiguousarray(image[..., [0, 3]]) if image.ndim == 3 and image.shape[-1] == 4 else image
+        code = cv2.COLOR_BGRA2RGBA if image.shape[-1] == 4 else cv2.COLOR_BGR2RGB
+        return cv2.cvtColor(image, code)
+
+    def _write_16_bit(self, path: str, image: np.ndarray, options: dict) -> bool:
+        import cv2
+
+        channels = 1 if image.ndim == 2 else image.shape[-1]
+        assert channels in (1, 2, 3, 4), f"Cannot write a 16 bit image with {channels} channels"
+        if channels == 2:
+            # OpenCV has no gray and alpha layout, the gray channel is expanded to the three colors
+            alpha = image[..., 1]
+            image = cv2.cvtColor(np.ascontiguousarray(image[..., 0]), cv2.COLOR_GRAY2BGRA)
+            image[..., 3] = alpha
+        elif channels > 2:
+            image = cv2.cvtColor(image, cv2.COLOR_RGBA2BGRA if channels == 4 else cv2.COLOR_RGB2BGR)
+        params = []
+        for option, parameter in self._cv2_options.items():
+            if option in options:
+                params += [getattr(cv2, parameter), options[option]]
+        # Encoded in memory, imwrite picks the format from the extension and the path may be a temporary one
+        encoded, buffer = cv2.imencode(".png", image, params)
+        assert encoded, "Could not encode the 16 bit image"
+        with open(path, "wb") as f:
+            f.write(buffer.tobytes())
+        return True
+
 
 if __name__ == "__main__":
     pngHandler = PNGHandler()
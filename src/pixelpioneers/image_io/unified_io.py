@@ -1,33 +1,93 @@
 import logging
+import os
 from pathlib import Path
 
 import numpy as np
 
+from pixelpioneers import instrumentation
 from pixelpioneers.exceptions import ImageIOError
-from pixelpioneers.image_io import BMPHandler, PNGHandler, JPEGHandler
+from pixelpioneers.image_io._abstract_io import ENCODING_PROFILES, AtomicStripWriter, QuantizingStripWriter
+from pixelpioneers.image_io._decoded_cache import DecodedImageCache
+from pixelpioneers.precision import WORKING_DTYPE, quantize
+from pixelpioneers.registry import LazyRegistry
+from pixelpioneers.utils import temporary_path
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
 class UnifiedIO:
     """Class for unified image input/output operations."""
-    io_handlers = {
-        ".bmp": BMPHandler(),
-        ".png": PNGHandler(),
-        ".jpeg": JPEGHandler()
-    }
+    # Handlers by file extension, each one is imported and created when its format is first used
+    io_handlers = LazyRegistry({
+        ".bmp": "pixelpioneers.image_io._bmp_io:BMPHandler",
+        ".png": "pixelpioneers.image_io._png_io:PNGHandler",
+        ".jpeg": "pixelpioneers.image_io._jpeg_io:JPEGHandler",
+        ".npy": "pixelpioneers.image_io._npy_io:NPYHandler"
+    }, instantiate=True)
+    # Optional cache of decoded images, see enable_cache
+    decoded_cache = None
+    # Encoding profile of the writes that do not name one, see set_encoding_profile
+    encoding_profile = None
 
     @staticmethod
-    def read(path: str) -> np.ndarray:
+    def enable_cache(max_bytes: int) -> None:
+        """Cache the images decoded by :meth:`read` in memory.
+
+        Reading the same unchanged file again returns the cached image instead of decoding it. Cached images
+        are shared by every reader and therefore read-only, actions copy them rather than working in place.
+        The least recently used images are dropped once the cache exceeds ``max_bytes``.
+
+        Args:
+            max_bytes (int): Maximum total size of the cached images.
+        """
+        UnifiedIO.decoded_cache = DecodedImageCache(max_bytes)
+
+    @staticmethod
+    def disable_cache() -> None:
+        """Stop caching decoded images and drop the cached ones."""
+        UnifiedIO.decoded_cache = None
+
+    @staticmethod
+    def cache_stats() -> dict:
+        """Report the statistics of the decoded image cache.
+
+        Returns:
+            dict: The hits, misses, evictions, number of entries, total size and size cap of the cache, None if
+            it is disabled.
+        """
+        if UnifiedIO.decoded_cache is None:
+            return None
+        return UnifiedIO.decoded_cache.stats()
+
+    @staticmethod
+    def set_encoding_profile(profile: str = None) -> None:
+        """Set the encoding profile of the writes that do not name one.
+
+        Profiles trade encoding time against file size: ``fast`` encodes quickest, ``small`` gives the
+        smallest files and ``balanced``, the default, sits in between. Each format maps them to its own
+        encoder options, formats without options write the same file whatever the profile.
+
+        Args:
+            profile (str): One of ``fast``, ``balanced`` and ``small``, None restores the default.
+
+        Raises:
+            ImageIOError: If the profile is unknown.
+        """
+        UnifiedIO._check_profile(profile)
+        UnifiedIO.encoding_profile = profile
+
+    @staticmethod
+    def read(path: str, size_hint: tuple = None) -> np.ndarray:
         """Read an image file.
 
         Args:
             path (str): The path to the image file.
+            size_hint (tuple): Optional smallest (width, height) needed by the caller, typically the size the
+                image is downscaled to. Formats that support it are decoded at a reduced resolution that is
+                still at least that size.
 
         Returns:
-            np.ndarray: The image data as a NumPy array.
+            np.ndarray: The image data as a NumPy array, read-only when it is held by the decoded image cache.
 
         Raises:
             ImageIOError: If there was an error reading the image.
@@ -41,21 +101,161 @@ class UnifiedIO:
             assert file_ext in UnifiedIO.io_handlers, f"Unsupported File Format: {file_ext}"
             logger.debug(f"Detected file format: {file_ext}")
 
+            cache = UnifiedIO.decoded_cache
+            if cache is not None:
+                key = cache.key(path, size_hint)
+                image = cache.get(key)
+                if image is not None:
+                    logger.debug("Image found in the decoded image cache")
+                    return image
+
             io_handler = UnifiedIO.io_handlers[file_ext]
+            with instrumentation.timer("read"):
+                if size_hint is not None:
+                    image = io_handler.read_reduced(path, size_hint)
+                else:
+                    image = io_handler.read(path)
+            if instrumentation.enabled():
+                instrumentation.count("bytes_read", path.stat().st_size)
             logger.debug("Image read successfully")
-            return io_handler.read(path)
+
+            if cache is not None and not isinstance(image, np.memmap):
+                # Mapped files are not decoded, caching them would only hold memory
+                image = cache.put(key, image)
+            return image
+
+        except AssertionError as ae:
+            logger.exception(f"Error reading image: {ae}")
+            raise ImageIOError(f"Error reading image: {ae}")
+
+    @staticmethod
+    def open(path: str, size_hint: tuple = None) -> np.ndarray:
+        """Open an image file for row-wise access.
+
+        Formats that support it are memory-mapped, so rows are only loaded from disk when accessed. Other
+        formats are decoded as a whole, like :meth:`read`.
+
+        Args:
+            path (str): The path to the image file.
+            size_hint (tuple): Optional smallest (width, height) needed by the caller, see :meth:`read`.
+
+        Returns:
+            np.ndarray: The image data as a (possibly memory-mapped) NumPy array.
+
+        Raises:
+            ImageIOError: If there was an error opening the image.
+        """
+        try:
+            path = Path(path)
+            assert path.is_file(), "Expected path to a File"
+            file_ext = path.suffix
+            assert file_ext in UnifiedIO.io_handlers, f"Unsupported File Format: {file_ext}"
+            logger.debug(f"Opening image from path: {path}")
+
+            with instrumentation.timer("read"):
+                image = UnifiedIO.io_handlers[file_ext].open(path, size_hint)
+            if instrumentation.enabled():
+                instrumentation.count("bytes_read", path.stat().st_size)
+            return image
 
         except AssertionError as ae:
             logger.exception(f"Error reading image: {ae}")
             raise ImageIOError(f"Error reading image: {ae}")
 
     @staticmethod
-    def write(path: str, image: np.ndarray) -> bool:
+    def read_batch(paths: list, out: np.ndarray = None) -> np.ndarray:
+        """Read image files of the same size into a single (N, H, W) or (N, H, W, C) batch array.
+
+        Every image is copied straight into its slot of the batch, memory-mapped formats are copied from the
+        file without an intermediate array.
+
+        Args:
+            paths (list): The paths to the image files.
+            out (np.ndarray): Optional preallocated batch with one image slot per path, by default it is
+                allocated from the shape and type of the first image.
+
+        Returns:
+            np.ndarray: The batch of images, in the order of the paths.
+
+        Raises:
+            ImageIOError: If there was an error reading an image or the images do not fit in the batch.
+        """
+        try:
+            assert len(paths) > 0, "Expected at least one path"
+            assert out is None or len(out) == len(paths), \
+                f"Expected a batch of {len(paths)} images, Instead got a batch of {len(out)} images"
+            for i, path in enumerate(paths):
+                image = UnifiedIO.open(path)
+                if out is None:
+                    out = np.empty((len(paths),) + image.shape, dtype=image.dtype)
+                assert image.shape == out.shape[1:], \
+                    f"Expected an image of shape {out.shape[1:]}, Instead got {image.shape} for {path}"
+                np.copyto(out[i], image, casting="same_kind")
+            return out
+
+        except (AssertionError, TypeError) as e:
+            logger.exception(f"Error reading image batch: {e}")
+            raise ImageIOError(f"Error reading image batch: {e}")
+
+    @staticmethod
+    def open_writer(path: str, shape: tuple, dtype: np.dtype, profile: str = None) -> AtomicStripWriter:
+        """Open an image file to be written strip by strip.
+
+        The rows are written to a temporary file, renamed to the path once the writer is closed. Leaving the
+        writer's context on an error, or calling its ``abort`` method, removes the temporary file instead.
+
+        Args:
+            path (str): The path to write the image file.
+            shape (tuple): The shape of the complete image.
+            dtype (np.dtype): The data type of the image, float32 rows are quantized to uint8 like in
+                :meth:`write`.
+            profile (str): Optional encoding profile, see :meth:`set_encoding_profile`.
+
+        Returns:
+            AtomicStripWriter: Writer accepting the rows of the image, the file is complete once it is closed.
+
+        Raises:
+            ImageIOError: If there was an error opening the image for writing.
+        """
+        try:
+            path = Path(path)
+            file_ext = path.suffix
+            assert file_ext in UnifiedIO.io_handlers, f"Unsupported File Format: {file_ext}"
+            profile = profile or UnifiedIO.encoding_profile
+            UnifiedIO._check_profile(profile)
+            logger.debug(f"Writing image strips to path: {path}")
+
+            if not path.parent.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                logger.debug(f"Created directory: {path.parent}")
+
+            if len(shape) == 3 and shape[-1] == 1:
+                # Single channel images are written as such, without expanding them to RGB
+                shape = tuple(shape[:2])
+
+            working = np.dtype(dtype) == WORKING_DTYPE
+            if working:
+                # Working precision rows are quantized as they are written
+                dtype = np.uint8
+            writer = UnifiedIO.io_handlers[file_ext].open_writer(temporary_path(path), shape, dtype, profile)
+            return AtomicStripWriter(QuantizingStripWriter(writer) if working else writer, path)
+
+        except AssertionError as ae:
+            logger.exception(f"Error writing image: {ae}")
+            raise ImageIOError(f"Error writing image: {ae}")
+
+    @staticmethod
+    def write(path: str, image: np.ndarray, profile: str = None) -> bool:
         """Write an image to a file.
 
+        The image is encoded to a temporary file renamed to the path once complete, so the path never holds a
+        partially written image, even if the process is interrupted. Working precision images, float32 values
+        in [0, 1], are quantized to uint8 first.
+
         Args:
             path (str): The path to write the image file.
             image (np.ndarray): The image data as a NumPy array.
+            profile (str): Optional encoding profile, see :meth:`set_encoding_profile`.
 
         Returns:
             bool: True if the image was successfully written, False otherwise.
@@ -68,15 +268,41 @@ class UnifiedIO:
             path = Path(path)
             file_ext = path.suffix
             assert file_ext in UnifiedIO.io_handlers, f"Unsupported File Format: {file_ext}"
+            profile = profile or UnifiedIO.encoding_profile
+            UnifiedIO._check_profile(profile)
             logger.debug(f"Writing image to path: {path}")
 
             if not path.parent.exists():
-                path.parent.mkdir(parents=True)
+                path.parent.mkdir(parents=True, exist_ok=True)
                 logger.debug(f"Created directory: {path.parent}")
 
+            if image is not None and image.ndim == 3 and image.shape[-1] == 1:
+                # Single channel images are written as such, without expanding them to RGB
+                image = image[..., 0]
+
+            if image is not None and image.dtype == WORKING_DTYPE:
+                # Float32 pipelines are quantized once, here, rather than after every step
+                with instrumentation.timer("quantize"):
+                    image = quantize(image)
+
             io_handler = UnifiedIO.io_handlers[file_ext]
-            return io_handler.write(path, image)
+            temporary = temporary_path(path)
+            try:
+                with instrumentation.timer("write"):
+                    written = io_handler.write(temporary, image, profile)
+                    os.replace(temporary, path)
+            except BaseException:
+                temporary.unlink(missing_ok=True)
+                raise
+            if instrumentation.enabled():
+                instrumentation.count("bytes_written", path.stat().st_size)
+            return written
 
         except AssertionError as ae:
             logger.exception(f"Error writing image: {ae}")
             raise ImageIOError(f"Error reading image: {ae}")
+
+    @staticmethod
+    def _check_profile(profile: str) -> None:
+        if profile is not None and profile not in ENCODING_PROFILES:
+            raise ImageIOError(f"Unknown encoding profile: {profile} (choose from {', '.join(ENCODING_PROFILES)})")
@@ -0,0 +1,288 @@
+import threading
+import time
+from collections import defaultdict
+
+# Upper bounds in milliseconds of the latency histogram buckets, the last bucket is unbounded
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# Statistics being collected, None while instrumentation is disabled
+_stats = None
+_hooks = []
+
+
+class Stats:
+    """
+    Timers and counters collected while instrumentation is enabled.
+
+    A timer accumulates the durations recorded under a name, for instance a processing stage or an action,
+    along with a histogram of them. A counter accumulates amounts such as bytes read or pixels processed.
+    Recording is thread-safe.
+    """
+
+    def __init__(self):
+        """
+        Initialize the Stats instance.
+        """
+        self.started = time.perf_counter()
+        self.timers = {}
+        self.counters = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Add a duration to a timer.
+
+        :param name: Name of the timer.
+        :type name: str
+        :param seconds: The duration.
+        :type seconds: float
+        """
+        bucket = len(HISTOGRAM_BOUNDS_MS)
+        for i, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if seconds * 1e3 <= bound:
+                bucket = i
+                break
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = {"count": 0, "total_s": 0.0, "max_s": 0.0,
+                                             "histogram": [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)}
+            timer["count"] += 1
+            timer["total_s"] += seconds
+            timer["max_s"] = max(timer["max_s"], seconds)
+            timer["histogram"][bucket] += 1
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Add an amount to a counter.
+
+        :param name: Name of the counter.
+        :type name: str
+        :param amount: The amount to add.
+        :type amount: int
+        """
+        with self._lock:
+            self.counters[name] += amount
+
+    def snapshot(self, reset: bool = False) -> dict:
+        """
+        Copy the statistics collected so far.
+
+        :param reset: Also clear the timers and counters, e.g. to send only new statistics to another process.
+        :type reset: bool
+        :return: JSON-serializable copy of the timers and counters.
+        :rtype: dict
+        """
+        with self._lock:
+            snapshot = {
+                "timers": {name: dict(timer, histogram=list(timer["histogram"]))
+                           for name, timer in self.timers.items()},
+                "counters": dict(self.counters),
+            }
+            if reset:
+                self.timers.clear()
+                self.counters.clear()
+        return snapshot
+
+    def merge(self, snapshot: dict) -> None:
+        """
+        Add the statistics of a snapshot, typically taken in a worker process.
+
+        :param snapshot: Snapshot returned by :meth:`snapshot`.
+        :type snapshot: dict
+        """
+        with self._lock:
+            for name, other in snapshot["timers"].items():
+                timer = self.timers.get(name)
+                if timer is None:
+                    self.timers[name] = dict(other, histogram=list(other["histogram"]))
+                    continue
+                timer["count"] += other["count"]
+                timer["total_s"] += other["total_s"]
+                timer["max_s"] = max(timer["max_s"], other["max_s"])
+                timer["histogram"] = [a + b for a, b in zip(timer["histogram"], other["histogram"])]
+            for name, amount in snapshot["counters"].items():
+                self.counters[name] += amount
+
+    def summary(self) -> dict:
+        """
+        Summarize the run: the snapshot along with the elapsed time and the throughput.
+
+        :return: JSON-serializable summary, ``images_per_s`` and ``megapixels_per_s`` are computed from the
+                 ``images`` and ``pixels`` counters.
+        :rtype: dict
+        """
+        elapsed = time.perf_counter() - self.started
+        summary = self.snapshot()
+        counters = summary["counters"]
+        summary["elapsed_s"] = elapsed
+        summary["images_per_s"] = counters.get("images", 0) / elapsed if elapsed > 0 else None
+        summary["megapixels_per_s"] = counters.get("pixels", 0) / 1e6 / elapsed if elapsed > 0 else None
+        summary["histogram_bounds_ms"] = list(HISTOGRAM_BOUNDS_MS)
+        return summary
+
+
+class _Timer:
+    # Records the time spent in a with block under one or more names
+
+    def __init__(self, stats: Stats, names: tuple):
+        self.stats = stats
+        self.names = names
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        seconds = time.perf_counter() - self.start
+        for name in self.names:
+            self.stats.record(name, seconds)
+            for hook in _hooks:
+                hook("timer", name, seconds)
+
+
+class _NullTimer:
+    # Shared by every timer while instrumentation is disabled
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def enable() -> Stats:
+    """
+    Start collecting statistics, replacing those collected so far.
+
+    :return: The statistics being collected.
+    :rtype: Stats
+    """
+    global _stats
+    _stats = Stats()
+    return _stats
+
+
+def disable() -> None:
+    """
+    Stop collecting statistics. Timers and counters cost a single check from now on.
+    """
+    global _stats
+    _stats = None
+
+
+def get_stats():
+    """
+    Get the statistics being collected.
+
+    :return: The statistics, None while instrumentation is disabled.
+    :rtype: Stats
+    """
+    return _stats
+
+
+def add_hook(hook) -> None:
+    """
+    Register a function receiving every duration and count as it is recorded, to export them.
+
+    The hook is called as ``hook(kind, name, value)`` with ``kind`` either ``"timer"`` (``value`` in seconds)
+    or ``"counter"``, from the thread recording it, and only while instrumentation is enabled. Statistics
+    merged from worker processes are not passed to the hooks.
+
+    :param hook: The function to call.
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook) -> None:
+    """
+    Unregister a function added by :func:`add_hook`.
+
+    :param hook: The function to remove.
+    """
+    _hooks.remove(hook)
+
+
+def timer(*names: str):
+    """
+    Time a with block.
+
+    :param names: Names of the timers the duration is added to.
+    :return: A context manager, which does nothing while instrumentation is disabled.
+    """
+    if _stats is None:
+        return _NULL_TIMER
+    return _Timer(_stats, names)
+
+
+def record(name: str, seconds: float) -> None:
+    """
+    Add a duration measured by the caller to a timer, if instrumentation is enabled.
+
+    :param name: Name of the timer.
+    :param seconds: The duration.
+    """
+    stats = _stats
+    if stats is None:
+        return
+    stats.record(name, seconds)
+    for hook in _hooks:
+        hook("timer", name, seconds)
+
+
+def count(name: str, amount: int = 1) -> None:
+    """
+    Add an amount to a counter, if instrumentation is enabled.
+
+    :param name: Name of the counter.
+    :param amount: The amount to add.
+    """
+    stats = _stats
+    if stats is None:
+        return
+    stats.count(name, amount)
+    for hook in _hooks:
+        hook("counter", name, amount)
+
+
+def enabled() -> bool:
+    """
+    Tell whether statistics are being collected, to skip measurements that are costly by themselves.
+
+    :return: True while instrumentation is enabled.
+    :rtype: bool
+    """
+    return _stats is not None
+
+
+def format_summary(summary: dict) -> str:
+    """
+    Format a summary returned by :meth:`Stats.summary` for the terminal.
+
+    :param summary: The summary.
+    :return: The report, one line per counter and timer followed by the histogram of the ``image`` timer.
+    """
+    counters = summary["counters"]
+    lines = [f"Processed {counters.get('images', 0)} images ({counters.get('errors', 0)} errors) "
+             f"in {summary['elapsed_s']:.3f} s: {summary['images_per_s'] or 0:.2f} images/s, "
+             f"{summary['megapixels_per_s'] or 0:.2f} MP/s"]
+    for name, value in sorted(counters.items()):
+        lines.append(f"  {name:<40} {value:>16}")
+    for name, timer in sorted(summary["timers"].items()):
+        mean = timer["total_s"] / timer["count"] * 1e3
+        lines.append(f"  {name:<40} {timer['count']:>6} x {mean:>10.3f} ms  total {timer['total_s']:>9.3f} s  "
+                     f"max {timer['max_s'] * 1e3:>10.3f} ms")
+
+    latency = summary["timers"].get("image")
+    if latency is not None:
+        lines.append("Image latency:")
+        largest = max(latency["histogram"]) or 1
+        labels = [f"<= {bound} ms" for bound in summary["histogram_bounds_ms"]]
+        labels.append(f"> {summary['histogram_bounds_ms'][-1]} ms")
+        for label, images in zip(labels, latency["histogram"]):
+            if images:
+                lines.append(f"  {label:>12} {images:>6} {'#' * max(1, images * 40 // largest)}")
+    return "\n".join(lines)
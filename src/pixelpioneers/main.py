@@ -1,37 +1,158 @@
+import json
 import logging
+import os
+import sys
+from itertools import tee
 
-from pixelpioneers.actions.unified_actions import UnifiedActions
-from pixelpioneers.cli_parser import args
+from pixelpioneers import instrumentation
+from pixelpioneers.cli_parser import bench_parser, parser, serve_parser
 from pixelpioneers.exceptions import ActionError
-from pixelpioneers.image_io.unified_io import UnifiedIO
-from pixelpioneers.utils import get_output_paths
+from pixelpioneers.utils import get_output_path, iter_images
 
-logging.basicConfig(level=args.loglevel)
 logger = logging.getLogger(__name__)
 
 
-def main():
+def main(argv: list = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "bench":
+        return bench(argv[1:])
+    if argv and argv[0] == "serve":
+        return serve(argv[1:])
+
+    args = parser.parse_args(argv)
+    # The root logger is already configured when the package is imported
+    logging.getLogger().setLevel(args.loglevel)
     logger.info("In CLI: main()")
 
-    action_name = args.action
-    action_args = args.action_args
+    # Imported once the arguments are valid, --help and usage errors do not load NumPy and the codecs
+    from pixelpioneers.actions.unified_actions import UnifiedActions
+    from pixelpioneers.batch import run_batch
+    from pixelpioneers.image_io.unified_io import UnifiedIO
+    from pixelpioneers.manifest import Manifest
+    from pixelpioneers.result_cache import ResultCache
+
+    action_name = "_".join(action for action, _ in args.actions)
 
-    input_paths = args.images
     output_dir = args.dest
     try:
-        action_ob = UnifiedActions.get_action_instance(action_name, action_args)
-        output_paths = get_output_paths(input_paths, output_dir, action_name)
+        action_ob = UnifiedActions.get_pipeline_instance(args.actions, args.precision)
     except ActionError as ae:
         logger.error(ae, exc_info=False)
+        return
+
+    UnifiedIO.set_encoding_profile(args.profile)
+
+    found = iter_images(args.images, UnifiedIO.io_handlers, args.recursive)
+    jobs = ((path, get_output_path(path, output_dir, action_name, relative_dir)) for path, relative_dir in found)
+
+    manifest = None
+    if args.incremental:
+        manifest = Manifest(output_dir, action_ob)
+        jobs = manifest.pending(jobs)
+
+    if all(os.path.isfile(source) for source in args.images):
+        # Explicit files fit on the command line, listed they are scheduled largest first
+        jobs = list(jobs)
+        input_paths = [input_path for input_path, _ in jobs]
+        output_paths = [output_path for _, output_path in jobs]
+    else:
+        # Directories and patterns are walked while the images are processed
+        input_jobs, output_jobs = tee(jobs)
+        input_paths = (input_path for input_path, _ in input_jobs)
+        output_paths = (output_path for _, output_path in output_jobs)
+
+    cache = None
+    if args.cache_dir is not None:
+        cache = ResultCache(args.cache_dir, args.cache_size * 2 ** 20, args.cache_link)
+
+    stats = None
+    if args.stats or args.stats_json is not None:
+        stats = instrumentation.enable()
+
+    strip_bytes = args.strip_budget * 2 ** 20
+    results = run_batch(action_ob, input_paths, output_paths, args.jobs, strip_bytes, args.io_threads,
+                        args.queue_depth, cache)
+    for input_path, output_path, error in results:
+        if error is not None:
+            logger.error(error, exc_info=False)
+        elif manifest is not None:
+            manifest.record(input_path, output_path)
+
+    if manifest is not None:
+        manifest.close()
+        print(f"Manifest: {manifest.skipped} images up to date, skipped")
+
+    if cache is not None:
+        print(f"Result cache: {cache.hits} hits, {cache.misses} misses, {cache.evictions} evictions")
+
+    if stats is not None:
+        instrumentation.disable()
+        summary = stats.summary()
+        if args.stats:
+            print(instrumentation.format_summary(summary))
+        if args.stats_json is not None:
+            with open(args.stats_json, "w") as f:
+                json.dump(summary, f, indent=2)
 
-    for input_path, output_path in zip(input_paths, output_paths):
-        try:
-            image = UnifiedIO.read(input_path)
-            image_transformed = action_ob.apply(image)
-            UnifiedIO.write(output_path, image_transformed)
-        except Exception as e:
-            logger.error(e, exc_info=False)
+
+def bench(argv: list) -> int:
+    """
+    Runs the ``pixelpioneers bench`` command.
+
+    :param argv: Command line arguments following ``bench``.
+    :return: The exit status, 1 if a benchmark regressed against the baseline.
+    """
+    from pixelpioneers.bench import compare_results, run_benchmarks
+
+    args = bench_parser.parse_args(argv)
+    logging.getLogger("pixelpioneers.bench").setLevel(args.loglevel)
+
+    sample_paths = args.samples
+    if sample_paths is None and os.path.isdir("data"):
+        sample_paths = sorted(entry.path for entry in os.scandir("data") if entry.is_file())
+    report = run_benchmarks(args.resolutions, args.layouts, args.actions, args.formats, args.repeat, sample_paths)
+
+    status = 0
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        report["regressions"] = compare_results(report, baseline, args.tolerance / 100)
+        for regression in report["regressions"]:
+            print(f"Regression: {regression['name']} at {regression['megapixels']} MP {regression['layout']} "
+                  f"{regression['baseline_ms']} ms -> {regression['median_ms']} ms "
+                  f"({regression['change']:+.0%})", file=sys.stderr)
+        status = 1 if report["regressions"] else 0
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return status
+
+
+def serve(argv: list) -> int:
+    """
+    Runs the ``pixelpioneers serve`` command, until interrupted.
+
+    :param argv: Command line arguments following ``serve``.
+    :return: The exit status.
+    """
+    from pixelpioneers.server import JobServer
+
+    args = serve_parser.parse_args(argv)
+    logging.getLogger().setLevel(args.loglevel)
+
+    server = JobServer(args.socket, args.workers, args.processes, args.max_queue, args.strip_budget * 2 ** 20,
+                       args.profile)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
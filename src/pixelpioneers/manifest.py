@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+import os
+
+from pixelpioneers import __version__
+from pixelpioneers.actions.abstract_image_action import AbstractImageAction
+from pixelpioneers.image_io._abstract_io import DEFAULT_ENCODING_PROFILE
+from pixelpioneers.image_io.unified_io import UnifiedIO
+from pixelpioneers.result_cache import describe_action
+from pixelpioneers.utils import temporary_path
+
+logger = logging.getLogger(__name__)
+
+# File name of the manifest, in the destination directory
+MANIFEST_NAME = ".pixelpioneers-manifest.jsonl"
+
+
+def action_digest(action_ob: AbstractImageAction) -> str:
+    """
+    Identifies the results of an action: its parameters, the encoding profile and the library version.
+
+    :param action_ob: The action, see :func:`describe_action`.
+    :return: Hash of the description, equal for actions giving the same files.
+    """
+    spec = {
+        "action": describe_action(action_ob),
+        "profile": UnifiedIO.encoding_profile or DEFAULT_ENCODING_PROFILE,
+        "version": __version__,
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+class Manifest:
+    """
+    Record of the images completed by the runs writing to a destination directory, to resume or update them.
+
+    Every completed image appends a JSON line with the path, size and modification time of the input, the
+    digest of the action (see :func:`action_digest`) and the path, size and modification time of the output.
+    Like ``make``, a later run skips the inputs whose output is up to date: neither file changed since and the
+    action is the same. Lines are flushed one by one, so an interrupted run loses at most the line being
+    written, and the images in progress are done again.
+
+    :param directory: Destination directory, holding the manifest file.
+    :param action_ob: The action of the run.
+    """
+
+    def __init__(self, directory, action_ob: AbstractImageAction):
+        """
+        Initialize the Manifest instance, loading the records of the earlier runs.
+
+        :param directory: Destination directory, created if needed.
+        :param action_ob: The action of the run.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.action = action_digest(action_ob)
+        self.skipped = 0
+        self.entries = {}
+        self._load()
+        self._file = open(self.path, "a")
+
+    def is_up_to_date(self, input_path, output_path) -> bool:
+        """
+        Tell whether the output of an input was completed by an earlier run and is still valid.
+
+        :param input_path: Path of the source image.
+        :param output_path: Path of the result.
+        :return: True if the input, the output and the action are unchanged since the output was recorded.
+        :rtype: bool
+        """
+        entry = self.entries.get(os.path.abspath(output_path))
+        if entry is None or entry["action"] != self.action or entry["input"] != os.path.abspath(input_path):
+            return False
+        try:
+            return (_signature(input_path) == (entry["input_size"], entry["input_mtime_ns"])
+                    and _signature(output_path) == (entry["output_size"], entry["output_mtime_ns"]))
+        except OSError:
+            return False
+
+    def pending(self, jobs):
+        """
+        Skip the jobs whose output is up to date, counting them in :attr:`skipped`.
+
+        :param jobs: Iterable of ``(input_path, output_path)`` pairs.
+        :return: A generator of the pairs left to process.
+        """
+        for input_path, output_path in jobs:
+            if self.is_up_to_date(input_path, output_path):
+                logger.info(f"Up to date: {output_path}")
+                self.skipped += 1
+                continue
+            yield input_path, output_path
+
+    def record(self, input_path, output_path) -> None:
+        """
+        Record an output once it is completely written.
+
+        :param input_path: Path of the source image.
+        :param output_path: Path of the result.
+        """
+        input_size, input_mtime_ns = _signature(input_path)
+        output_size, output_mtime_ns = _signature(output_path)
+        entry = {"input": os.path.abspath(input_path), "input_size": input_size, "input_mtime_ns": input_mtime_ns,
+                 "action": self.action, "output": os.path.abspath(output_path), "output_size": output_size,
+                 "output_mtime_ns": output_mtime_ns}
+        self.entries[entry["output"]] = entry
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        """
+        Close the manifest file.
+        """
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _load(self) -> None:
+        lines = 0
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                        self.entries[entry["output"]] = entry
+                    except (ValueError, KeyError, TypeError):
+                        # Line cut short by an interrupted run
+                        continue
+        except FileNotFoundError:
+            return
+
+        if lines > 2 * len(self.entries):
+            # Images done again by every run append a line each, only the last one of each output is kept
+            self._rewrite()
+        elif lines:
+            with open(self.path, "rb+") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # New lines must not be appended to a cut one
+                    f.write(b"\n")
+
+    def _rewrite(self) -> None:
+        temporary = temporary_path(self.path)
+        with open(temporary, "w") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(temporary, self.path)
+
+
+def _signature(path) -> tuple:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
@@ -0,0 +1,76 @@
+import numpy as np
+
+# Working precisions of a pipeline: "native" applies every step to the type returned by the previous one,
+# "float32" converts the image once and passes float32 values in [0, 1] between the steps
+PRECISIONS = ("native", "float32")
+# Type of working precision images, float32 images are always taken to hold values in [0, 1]
+WORKING_DTYPE = np.dtype(np.float32)
+
+
+def max_value(dtype: np.dtype):
+    """
+    Gives the value of full intensity of an image type.
+
+    :param dtype: Data type of the image.
+    :return: 1.0 for working precision images, 65535 for uint16 images, 255 for the others.
+    """
+    dtype = np.dtype(dtype)
+    if dtype == WORKING_DTYPE:
+        return 1.0
+    return 65535 if dtype == np.uint16 else 255
+
+
+def result_dtype(dtype: np.dtype) -> np.dtype:
+    """
+    Gives the type of the result of an action that quantizes its result, such as the adjustments.
+
+    :param dtype: Data type of the input image.
+    :return: The input type for uint8, uint16 and working precision images, which is kept, uint8 for the others.
+    """
+    dtype = np.dtype(dtype)
+    return dtype if dtype in (WORKING_DTYPE, np.uint16) else np.dtype(np.uint8)
+
+
+def to_working(image: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Converts a uint8 or uint16 image to working precision.
+
+    :param image: The uint8 or uint16 image.
+    :param out: Optional float32 buffer of the image shape for the result.
+    :return: The float32 image, with values in [0, 1].
+    """
+    return np.multiply(image, np.float32(1 / max_value(image.dtype)), out=out, dtype=WORKING_DTYPE)
+
+
+def to_uint8(image: np.ndarray) -> np.ndarray:
+    """
+    Reduces a uint16 image to uint8 for formats without 16 bit samples, rounding to the nearest value.
+
+    :param image: The image.
+    :return: The uint8 image, or the image itself if it is not a uint16 one.
+    """
+    if image.dtype != np.uint16:
+        return image
+    # 65535 / 255 == 257, the sum fits in 32 bits
+    rounded = np.add(image, 128, dtype=np.uint32)
+    rounded //= 257
+    return rounded.astype(np.uint8)
+
+
+def quantize(image: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Converts a working precision image back to uint8, rounding to the nearest value.
+
+    Values outside [0, 1], e.g. the overshoot of an interpolation, are clipped.
+
+    :param image: The float32 image.
+    :param out: Optional uint8 buffer of the image shape for the result.
+    :return: The uint8 image.
+    """
+    scaled = np.multiply(image, np.float32(255), dtype=WORKING_DTYPE)
+    np.clip(scaled, 0, 255, out=scaled)
+    np.rint(scaled, out=scaled)
+    if out is None:
+        return scaled.astype(np.uint8)
+    np.copyto(out, scaled, casting="unsafe")
+    return out
@@ -0,0 +1,94 @@
+import importlib
+import threading
+from collections.abc import Mapping
+
+
+def import_object(target: str):
+    """
+    Import an object given as ``"package.module:name"``.
+
+    :param target: Module path and attribute name separated by a colon.
+    :return: The attribute of the imported module.
+    """
+    module_name, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def lazy_module_getattr(module_name: str, exports: dict):
+    """
+    Build a module ``__getattr__`` importing the public names of a package from their modules on first access.
+
+    :param module_name: ``__name__`` of the package.
+    :param exports: Public name to the relative module defining it, e.g. ``{"FlipTransformer": "._flip"}``.
+    :return: The ``__getattr__`` function of the package.
+    """
+
+    def __getattr__(name: str):
+        if name not in exports:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        return getattr(importlib.import_module(exports[name], module_name), name)
+
+    return __getattr__
+
+
+class LazyRegistry(Mapping):
+    """
+    Registry of objects by name, importing each object only when it is first looked up.
+
+    Entries are registered either as the object itself or as a ``"package.module:name"`` string, so listing the
+    registered names costs nothing and only the module of the object actually used is imported.
+
+    :param entries: Initial entries, name to object or import string.
+    :type entries: dict
+    :param instantiate: Call the imported object once and register the result instead, e.g. for classes of
+                        which a single instance is shared.
+    :type instantiate: bool
+    """
+
+    def __init__(self, entries: dict = None, instantiate: bool = False):
+        """
+        Initialize the LazyRegistry instance.
+
+        :param entries: Initial entries, name to object or import string.
+        :type entries: dict
+        :param instantiate: Call the imported object once and register the result instead.
+        :type instantiate: bool
+        """
+        self.instantiate = instantiate
+        self._entries = {}
+        self._lock = threading.Lock()
+        for name, target in (entries or {}).items():
+            self.register(name, target)
+
+    def register(self, name: str, target) -> None:
+        """
+        Register an object under a name, replacing any previous entry.
+
+        :param name: Name of the entry.
+        :type name: str
+        :param target: The object, used as is, or a ``"package.module:name"`` string to import it from when it
+                       is needed.
+        """
+        self._entries[name] = (target, isinstance(target, str))
+
+    def __getitem__(self, name: str):
+        target, lazy = self._entries[name]
+        if not lazy:
+            return target
+        with self._lock:
+            target, lazy = self._entries[name]
+            if lazy:
+                target = import_object(target)
+                if self.instantiate:
+                    target = target()
+                self._entries[name] = (target, False)
+        return target
+
+    def __contains__(self, name) -> bool:
+        return name in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
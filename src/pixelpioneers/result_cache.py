@@ -0,0 +1,322 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from pixelpioneers import __version__
+from pixelpioneers.actions.abstract_image_action import AbstractImageAction
+from pixelpioneers.image_io._abstract_io import DEFAULT_ENCODING_PROFILE
+from pixelpioneers.image_io.unified_io import UnifiedIO
+from pixelpioneers.utils import temporary_path
+
+logger = logging.getLogger(__name__)
+
+# Chunk size used to hash the input files
+_HASH_CHUNK_BYTES = 2 ** 20
+# Log of the uses of the entries, oldest first, replayed to order them by recency when the cache is opened
+_ACCESS_LOG = ".access.log"
+
+
+def describe_action(action_ob: AbstractImageAction) -> dict:
+    """
+    Describes an action by its class and the parameters stored on the instance.
+
+    :param action_ob: The action to describe, pipelines are described step by step.
+    :return: JSON-serializable description, equal for actions giving the same result.
+    """
+    return {
+        "action": f"{type(action_ob).__module__}.{type(action_ob).__qualname__}",
+        "params": {name: _describe_value(value) for name, value in sorted(vars(action_ob).items())},
+    }
+
+
+def _describe_value(value):
+    if isinstance(value, AbstractImageAction):
+        return describe_action(value)
+    if isinstance(value, (list, tuple)):
+        return [_describe_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _describe_value(item) for key, item in sorted(value.items())}
+    if isinstance(value, np.ndarray):
+        return {"dtype": str(value.dtype), "shape": list(value.shape),
+                "sha256": hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()}
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return repr(value)
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of encoded results.
+
+    Results are keyed by the hash of the input file, the action and its parameters, the output format and the
+    library version, so a hit needs no decoding at all: the cached file is copied (or hard-linked) to the
+    output path. The least recently used results are evicted once the cache exceeds its size cap.
+
+    The directory is scanned once, when the cache is opened, after which the size and recency of the entries
+    are kept in memory. Recency is also appended to an access log in the directory rather than stored in the
+    modification time of the entries, which hard-linked outputs share.
+
+    :param directory: Directory holding the cached results, created if needed.
+    :type directory: str
+    :param max_bytes: Size cap of the cache.
+    :type max_bytes: int
+    :param hardlink: Hard-link cached results to the output path instead of copying them. The output then
+                     shares its content with the cache, it must be replaced rather than modified in place.
+    :type hardlink: bool
+    """
+
+    def __init__(self, directory, max_bytes: int, hardlink: bool = False):
+        """
+        Initialize the ResultCache instance.
+
+        :param directory: Directory holding the cached results, created if needed.
+        :type directory: str
+        :param max_bytes: Size cap of the cache.
+        :type max_bytes: int
+        :param hardlink: Hard-link cached results to the output path instead of copying them.
+        :type hardlink: bool
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hardlink = hardlink
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Size of the entries by name, least recently used first, and their total size
+        self._entries = OrderedDict()
+        self._total = 0
+        self._log_lines = 0
+        # Entries used by a worker process, reported to the process that opened the cache, see take_uses
+        self._uses = None
+        self._load()
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def __getstate__(self):
+        # Sent to worker processes, which get their own lock and counters. The index stays in the process that
+        # opened the cache, the workers record the entries they use for it instead
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_entries"] = None
+        state["_uses"] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def detach(self) -> "ResultCache":
+        """
+        Copy the cache for a worker process, which reports the entries it uses instead of indexing them.
+
+        Forked worker processes inherit the cache without pickling it, so they detach it explicitly.
+
+        :return: The copy, see :meth:`take_uses`.
+        :rtype: ResultCache
+        """
+        copy = ResultCache.__new__(ResultCache)
+        copy.__setstate__(self.__getstate__())
+        return copy
+
+    def key(self, input_path, action_ob: AbstractImageAction, output_path) -> str:
+        """
+        Compute the cache key of a result.
+
+        :param input_path: Path of the source image.
+        :param action_ob: The action applied to the image.
+        :param output_path: Path the result is written to, its extension selects the output format. The
+                            encoding profile of :class:`UnifiedIO` is part of the key as well.
+        :return: Hexadecimal SHA-256 key.
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            "version": __version__,
+            "action": describe_action(action_ob),
+            "format": Path(output_path).suffix.lower(),
+            "profile": UnifiedIO.encoding_profile or DEFAULT_ENCODING_PROFILE,
+        }, sort_keys=True).encode())
+        with open(input_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def fetch(self, key: str, output_path) -> bool:
+        """
+        Write the cached result of a key to the output path, if there is one.
+
+        :param key: Key returned by :meth:`key`.
+        :param output_path: Path the result is written to.
+        :return: True on a cache hit.
+        :rtype: bool
+        """
+        entry = self._entry(key, output_path)
+        try:
+            size = entry.stat().st_size
+            output_path = Path(output_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            # Like the writers, the output path is replaced by the complete result
+            temporary = temporary_path(output_path)
+            try:
+                if self.hardlink:
+                    os.link(entry, temporary)
+                else:
+                    shutil.copyfile(entry, temporary)
+                os.replace(temporary, output_path)
+            except BaseException:
+                temporary.unlink(missing_ok=True)
+                raise
+        except FileNotFoundError:
+            # Not cached, or evicted in the meantime
+            self.count(False)
+            return False
+        self._use(entry, size)
+        self.count(True)
+        logger.info(f"Result cache hit for {output_path}")
+        return True
+
+    def store(self, key: str, output_path) -> None:
+        """
+        Add a result written to the output path to the cache, evicting the least recently used results if the
+        cache exceeds its size cap.
+
+        :param key: Key returned by :meth:`key`.
+        :param output_path: Path the result was written to.
+        """
+        entry = self._entry(key, output_path)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        # Readers never see a partially written entry
+        fd, tmp_path = tempfile.mkstemp(dir=entry.parent, prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copyfile(output_path, tmp_path)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, entry)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._use(entry, size)
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used results until the cache fits in its size cap.
+        """
+        with self._lock:
+            if self._entries is None:
+                # Worker processes leave the eviction to the process that opened the cache
+                return
+            while self._total > self.max_bytes and self._entries:
+                name, size = self._entries.popitem(last=False)
+                self._total -= size
+                try:
+                    (self.directory / name).unlink()
+                    self.evictions += 1
+                except FileNotFoundError:
+                    pass
+
+    def take_uses(self) -> list:
+        """
+        Return and forget the entries used by this copy of the cache in a worker process.
+
+        :return: List of ``(name, size)`` tuples, to pass to :meth:`record_uses` in the process that opened the
+                 cache.
+        :rtype: list
+        """
+        with self._lock:
+            uses, self._uses = self._uses, []
+        return uses
+
+    def record_uses(self, uses: list) -> None:
+        """
+        Record the entries used by a worker process, evicting the least recently used results if needed.
+
+        :param uses: List returned by :meth:`take_uses`.
+        :type uses: list
+        """
+        for name, size in uses:
+            self._record(name, size)
+
+    def count(self, hit: bool) -> None:
+        """
+        Record a cache lookup, also used for lookups made by worker processes.
+
+        :param hit: Whether the lookup was a hit.
+        :type hit: bool
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _entry(self, key: str, output_path) -> Path:
+        return self.directory / key[:2] / (key + Path(output_path).suffix.lower())
+
+    def _use(self, entry: Path, size: int) -> None:
+        name = f"{entry.parent.name}/{entry.name}"
+        with self._lock:
+            if self._uses is not None:
+                self._uses.append((name, size))
+                return
+        self._record(name, size)
+
+    def _record(self, name: str, size: int) -> None:
+        # Moves the entry to the most recently used end of the index, and of the access log
+        with self._lock:
+            self._total += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            with open(self.directory / _ACCESS_LOG, "a") as f:
+                f.write(name + "\n")
+            self._log_lines += 1
+            if self._log_lines > 2 * len(self._entries):
+                # Every use appends a line, only the order of the entries still cached is kept
+                self._rewrite_log()
+            full = self._total > self.max_bytes
+        if full:
+            self.evict()
+
+    def _load(self) -> None:
+        # Entries that are not in the access log, e.g. of an older version, are taken as used when stored
+        entries = []
+        for path in self.directory.glob("*/*"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, f"{path.parent.name}/{path.name}", stat.st_size))
+        for _, name, size in sorted(entries):
+            self._entries[name] = size
+            self._total += size
+
+        try:
+            with open(self.directory / _ACCESS_LOG) as f:
+                for line in f:
+                    self._log_lines += 1
+                    name = line.strip()
+                    if name in self._entries:
+                        self._entries.move_to_end(name)
+        except FileNotFoundError:
+            pass
+
+    def _rewrite_log(self) -> None:
+        path = self.directory / _ACCESS_LOG
+        temporary = temporary_path(path)
+        with open(temporary, "w") as f:
+            for name in self._entries:
+                f.write(name + "\n")
+        os.replace(temporary, path)
+        self._log_lines = len(self._entries)
@@ -0,0 +1,271 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from pixelpioneers.actions.unified_actions import UnifiedActions
+from pixelpioneers.batch import process_image
+from pixelpioneers.buffer_pool import BufferPool
+from pixelpioneers.exceptions import ActionError
+from pixelpioneers.image_io.unified_io import UnifiedIO
+from pixelpioneers.utils import get_output_paths
+
+logger = logging.getLogger(__name__)
+
+# Buffer pool of a worker process, set by _init_worker
+_worker_pool = None
+
+
+def _warm_up() -> None:
+    # Imports every action and format up front, so the first requests do not pay for it
+    for name in UnifiedActions.actions:
+        UnifiedActions.actions[name]
+    for extension in UnifiedIO.io_handlers:
+        UnifiedIO.io_handlers[extension]
+
+
+def _init_worker(profile: str = None) -> None:
+    global _worker_pool
+    _worker_pool = BufferPool()
+    UnifiedIO.set_encoding_profile(profile)
+    _warm_up()
+
+
+def _process_job(action_ob, input_path, output_path, strip_bytes: int = None) -> None:
+    process_image(action_ob, input_path, output_path, _worker_pool, strip_bytes)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    # One thread per connection, the requests of a connection are answered in order
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                assert isinstance(request, dict), "Expected a JSON object"
+            except (ValueError, AssertionError) as e:
+                response = {"error": f"Invalid request: {e}"}
+            else:
+                try:
+                    response = self.server.job_server.handle_request(request)
+                except Exception as e:
+                    # The connection stays open and the client still gets a response
+                    logger.exception(f"Error handling request: {e}")
+                    response = {"id": request.get("id"), "error": f"Internal error: {str(e) or type(e).__name__}"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class JobServer:
+    """
+    Long-running process applying actions to images on request, over a Unix domain socket.
+
+    Requests and responses are JSON objects, one per line. A request gives the source images, the actions and
+    the destination directory, like the command line::
+
+        {"id": 1, "images": ["a.jpeg"], "dest": "out", "actions": [["resize", {"width": 200, "height": 150}]]}
+
+    and is answered once every image is written, with the error of each image, if any::
+
+        {"id": 1, "results": [{"input": "a.jpeg", "output": "out/a_resize.jpeg", "error": null}]}
+
+    ``"outputs"`` may give the destination of every image instead of ``"dest"``. ``{"op": "ping"}`` reports the
+    number of images in progress. The actions are built with :meth:`UnifiedActions.get_pipeline_instance`, an
+    optional ``"precision"`` gives their working precision.
+
+    Every module is imported when the server starts, so the latency of a request is the cost of the work
+    itself. At most ``workers`` images are processed at once, by threads or by worker processes, others wait in
+    a queue of at most ``max_queue`` images. Requests that do not fit in the queue are rejected rather than
+    delayed indefinitely.
+
+    :param socket_path: Path of the Unix domain socket, replaced if it exists.
+    :type socket_path: str
+    :param workers: Number of images processed at once.
+    :type workers: int
+    :param processes: Process the images in worker processes instead of threads.
+    :type processes: bool
+    :param max_queue: Maximum number of images accepted at once, waiting or in progress.
+    :type max_queue: int
+    :param strip_bytes: Optional memory budget of a strip, see :func:`process_image`.
+    :type strip_bytes: int
+    :param profile: Optional encoding profile of the results, see :meth:`UnifiedIO.set_encoding_profile`.
+    :type profile: str
+    """
+
+    def __init__(self, socket_path: str, workers: int = 1, processes: bool = False, max_queue: int = 64,
+                 strip_bytes: int = None, profile: str = None):
+        """
+        Initialize the JobServer instance and start listening.
+
+        :param socket_path: Path of the Unix domain socket, replaced if it exists.
+        :type socket_path: str
+        :param workers: Number of images processed at once.
+        :type workers: int
+        :param processes: Process the images in worker processes instead of threads.
+        :type processes: bool
+        :param max_queue: Maximum number of images accepted at once, waiting or in progress.
+        :type max_queue: int
+        :param strip_bytes: Optional memory budget of a strip, see :func:`process_image`.
+        :type strip_bytes: int
+        :param profile: Optional encoding profile of the results.
+        :type profile: str
+        """
+        UnifiedIO.set_encoding_profile(profile)
+        self.socket_path = socket_path
+        self.max_queue = max_queue
+        self.strip_bytes = strip_bytes
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._pool = BufferPool(max_buffers=workers)
+
+        if processes:
+            self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(profile,))
+            # Starts the workers now rather than on the first request
+            for future in [self._executor.submit(_warm_up) for _ in range(workers)]:
+                future.result()
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+            _warm_up()
+        self._processes = processes
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self._server = _UnixServer(socket_path, _RequestHandler)
+        self._server.job_server = self
+        logger.info(f"Listening on {socket_path} with {workers} {'processes' if processes else 'threads'}")
+
+    def serve_forever(self) -> None:
+        """
+        Answer requests until :meth:`shutdown` is called.
+        """
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        """
+        Stop :meth:`serve_forever`, from another thread.
+        """
+        self._server.shutdown()
+
+    def close(self) -> None:
+        """
+        Release the socket and the workers, images in progress are completed first.
+        """
+        self._server.server_close()
+        self._executor.shutdown()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def handle_request(self, request: dict) -> dict:
+        """
+        Answer a request.
+
+        :param request: The decoded request.
+        :type request: dict
+        :return: The response, with an ``"error"`` if the request was invalid or rejected.
+        :rtype: dict
+        """
+        response = {"id": request.get("id")}
+        if request.get("op", "process") == "ping":
+            response["pending"] = self.pending
+            return response
+
+        try:
+            input_paths, output_paths, action_ob = self._parse(request)
+        except (ActionError, AssertionError, TypeError, ValueError) as e:
+            response["error"] = f"Invalid request: {e}"
+            return response
+
+        with self._lock:
+            if self.pending + len(input_paths) > self.max_queue:
+                response["error"] = f"Server busy: {self.pending} images queued"
+                return response
+            self.pending += len(input_paths)
+
+        futures = []
+        submit_error = None
+        try:
+            for input_path, output_path in zip(input_paths, output_paths):
+                futures.append(self._submit(action_ob, input_path, output_path))
+        except Exception as e:
+            # E.g. a worker process died, the images left are reported as failed
+            logger.error(f"Error submitting image: {e}")
+            submit_error = str(e) or type(e).__name__
+        finally:
+            # Images that were not submitted leave the queue right away
+            with self._lock:
+                self.pending -= len(input_paths) - len(futures)
+
+        response["results"] = []
+        for i, (input_path, output_path) in enumerate(zip(input_paths, output_paths)):
+            if i >= len(futures):
+                response["results"].append({"input": input_path, "output": output_path, "error": submit_error})
+                continue
+            try:
+                futures[i].result()
+                error = None
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            finally:
+                with self._lock:
+                    self.pending -= 1
+            response["results"].append({"input": input_path, "output": output_path, "error": error})
+        return response
+
+    def _submit(self, action_ob, input_path, output_path):
+        if self._processes:
+            return self._executor.submit(_process_job, action_ob, input_path, output_path, self.strip_bytes)
+        return self._executor.submit(process_image, action_ob, input_path, output_path, self._pool,
+                                     self.strip_bytes)
+
+    @staticmethod
+    def _parse(request: dict) -> tuple:
+        input_paths = request.get("images")
+        assert isinstance(input_paths, list) and input_paths, "Expected a list of images"
+        actions = request.get("actions")
+        assert isinstance(actions, list) and actions, "Expected a list of [action, arguments] pairs"
+        for action in actions:
+            assert isinstance(action, list) and 1 <= len(action) <= 2 and isinstance(action[0], str) \
+                and (len(action) == 1 or isinstance(action[1], dict)), \
+                f"Expected an [action] or [action, {{arguments}}] step, Instead got {json.dumps(action)}"
+        actions = [(action[0], dict(action[1]) if len(action) > 1 else {}) for action in actions]
+        action_ob = UnifiedActions.get_pipeline_instance(actions, request.get("precision", "native"))
+
+        if "outputs" in request:
+            output_paths = request["outputs"]
+            assert isinstance(output_paths, list) and len(output_paths) == len(input_paths), \
+                "Expected one output per image"
+        else:
+            assert isinstance(request.get("dest"), str), "Expected a destination directory"
+            action_name = "_".join(action for action, _ in actions)
+            output_paths = [str(path) for path in get_output_paths(input_paths, request["dest"], action_name)]
+        return input_paths, output_paths, action_ob
+
+
+def send_request(socket_path: str, request: dict, timeout: float = None) -> dict:
+    """
+    Send a request to a :class:`JobServer` and wait for its response.
+
+    :param socket_path: Path of the Unix domain socket of the server.
+    :param request: The request, see :class:`JobServer`.
+    :param timeout: Optional timeout in seconds.
+    :return: The response.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(socket_path)
+        with connection.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            return json.loads(stream.readline())
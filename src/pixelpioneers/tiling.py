@@ -0,0 +1,114 @@
+import logging
+
+import numpy as np
+
+from pixelpioneers import instrumentation
+from pixelpioneers.actions._lookup_table import LookupTableAction, compile_lookup_table
+from pixelpioneers.actions.abstract_image_action import AbstractImageAction
+from pixelpioneers.actions.pipeline import Pipeline
+from pixelpioneers.image_io._abstract_io import AbstractStripWriter
+
+logger = logging.getLogger(__name__)
+
+# Default memory budget of a strip, input and output rows included
+DEFAULT_STRIP_BYTES = 256 * 2 ** 20
+
+
+def _row_bytes(shape: tuple, dtype: np.dtype) -> int:
+    return int(np.prod(shape[1:], dtype=np.int64)) * np.dtype(dtype).itemsize
+
+
+def _freeze_statistics(action_ob: AbstractImageAction, source: np.ndarray):
+    """
+    Replaces the steps depending on image statistics by fixed lookup tables.
+
+    Statistics can only be computed from the source image, so this is limited to histogram steps at the start
+    of the pipeline, preceded by pointwise steps only. Runs of pointwise steps are fused on the way.
+
+    :param action_ob: The action to apply.
+    :param source: The uint8 source image, only read to compute its histogram.
+    :return: An equivalent action that can be applied strip by strip, or None if the statistics depend on
+             an intermediate image.
+    """
+    steps = action_ob.steps if isinstance(action_ob, Pipeline) else [action_ob]
+    if not any(step.needs_histogram for step in steps) and not isinstance(action_ob, Pipeline):
+        return action_ob
+    if isinstance(action_ob, Pipeline) and action_ob.precision != "native":
+        # Lookup tables would round the working precision values, the steps are applied as they are
+        return None if any(step.needs_histogram for step in steps) else action_ob
+
+    frozen = []
+    shape, dtype = source.shape, source.dtype
+    for i, stage in enumerate(action_ob._stages() if isinstance(action_ob, Pipeline) else [steps]):
+        needs_histogram = any(step.needs_histogram for step in stage)
+        if needs_histogram and (i > 0 or not stage[0].pointwise):
+            return None
+        if dtype == np.uint8 and stage[0].pointwise and (needs_histogram or len(stage) > 1):
+            # Only the channel count of the stand-in image matters when no histogram is needed
+            image = source if needs_histogram else np.empty((1, 1) + tuple(shape[2:]), dtype=np.uint8)
+            frozen.append(LookupTableAction(compile_lookup_table(stage, image)))
+        else:
+            frozen.extend(stage)
+        shape, dtype = Pipeline._fold_specs(stage, shape, dtype)
+    return frozen[0] if len(frozen) == 1 else Pipeline(frozen)
+
+
+def prepare_tiled(action_ob: AbstractImageAction, source: np.ndarray, strip_bytes: int = DEFAULT_STRIP_BYTES):
+    """
+    Plans the strip by strip application of an action.
+
+    :param action_ob: The action to apply.
+    :param source: The source image, usually memory-mapped.
+    :param strip_bytes: Memory budget of a strip, input and output rows included.
+    :return: ``(action, strips)`` with the action to apply and the ``(start, stop)`` output rows of every
+             strip, or None if the image fits in a single strip or the action has to see the whole image.
+    """
+    output_shape, output_dtype = action_ob.output_spec(source.shape, source.dtype)
+    if output_shape[0] == 0:
+        return None
+
+    # Rows of the source consumed per output row, resizing can read many of them
+    source_rows_per_row = source.shape[0] / output_shape[0]
+    strip_row_bytes = _row_bytes(output_shape, output_dtype) + source_rows_per_row * _row_bytes(source.shape,
+                                                                                              source.dtype)
+    rows_per_strip = max(1, int(strip_bytes // max(strip_row_bytes, 1)))
+    if rows_per_strip >= output_shape[0]:
+        return None
+
+    frozen = _freeze_statistics(action_ob, source)
+    if frozen is None or not frozen.tile_supported(source.shape, source.dtype):
+        logger.info(f"{type(action_ob).__name__} cannot be applied strip by strip, processing the whole image")
+        return None
+
+    strips = [(start, min(start + rows_per_strip, output_shape[0]))
+              for start in range(0, output_shape[0], rows_per_strip)]
+    # Actions computing blocks of rows at once extend the strips to whole blocks, a resize between coprime
+    # heights reads the whole source for every strip
+    source_row_bytes = _row_bytes(source.shape, source.dtype)
+    for start, stop in strips:
+        source_start, source_stop = frozen.source_rows(start, stop, source.shape)
+        if (source_stop - source_start) * source_row_bytes > strip_bytes:
+            logger.info(f"{type(action_ob).__name__} strips exceed the strip budget, processing the whole image")
+            return None
+    return frozen, strips
+
+
+def apply_tiled(action_ob: AbstractImageAction, source: np.ndarray, writer: AbstractStripWriter,
+                strips: list) -> None:
+    """
+    Applies an action strip by strip, only one strip of the source and of the result is in memory at once.
+
+    :param action_ob: The action returned by :func:`prepare_tiled`.
+    :param source: The source image, usually memory-mapped.
+    :param writer: Receives the output rows of every strip.
+    :param strips: The ``(start, stop)`` output rows of every strip, as returned by :func:`prepare_tiled`.
+    """
+    logger.info(f"Applying {type(action_ob).__name__} in {len(strips)} strips")
+    for start, stop in strips:
+        source_start, source_stop = action_ob.source_rows(start, stop, source.shape)
+        with instrumentation.timer("read"):
+            rows = np.ascontiguousarray(source[source_start:source_stop])
+        with instrumentation.timer("compute"):
+            rows = action_ob.apply_rows(rows, start, stop, source.shape)
+        with instrumentation.timer("write"):
+            writer.write_rows(start, rows)
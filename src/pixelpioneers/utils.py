@@ -1,10 +1,85 @@
+import glob
+import os
+import uuid
 from pathlib import Path
 
+# Characters making a source a glob pattern rather than a path
+_GLOB_CHARACTERS = "*?["
+
+
+def get_output_path(input_path, output_dir: str, action: str, relative_dir: str = "") -> Path:
+    input_path = Path(input_path)
+    return Path(output_dir).joinpath(relative_dir, str(input_path.stem) + f"_{action}" + input_path.suffix)
+
 
 def get_output_paths(input_paths: list, output_dir: str, action: str):
-    output_paths = []
-    for input_path in input_paths:
-        input_path = Path(input_path)
-        output_paths.append(Path(output_dir).joinpath(str(input_path.stem) + f"_{action}" + input_path.suffix))
+    return [get_output_path(input_path, output_dir, action) for input_path in input_paths]
+
+
+def temporary_path(path) -> Path:
+    """
+    Names a temporary file to write a file to before renaming it to its path with :func:`os.replace`.
+
+    The temporary file is hidden, unique across threads and processes, and next to the path so that renaming
+    it is atomic: readers either see the previous file or the complete new one, never a partial write.
+
+    :param path: Final path of the file.
+    :return: Path of the temporary file, in the same directory.
+    """
+    path = Path(path)
+    return path.with_name(f".{path.name}.{uuid.uuid4().hex[:12]}.tmp")
+
+
+def iter_images(sources: list, extensions, recursive: bool = False):
+    """
+    Finds the images of a list of files, directories and glob patterns, lazily.
+
+    Directories are walked with :func:`os.scandir` and patterns with :func:`glob.iglob`, images are yielded as
+    they are found so that they can be processed before the walk is over. Only the files of directories and
+    patterns whose extension is supported are yielded, files given explicitly are always yielded.
+
+    :param sources: Paths of image files and directories, and glob patterns.
+    :param extensions: Supported file extensions, e.g. the keys of :attr:`UnifiedIO.io_handlers`.
+    :param recursive: Also walk the subdirectories of directories, and match ``**`` in patterns against any
+                      number of directories.
+    :return: A generator of ``(path, relative_dir)`` tuples. ``relative_dir`` is the directory of the image
+             relative to the directory, or the fixed leading part of the pattern, it was found under when
+             ``recursive`` is set, and ``""`` otherwise.
+    """
+    for source in sources:
+        if os.path.isdir(source):
+            yield from _walk(source, "", extensions, recursive)
+        elif not os.path.exists(source) and _is_pattern(source):
+            root = _pattern_root(source)
+            for path in glob.iglob(source, recursive=recursive):
+                if Path(path).suffix not in extensions or not os.path.isfile(path):
+                    continue
+                relative_dir = os.path.relpath(os.path.dirname(path), root) if recursive else ""
+                yield path, "" if relative_dir == os.curdir else relative_dir
+        else:
+            yield source, ""
+
+
+def _walk(directory: str, relative_dir: str, extensions, recursive: bool):
+    # Depth-first walk holding one directory iterator per level, entries are not sorted to keep memory flat
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                if recursive:
+                    yield from _walk(entry.path, os.path.join(relative_dir, entry.name), extensions, recursive)
+            elif Path(entry.name).suffix in extensions and entry.is_file():
+                yield entry.path, relative_dir
+
+
+def _is_pattern(source: str) -> bool:
+    return any(character in source for character in _GLOB_CHARACTERS)
+
 
-    return output_paths
+def _pattern_root(pattern: str) -> str:
+    # Leading directories of a pattern without any glob character
+    root = []
+    for part in Path(pattern).parts[:-1]:
+        if _is_pattern(part):
+            break
+        root.append(part)
+    return os.path.join(*root) if root else os.curdir
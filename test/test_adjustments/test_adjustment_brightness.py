@@ -16,6 +16,26 @@ class BrightnessAdjustmentTest(unittest.TestCase):
         # Assert
         self.assertTrue(np.array_equal(result, np.full((100, 100), 50, dtype=np.uint8)))
 
+    def test_lookup_table_matches_float_path(self):
+        image = np.random.default_rng(0).integers(0, 256, (20, 30, 3), dtype=np.uint8)
+        for value in (-255, -40, 0, 75, 255):
+            expected = np.clip(image.astype(np.float32) + value, 0, 255).astype(np.uint8)
+            np.testing.assert_array_equal(BrightnessAdjustment(value).apply(image), expected)
+
+    def test_apply_with_output_buffer(self):
+        image = np.random.default_rng(0).integers(0, 256, (20, 30, 3), dtype=np.uint8)
+        expected = BrightnessAdjustment(40).apply(image)
+
+        out = np.empty_like(image)
+        self.assertIs(BrightnessAdjustment(40).apply(image, out=out), out)
+        np.testing.assert_array_equal(out, expected)
+
+        self.assertIs(BrightnessAdjustment(40).apply(image, out=image), image)
+        np.testing.assert_array_equal(image, expected)
+
+        with self.assertRaises(ImageAdjustmentError):
+            BrightnessAdjustment(40).apply(image, out=np.empty((20, 30), dtype=np.uint8))
+
     def test_apply_with_invalid_brightness_value(self):
         # Arrange & Act & Assert
         with self.assertRaises(AssertionError):
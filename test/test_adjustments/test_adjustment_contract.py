@@ -20,6 +20,13 @@ class ContrastAdjustmentTests(unittest.TestCase):
         self.assertEqual(result.shape, image.shape)
         self.assertEqual(result.dtype, np.uint8)
 
+    def test_lookup_table_matches_float_path(self):
+        image = np.random.default_rng(0).integers(0, 256, (20, 30, 3), dtype=np.uint8)
+        mean = np.mean(image, axis=(0, 1), keepdims=True)
+        for factor in (0.0, 0.5, 1.7):
+            expected = np.clip(mean + (image - mean) * factor, 0, 255).astype(np.uint8)
+            np.testing.assert_array_equal(ContrastAdjustment(factor=factor).apply(image), expected)
+
     def test_apply_with_none_image(self):
         # Arrange
         adjustment = ContrastAdjustment(factor=2.0)
@@ -32,12 +39,18 @@ class ContrastAdjustmentTests(unittest.TestCase):
     def test_apply_with_invalid_dimensions(self):
         # Arrange
         adjustment = ContrastAdjustment(factor=2.0)
-        image = np.ones((100, 100, 4), dtype=np.uint8)  # 4-dimensional image
+        image = np.ones((100, 100, 5), dtype=np.uint8)  # 5-channel image
 
         # Act & Assert
         with self.assertRaises(ImageAdjustmentError):
             adjustment.apply(image)
 
+    def test_apply_keeps_alpha(self):
+        image = np.random.default_rng(0).integers(0, 256, (20, 30, 4), dtype=np.uint8)
+        result = ContrastAdjustment(factor=1.7).apply(image)
+        np.testing.assert_array_equal(result[..., 3], image[..., 3])
+        np.testing.assert_array_equal(result[..., :3], ContrastAdjustment(factor=1.7).apply(image[..., :3].copy()))
+
     # Add more test cases as needed
 
 
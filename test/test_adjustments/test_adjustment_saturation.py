@@ -17,7 +17,7 @@ class SaturationAdjustmentTest(unittest.TestCase):
             adjustment.apply(empty_image)
 
         # Test case 2: Image with invalid dimensions
-        invalid_image = np.array([[[100, 50, 200], [150, 75, 100]]], dtype=np.uint8)
+        invalid_image = np.array([[[[100, 50, 200], [150, 75, 100]]]], dtype=np.uint8)
         with self.assertRaises(ImageAdjustmentError):
             adjustment.apply(invalid_image)
 
@@ -26,6 +26,16 @@ class SaturationAdjustmentTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             SaturationAdjustment(factor=invalid_factor)
 
+    def test_apply_to_views(self):
+        image = np.random.default_rng(0).integers(0, 256, (20, 30, 3), dtype=np.uint8)
+        adjustment = SaturationAdjustment(factor=1.3)
+        # Rotations and transpositions are returned as views of the image, in any memory layout
+        for view in (np.rot90(image), image.transpose(1, 0, 2), image[::-1, ::2]):
+            np.testing.assert_array_equal(adjustment.apply(view), adjustment.apply(np.ascontiguousarray(view)))
+        working = image.astype(np.float32) / 255
+        np.testing.assert_array_equal(adjustment.apply(np.rot90(working)),
+                                      adjustment.apply(np.ascontiguousarray(np.rot90(working))))
+
 
 if __name__ == '__main__':
     unittest.main()
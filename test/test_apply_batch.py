@@ -0,0 +1,112 @@
+import unittest
+
+import numpy as np
+
+from pixelpioneers.actions._lookup_table import LookupTableAction
+from pixelpioneers.actions.abstract_image_action import AbstractImageAction
+from pixelpioneers.actions.adjustments import BrightnessAdjustment, ContrastAdjustment, SaturationAdjustment
+from pixelpioneers.actions.pipeline import Pipeline
+from pixelpioneers.actions.transformers import (CropTransformer, FlipTransformer, GrayscaleTransformer,
+                                                InvertTransformer, ResizeTransformer, RotateTransformer)
+from pixelpioneers.exceptions import ActionError, ImageAdjustmentError, ImageTransformationError
+
+
+def _actions():
+    return [
+        BrightnessAdjustment(40),
+        BrightnessAdjustment(-30),
+        ContrastAdjustment(1.5),
+        SaturationAdjustment(1.4),
+        InvertTransformer(),
+        GrayscaleTransformer(),
+        CropTransformer(5, 4, 25, 18),
+        FlipTransformer("horizontal"),
+        FlipTransformer("vertical"),
+        ResizeTransformer(15, 10),
+        RotateTransformer(90),
+        RotateTransformer(30),
+        LookupTableAction(np.arange(256)[::-1]),
+        Pipeline([BrightnessAdjustment(20), InvertTransformer()]),
+        Pipeline([ContrastAdjustment(0.5), BrightnessAdjustment(20), FlipTransformer("vertical"),
+                  CropTransformer(2, 2, 20, 16), GrayscaleTransformer()]),
+    ]
+
+
+class ApplyBatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        # Frames of different brightness, so that per-image statistics differ
+        self.batches = {
+            "rgb": rng.integers(0, 128, (4, 20, 30, 3), dtype=np.uint8) + np.arange(4, dtype=np.uint8)
+            .reshape(-1, 1, 1, 1) * 32,
+            "gray": rng.integers(0, 256, (4, 20, 30), dtype=np.uint8),
+            "rgba": rng.integers(0, 256, (4, 20, 30, 4), dtype=np.uint8),
+            "rgb16": rng.integers(0, 65536, (4, 20, 30, 3), dtype=np.uint16),
+            "rgba16": rng.integers(0, 65536, (4, 20, 30, 4), dtype=np.uint16),
+        }
+
+    def test_matches_apply_on_every_image(self):
+        for layout, images in self.batches.items():
+            for action in _actions():
+                if layout == "gray" and isinstance(action, (ContrastAdjustment, SaturationAdjustment)):
+                    continue
+                if layout.endswith("16") and isinstance(action, LookupTableAction):
+                    continue
+                with self.subTest(layout=layout, action=action):
+                    expected = np.stack([action.apply(image) for image in images])
+                    result = action.apply_batch(images)
+                    np.testing.assert_array_equal(result, expected)
+                    self.assertEqual((result.shape, result.dtype),
+                                     action.batch_output_spec(images.shape, images.dtype))
+
+    def test_alpha_is_kept(self):
+        for layout in ("rgba", "rgba16"):
+            images = self.batches[layout]
+            for action in _actions()[:5]:
+                with self.subTest(layout=layout, action=action):
+                    result = action.apply_batch(images)
+                    self.assertEqual(result.dtype, images.dtype)
+                    np.testing.assert_array_equal(result[..., 3], images[..., 3])
+                    np.testing.assert_array_equal(result[..., :3], action.apply_batch(images[..., :3].copy()))
+
+    def test_output_buffer(self):
+        images = self.batches["rgb"]
+        for action in _actions():
+            with self.subTest(action=action):
+                out = np.empty(*action.batch_output_spec(images.shape, images.dtype))
+                self.assertIs(action.apply_batch(images, out=out), out)
+                np.testing.assert_array_equal(out, np.stack([action.apply(image) for image in images]))
+
+    def test_in_place(self):
+        images = self.batches["rgb"].copy()
+        expected = np.stack([ContrastAdjustment(1.5).apply(image) for image in images])
+        self.assertIs(ContrastAdjustment(1.5).apply_batch(images, out=images), images)
+        np.testing.assert_array_equal(images, expected)
+
+    def test_default_loops_over_images(self):
+        class Double(AbstractImageAction):
+            def apply(self, image, *args, out=None, **kwargs):
+                return np.multiply(image, 2, out=out)
+
+        images = self.batches["gray"]
+        np.testing.assert_array_equal(Double().apply_batch(images), images * 2)
+        with self.assertRaises(ActionError):
+            Double().apply_batch(images[0, 0])
+
+    def test_invalid_batch(self):
+        images = self.batches["rgb"]
+        with self.assertRaises(ImageAdjustmentError):
+            BrightnessAdjustment(10).apply_batch(images[0, 0])
+        with self.assertRaises(ImageAdjustmentError):
+            ContrastAdjustment(1.5).apply_batch(np.concatenate([images, images[..., :2]], axis=-1))
+        with self.assertRaises(ImageTransformationError):
+            InvertTransformer().apply_batch(images, out=np.empty((4, 20, 30), dtype=np.uint8))
+        with self.assertRaises(ImageTransformationError):
+            ResizeTransformer(15, 10).apply_batch(images, out=images)
+        with self.assertRaises(ActionError):
+            Pipeline([InvertTransformer()]).apply_batch(None)
+
+
+if __name__ == '__main__':
+    unittest.main()
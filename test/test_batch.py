@@ -0,0 +1,165 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from pixelpioneers.actions.transformers import InvertTransformer
+from pixelpioneers.batch import run_batch, run_staged, schedule_largest_first
+from pixelpioneers.exceptions import ImageIOError
+from pixelpioneers.main import main
+from pixelpioneers.utils import get_output_paths, iter_images
+
+
+class BatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.input_paths = []
+        for i, size in enumerate([(10, 10), (40, 30), (20, 20)]):
+            path = os.path.join(self.tmp_dir, f"image_{i}.png")
+            Image.fromarray(np.full(size + (3,), i * 50, dtype=np.uint8)).save(path)
+            self.input_paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_schedule_largest_first(self):
+        self.assertEqual(schedule_largest_first(self.input_paths), [1, 2, 0])
+
+    def test_parallel_matches_serial(self):
+        action = InvertTransformer()
+        serial_paths = get_output_paths(self.input_paths, os.path.join(self.tmp_dir, "serial"), "invert")
+        parallel_paths = get_output_paths(self.input_paths, os.path.join(self.tmp_dir, "parallel"), "invert")
+
+        serial = list(run_batch(action, self.input_paths, serial_paths, jobs=1))
+        parallel = list(run_batch(action, self.input_paths, parallel_paths, jobs=2))
+
+        self.assertEqual([r[0] for r in parallel], self.input_paths)
+        self.assertEqual([r[1] for r in parallel], parallel_paths)
+        for (_, serial_path, serial_error), (_, parallel_path, parallel_error) in zip(serial, parallel):
+            self.assertIsNone(serial_error)
+            self.assertIsNone(parallel_error)
+            np.testing.assert_array_equal(np.array(Image.open(serial_path)), np.array(Image.open(parallel_path)))
+
+    def test_parallel_reports_errors(self):
+        input_paths = self.input_paths + [os.path.join(self.tmp_dir, "missing.png")]
+        output_paths = get_output_paths(input_paths, os.path.join(self.tmp_dir, "out"), "invert")
+
+        results = list(run_batch(InvertTransformer(), input_paths, output_paths, jobs=2))
+
+        self.assertEqual([r[2] is None for r in results], [True, True, True, False])
+        self.assertIsInstance(results[-1][2], ImageIOError)
+
+
+    def test_staged_matches_serial(self):
+        action = InvertTransformer()
+        input_paths = self.input_paths
+        serial_paths = get_output_paths(input_paths, os.path.join(self.tmp_dir, "serial"), "invert")
+        staged_paths = get_output_paths(input_paths, os.path.join(self.tmp_dir, "staged"), "invert")
+
+        serial = list(run_batch(action, input_paths, serial_paths))
+        staged = list(run_batch(action, input_paths, staged_paths, io_threads=2, queue_depth=1))
+
+        self.assertEqual([r[:2] for r in staged], list(zip(input_paths, staged_paths)))
+        for (_, serial_path, serial_error), (_, staged_path, staged_error) in zip(serial, staged):
+            self.assertIsNone(serial_error)
+            self.assertIsNone(staged_error)
+            np.testing.assert_array_equal(np.array(Image.open(serial_path)), np.array(Image.open(staged_path)))
+
+    def test_staged_reports_errors(self):
+        input_paths = [self.input_paths[0], os.path.join(self.tmp_dir, "missing.png"), self.input_paths[1]]
+        output_paths = get_output_paths(input_paths, os.path.join(self.tmp_dir, "out"), "invert")
+        output_paths[2] = os.path.join(self.tmp_dir, "out", "image.unsupported")
+
+        results = list(run_staged(InvertTransformer(), input_paths, output_paths, io_threads=1, queue_depth=1))
+
+        self.assertEqual([r[0] for r in results], input_paths)
+        self.assertEqual([r[2] is None for r in results], [True, False, False])
+        self.assertIsInstance(results[1][2], ImageIOError)
+        self.assertIsInstance(results[2][2], ImageIOError)
+
+
+    def test_iterators_are_consumed_lazily(self):
+        action = InvertTransformer()
+        consumed = []
+        sources = self.input_paths * 4
+
+        def input_paths():
+            for path in sources:
+                consumed.append(path)
+                yield path
+
+        for jobs, io_threads in ((1, 0), (1, 2), (2, 0)):
+            consumed.clear()
+            output_paths = [os.path.join(self.tmp_dir, f"out_{jobs}_{io_threads}", f"{i}.png")
+                            for i in range(len(sources))]
+            results = run_batch(action, input_paths(), iter(output_paths), jobs=jobs, io_threads=io_threads,
+                                queue_depth=1)
+            self.assertEqual(next(results)[0], sources[0])
+            self.assertLessEqual(len(consumed), 4)
+            self.assertEqual([r[0] for r in results], sources[1:])
+            for path in output_paths:
+                self.assertTrue(os.path.isfile(path))
+
+    def test_iter_images(self):
+        os.makedirs(os.path.join(self.tmp_dir, "sub", "deeper"))
+        for path in ("sub/a.png", "sub/notes.txt", "sub/deeper/b.png"):
+            open(os.path.join(self.tmp_dir, path), "wb").close()
+        extensions = {".png": None}
+
+        found = sorted(iter_images([self.tmp_dir], extensions))
+        self.assertEqual(found, [(path, "") for path in self.input_paths])
+        found = sorted(iter_images([self.tmp_dir], extensions, recursive=True))
+        self.assertEqual(found, sorted([(path, "") for path in self.input_paths] + [
+            (os.path.join(self.tmp_dir, "sub", "a.png"), "sub"),
+            (os.path.join(self.tmp_dir, "sub", "deeper", "b.png"), os.path.join("sub", "deeper"))]))
+
+        pattern = os.path.join(self.tmp_dir, "**", "*.png")
+        self.assertEqual(sorted(iter_images([pattern], extensions)), [(os.path.join(self.tmp_dir, "sub", "a.png"), "")])
+        self.assertIn((os.path.join(self.tmp_dir, "sub", "deeper", "b.png"), os.path.join("sub", "deeper")),
+                      list(iter_images([pattern], extensions, recursive=True)))
+        self.assertEqual(list(iter_images([os.path.join(self.tmp_dir, "sub", "*.txt")], extensions)), [])
+        # Explicit files are not filtered
+        self.assertEqual(list(iter_images(["missing.txt"], extensions)), [("missing.txt", "")])
+
+    def test_command_line_directory(self):
+        os.makedirs(os.path.join(self.tmp_dir, "sub"))
+        shutil.copy(self.input_paths[0], os.path.join(self.tmp_dir, "sub", "nested.png"))
+        dest = os.path.join(self.tmp_dir, "dest")
+
+        main(["-i", self.tmp_dir, "-dest", dest, "-r", "invert"])
+        self.assertEqual(sorted(os.path.relpath(os.path.join(root, name), dest)
+                                for root, _, names in os.walk(dest) for name in names),
+                         [f"image_{i}_invert.png" for i in range(3)] + [os.path.join("sub", "nested_invert.png")])
+
+        main(["-i", os.path.join(self.tmp_dir, "image_*.png"), "-dest", os.path.join(self.tmp_dir, "glob"), "invert"])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.tmp_dir, "glob"))),
+                         [f"image_{i}_invert.png" for i in range(3)])
+
+
+    def test_command_line_rejects_negative_counts(self):
+        for option in ("--jobs", "--io-threads", "--strip-budget", "--cache-size"):
+            with self.subTest(option=option), mock.patch("sys.stderr"):
+                with self.assertRaises(SystemExit) as cm:
+                    main(["-i", self.input_paths[0], "-dest", self.tmp_dir, option, "-1", "invert"])
+                self.assertEqual(cm.exception.code, 2)
+        with mock.patch("sys.stderr"), self.assertRaises(SystemExit):
+            main(["-i", self.input_paths[0], "-dest", self.tmp_dir, "--io-threads", "2", "--queue-depth", "0",
+                  "invert"])
+
+    def test_queue_depth_must_be_positive(self):
+        output_paths = get_output_paths(self.input_paths, self.tmp_dir, "invert")
+        with self.assertRaises(AssertionError):
+            list(run_staged(InvertTransformer(), self.input_paths, output_paths, queue_depth=0))
+        for jobs, io_threads in ((2, 0), (1, 2)):
+            with self.assertRaises(AssertionError):
+                list(run_batch(InvertTransformer(), iter(self.input_paths), iter(output_paths), jobs=jobs,
+                               io_threads=io_threads, queue_depth=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+
+import numpy as np
+
+from pixelpioneers.actions.unified_actions import UnifiedActions
+from pixelpioneers.bench import compare_results, run_benchmarks, run_encoding_benchmarks, synthetic_image
+from pixelpioneers.image_io.unified_io import UnifiedIO
+from pixelpioneers.main import main
+
+
+class BenchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_synthetic_image(self):
+        image = synthetic_image(0.012, 3)
+        self.assertEqual(image.shape, (95, 126, 3))
+        self.assertEqual(image.dtype, np.uint8)
+        self.assertEqual(synthetic_image(0.012, 1).shape, (95, 126))
+        np.testing.assert_array_equal(image, synthetic_image(0.012, 3))
+
+    def test_every_action_and_format_is_timed(self):
+        report = run_benchmarks(resolutions=[0.01], layouts=["rgb"], repeat=2)
+        names = {result["name"] for result in report["results"]}
+        self.assertEqual(names, {f"action:{name}" for name in UnifiedActions.actions}
+                         | {f"{operation}:{extension}" for extension in UnifiedIO.io_handlers
+                            for operation in ("read", "write")})
+        for result in report["results"]:
+            self.assertEqual(result["runs"], 2)
+            self.assertLessEqual(result["median_ms"], result["p95_ms"])
+            self.assertGreater(result["megapixels_per_s"], 0)
+            self.assertGreaterEqual(result["peak_memory_mb"], 0)
+        json.dumps(report)
+
+    def test_encoding_profiles(self):
+        paths = [os.path.join(self.tmp_dir, "rgb.npy"), os.path.join(self.tmp_dir, "rgba.npy")]
+        UnifiedIO.write(paths[0], synthetic_image(0.01, 3))
+        UnifiedIO.write(paths[1], np.dstack([synthetic_image(0.01, 3), synthetic_image(0.01, 1)]))
+
+        results = run_encoding_benchmarks(paths, repeat=1)
+        # JPEG drops the alpha channel
+        self.assertEqual([(result["image"], result["name"]) for result in results],
+                         [(image, f"encode:{extension}:{profile}") for image in ("rgb.npy", "rgba.npy")
+                          for extension in (".png", ".jpeg") for profile in ("fast", "balanced", "small")])
+        for result in results:
+            self.assertGreater(result["bytes"], 0)
+            if result["name"].endswith(":balanced"):
+                self.assertEqual(result["size_vs_balanced"], 1)
+        self.assertEqual(run_encoding_benchmarks(paths, formats=[".bmp", ".npy"], repeat=1), [])
+
+    def test_compare_results(self):
+        def report(*medians):
+            return {"results": [{"name": name, "megapixels": 3, "layout": "rgb", "median_ms": median}
+                                for name, median in zip(["action:invert", "read:.png", "write:.png"], medians)]}
+
+        regressions = compare_results(report(1.05, 2.5, 1.0), report(1.0, 2.0, 1.0), tolerance=0.1)
+        self.assertEqual([(r["name"], r["change"]) for r in regressions], [("read:.png", 0.25)])
+        self.assertEqual(compare_results(report(1.0), report(1.0, 2.0, 3.0)), [])
+
+    def test_command_exit_status(self):
+        output_path = os.path.join(self.tmp_dir, "report.json")
+        arguments = ["bench", "--resolutions", "0.01", "--layouts", "gray", "--actions", "invert",
+                     "--formats", ".bmp", "--repeat", "1", "-o", output_path]
+        self.assertEqual(main(arguments), 0)
+        with open(output_path) as f:
+            baseline = json.load(f)
+
+        # Every benchmark regresses against an impossibly fast baseline
+        for result in baseline["results"]:
+            result["median_ms"] = 1e-9
+        baseline_path = os.path.join(self.tmp_dir, "baseline.json")
+        with open(baseline_path, "w") as f:
+            json.dump(baseline, f)
+
+        stdout, stderr = StringIO(), StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            status = main(arguments[:-2] + ["--compare", baseline_path])
+        self.assertEqual(status, 1)
+        self.assertEqual(len(json.loads(stdout.getvalue())["regressions"]), 3)
+        self.assertIn("Regression: action:invert", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
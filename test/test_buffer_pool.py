@@ -0,0 +1,40 @@
+import unittest
+
+import numpy as np
+
+from pixelpioneers.buffer_pool import BufferPool
+
+
+class BufferPoolTestCase(unittest.TestCase):
+
+    def test_released_buffer_is_reused(self):
+        pool = BufferPool()
+        buffer = pool.acquire((10, 20, 3), np.uint8)
+        self.assertEqual(buffer.shape, (10, 20, 3))
+        self.assertEqual(buffer.dtype, np.uint8)
+
+        pool.release(buffer)
+        self.assertIs(pool.acquire((10, 20, 3), np.uint8), buffer)
+        self.assertEqual((pool.hits, pool.misses), (1, 1))
+
+    def test_buffers_are_keyed_by_shape_and_type(self):
+        pool = BufferPool()
+        buffer = pool.acquire((10, 20), np.uint8)
+        pool.release(buffer)
+
+        self.assertIsNot(pool.acquire((20, 10), np.uint8), buffer)
+        self.assertIsNot(pool.acquire((10, 20), np.float32), buffer)
+        self.assertIs(pool.acquire((10, 20), np.uint8), buffer)
+
+    def test_idle_buffers_are_capped(self):
+        pool = BufferPool(max_buffers=1)
+        first, second = pool.acquire((4, 4), np.uint8), pool.acquire((4, 4), np.uint8)
+        pool.release(first)
+        pool.release(second)
+
+        self.assertIs(pool.acquire((4, 4), np.uint8), first)
+        self.assertIsNot(pool.acquire((4, 4), np.uint8), second)
+
+
+if __name__ == '__main__':
+    unittest.main()
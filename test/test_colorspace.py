@@ -0,0 +1,58 @@
+import colorsys
+import unittest
+
+import numpy as np
+
+from pixelpioneers.actions.adjustments import SaturationAdjustment
+from pixelpioneers.colorspace import hsv_to_rgb, rgb_to_hsv
+
+
+def colorsys_saturation(image: np.ndarray, factor: float) -> np.ndarray:
+    # Per-pixel reference implementation on top of colorsys
+    result = np.empty_like(image)
+    for index in np.ndindex(image.shape[:2]):
+        h, s, v = colorsys.rgb_to_hsv(*(image[index] / 255))
+        rgb = colorsys.hsv_to_rgb(h, min(max(s * factor, 0), 1), v)
+        result[index] = (np.array(rgb) * 255).astype(np.uint8)
+    return result
+
+
+class ColorspaceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.rgb = rng.random((16, 16, 3), dtype=np.float32)
+        # Grays and values with ties between channels exercise the special cases
+        self.rgb[0, :4] = [[0, 0, 0], [1, 1, 1], [0.5, 0.5, 0.5], [0.2, 0.8, 0.8]]
+
+    def test_rgb_to_hsv_matches_colorsys(self):
+        hsv = rgb_to_hsv(self.rgb)
+        self.assertEqual(hsv.dtype, np.float32)
+        for index in np.ndindex(self.rgb.shape[:2]):
+            np.testing.assert_allclose(hsv[index], colorsys.rgb_to_hsv(*self.rgb[index]), atol=1e-4)
+
+    def test_hsv_to_rgb_matches_colorsys(self):
+        hsv = rgb_to_hsv(self.rgb)
+        rgb = hsv_to_rgb(hsv)
+        for index in np.ndindex(hsv.shape[:2]):
+            np.testing.assert_allclose(rgb[index], colorsys.hsv_to_rgb(*hsv[index]), atol=1e-5)
+        np.testing.assert_allclose(rgb, self.rgb, atol=1e-5)
+
+    def test_in_place_conversion(self):
+        expected = rgb_to_hsv(self.rgb)
+        buffer = self.rgb.copy()
+        self.assertIs(rgb_to_hsv(buffer, out=buffer), buffer)
+        np.testing.assert_array_equal(buffer, expected)
+        self.assertIs(hsv_to_rgb(buffer, out=buffer), buffer)
+        np.testing.assert_allclose(buffer, self.rgb, atol=1e-5)
+
+    def test_saturation_matches_colorsys(self):
+        image = np.random.default_rng(1).integers(0, 256, (24, 24, 3), dtype=np.uint8)
+        for factor in (0.0, 0.5, 1.5, 3.0):
+            expected = colorsys_saturation(image, factor)
+            result = SaturationAdjustment(factor).apply(image)
+            self.assertLessEqual(np.abs(result.astype(int) - expected).max(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
 import os
+import shutil
+import tempfile
 import numpy as np
 from PIL import Image
 from pixelpioneers.exceptions import ImageIOError
@@ -36,6 +38,56 @@ class BMPHandlerTestCase(unittest.TestCase):
     def test_write_image_io_error(self):
         with self.assertRaises(ImageIOError):
             self.bmpHandler.write("/invalid/path/sample_out.bmp", np.array([]))
+    def test_open_maps_uncompressed_image(self):
+        img_array = self.bmpHandler.open(self.sample_image_path)
+        self.assertFalse(img_array.flags.writeable)
+        np.testing.assert_array_equal(img_array, np.array(Image.open(self.sample_image_path)))
+        self.assertTrue(self.bmpHandler.read(self.sample_image_path).flags.writeable)
+
+
+class BMPHandlerFormatsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.bmpHandler = BMPHandler()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "image.bmp")
+        self.rng = np.random.default_rng(0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_formats_match_pil(self):
+        images = {
+            "RGB": self.rng.integers(0, 256, (7, 5, 3), dtype=np.uint8),
+            "L": self.rng.integers(0, 256, (6, 9), dtype=np.uint8),
+            "RGBA": self.rng.integers(0, 256, (5, 3, 4), dtype=np.uint8),
+        }
+        for mode, image in images.items():
+            with self.subTest(mode=mode):
+                Image.fromarray(image).save(self.path)
+                mapped = self.bmpHandler.open(self.path)
+                self.assertFalse(mapped.flags.writeable)
+                np.testing.assert_array_equal(mapped, np.array(Image.open(self.path)))
+
+    def test_palette_image_is_decoded(self):
+        image = Image.fromarray(self.rng.integers(0, 256, (6, 5, 3), dtype=np.uint8)).quantize(8)
+        image.save(self.path)
+        np.testing.assert_array_equal(self.bmpHandler.read(self.path), np.array(Image.open(self.path)))
+
+    def test_write_round_trip(self):
+        for image in [self.rng.integers(0, 256, (7, 5, 3), dtype=np.uint8),
+                      self.rng.integers(0, 256, (6, 9), dtype=np.uint8)]:
+            with self.subTest(shape=image.shape):
+                self.assertTrue(self.bmpHandler.write(self.path, image))
+                np.testing.assert_array_equal(np.array(Image.open(self.path)), image)
+                self.assertFalse(self.bmpHandler.open(self.path).flags.writeable)
+
+    def test_open_writer_streams_rows(self):
+        image = self.rng.integers(0, 256, (10, 7, 3), dtype=np.uint8)
+        with self.bmpHandler.open_writer(self.path, image.shape, image.dtype) as writer:
+            writer.write_rows(0, image[:4])
+            writer.write_rows(4, image[4:])
+        np.testing.assert_array_equal(np.array(Image.open(self.path)), image)
 
 if __name__ == '__main__':
     unittest.main()
@@ -37,5 +37,14 @@ class JPEGHandlerTestCase(unittest.TestCase):
         with self.assertRaises(ImageIOError):
             self.jpegHandler.write("/invalid/path/sample_out.jpeg", np.array([]))
 
+    def test_read_reduced(self):
+        img = np.array(Image.open(self.sample_image_path))
+        height, width = img.shape[:2]
+        reduced = self.jpegHandler.read_reduced(self.sample_image_path, (width // 5, height // 5))
+        # The smallest DCT scale that is still at least the requested size, 1/4
+        self.assertEqual(reduced.shape, ((height + 3) // 4, (width + 3) // 4, 3))
+        full = self.jpegHandler.read_reduced(self.sample_image_path, (width, height))
+        np.testing.assert_array_equal(full, img)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from pixelpioneers.actions.transformers import CropTransformer
+from pixelpioneers.batch import process_image
+from pixelpioneers.exceptions import ImageIOError
+from pixelpioneers.image_io import NPYHandler
+from pixelpioneers.image_io.unified_io import UnifiedIO
+
+
+class NPYHandlerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.npyHandler = NPYHandler()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.image = np.random.default_rng(0).integers(0, 256, (40, 30, 3), dtype=np.uint8)
+        self.sample_image_path = os.path.join(self.tmp_dir, "sample.npy")
+        self.output_image_path = os.path.join(self.tmp_dir, "sample_out.npy")
+        np.save(self.sample_image_path, self.image)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_read_existing_image(self):
+        img_array = self.npyHandler.read(self.sample_image_path)
+        self.assertIsInstance(img_array, np.memmap)
+        self.assertFalse(img_array.flags.writeable)
+        np.testing.assert_array_equal(img_array, self.image)
+
+    def test_read_nonexistent_image(self):
+        with self.assertRaises(ImageIOError):
+            self.npyHandler.read(os.path.join(self.tmp_dir, "nonexistent.npy"))
+
+    def test_read_unrecognized_format(self):
+        with self.assertRaises(ImageIOError):
+            self.npyHandler.read("data/sample.bmp")
+
+    def test_write_image(self):
+        self.assertTrue(self.npyHandler.write(self.output_image_path, self.image))
+        np.testing.assert_array_equal(np.load(self.output_image_path), self.image)
+
+    def test_write_image_io_error(self):
+        with self.assertRaises(ImageIOError):
+            self.npyHandler.write("/invalid/path/sample_out.npy", self.image)
+
+    def test_open_writer(self):
+        with self.npyHandler.open_writer(self.output_image_path, self.image.shape, self.image.dtype) as writer:
+            writer.write_rows(20, self.image[20:])
+            writer.write_rows(0, self.image[:20])
+        np.testing.assert_array_equal(np.load(self.output_image_path), self.image)
+
+    def test_tiled_crop_between_npy_files(self):
+        process_image(CropTransformer(5, 10, 25, 35), self.sample_image_path, self.output_image_path,
+                      strip_bytes=300)
+        np.testing.assert_array_equal(UnifiedIO.read(self.output_image_path), self.image[10:35, 5:25])
+
+
+if __name__ == '__main__':
+    unittest.main()
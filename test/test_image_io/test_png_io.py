@@ -37,5 +37,20 @@ class PNGHandlerTestCase(unittest.TestCase):
         with self.assertRaises(ImageIOError):
             self.pngHandler.write("/invalid/path/sample_out.png", np.array([]))
 
+    def test_16_bit_round_trip(self):
+        rng = np.random.default_rng(0)
+        for shape in ((20, 30), (20, 30, 2), (20, 30, 3), (20, 30, 4)):
+            with self.subTest(shape=shape):
+                img = rng.integers(0, 65536, shape, dtype=np.uint16)
+                self.assertTrue(self.pngHandler.write(self.output_image_path, img, "fast"))
+                with open(self.output_image_path, "rb") as f:
+                    self.assertEqual(f.read(25)[24], 16)
+                result = self.pngHandler.read(self.output_image_path)
+                self.assertEqual(result.dtype, np.uint16)
+                if len(shape) == 3 and shape[-1] == 2:
+                    # Gray and alpha images are written as RGBA
+                    result = result[..., [0, 3]]
+                np.testing.assert_array_equal(result, img)
+
 if __name__ == '__main__':
     unittest.main()
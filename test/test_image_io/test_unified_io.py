@@ -0,0 +1,179 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from pixelpioneers.actions.transformers import InvertTransformer
+from pixelpioneers.exceptions import ImageIOError
+from pixelpioneers.image_io import DecodedImageCache
+from pixelpioneers.image_io.unified_io import UnifiedIO
+
+
+class UnifiedIOTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_read_unsupported_format(self):
+        path = os.path.join(self.tmp_dir, "image.tiff")
+        open(path, "wb").close()
+        with self.assertRaises(ImageIOError):
+            UnifiedIO.read(path)
+
+    def test_single_channel_round_trip(self):
+        image = np.random.default_rng(0).integers(0, 256, (20, 30), dtype=np.uint8)
+        for extension in (".bmp", ".png"):
+            path = os.path.join(self.tmp_dir, "gray" + extension)
+            self.assertTrue(UnifiedIO.write(path, image[..., np.newaxis]))
+            np.testing.assert_array_equal(UnifiedIO.read(path), image)
+
+        path = os.path.join(self.tmp_dir, "gray.jpeg")
+        UnifiedIO.write(path, image)
+        self.assertEqual(UnifiedIO.read(path).shape, (20, 30))
+
+    def test_16_bit_rgba(self):
+        image = np.random.default_rng(0).integers(0, 65536, (20, 30, 4), dtype=np.uint16)
+        path = os.path.join(self.tmp_dir, "deep.png")
+        with UnifiedIO.open_writer(path, image.shape, image.dtype) as writer:
+            writer.write_rows(0, image[:10])
+            writer.write_rows(10, image[10:])
+        np.testing.assert_array_equal(UnifiedIO.read(path), image)
+
+        # Formats without 16 bit samples are written with the nearest 8 bit values
+        path = os.path.join(self.tmp_dir, "deep.bmp")
+        UnifiedIO.write(path, image)
+        np.testing.assert_array_equal(UnifiedIO.read(path), (image[..., :3].astype(np.uint32) + 128) // 257)
+        path = os.path.join(self.tmp_dir, "deep.jpeg")
+        UnifiedIO.write(path, image)
+        self.assertEqual(UnifiedIO.read(path).shape, (20, 30, 3))
+
+
+    def test_read_batch(self):
+        images = np.random.default_rng(0).integers(0, 256, (3, 20, 30, 3), dtype=np.uint8)
+        paths = []
+        for i, image in enumerate(images):
+            paths.append(os.path.join(self.tmp_dir, f"image{i}" + (".npy", ".png", ".bmp")[i]))
+            UnifiedIO.write(paths[-1], image)
+
+        np.testing.assert_array_equal(UnifiedIO.read_batch(paths), images)
+
+        out = np.zeros((3, 20, 30, 3), dtype=np.uint8)
+        self.assertIs(UnifiedIO.read_batch(paths, out=out), out)
+        np.testing.assert_array_equal(out, images)
+
+    def test_read_batch_size_mismatch(self):
+        UnifiedIO.write(os.path.join(self.tmp_dir, "a.npy"), np.zeros((20, 30, 3), dtype=np.uint8))
+        UnifiedIO.write(os.path.join(self.tmp_dir, "b.npy"), np.zeros((30, 20, 3), dtype=np.uint8))
+        with self.assertRaises(ImageIOError):
+            UnifiedIO.read_batch([os.path.join(self.tmp_dir, "a.npy"), os.path.join(self.tmp_dir, "b.npy")])
+        with self.assertRaises(ImageIOError):
+            UnifiedIO.read_batch([os.path.join(self.tmp_dir, "a.npy")], out=np.empty((2, 20, 30, 3), np.uint8))
+
+    def test_encoding_profiles(self):
+        gradient = np.add.outer(np.arange(240), np.arange(320)) // 3
+        noise = np.random.default_rng(0).integers(0, 32, (240, 320, 3))
+        image = (gradient[..., np.newaxis] + noise).astype(np.uint8)
+        for extension in (".png", ".jpeg"):
+            sizes = {}
+            for profile in ("fast", "balanced", "small"):
+                path = os.path.join(self.tmp_dir, profile + extension)
+                self.assertTrue(UnifiedIO.write(path, image, profile))
+                sizes[profile] = os.path.getsize(path)
+                if extension == ".png":
+                    np.testing.assert_array_equal(UnifiedIO.read(path), image)
+            self.assertLessEqual(sizes["small"], sizes["balanced"])
+            self.assertLessEqual(sizes["balanced"], sizes["fast"])
+
+    def test_default_encoding_profile(self):
+        image = np.random.default_rng(0).integers(0, 256, (60, 80, 3), dtype=np.uint8)
+        UnifiedIO.write(os.path.join(self.tmp_dir, "fast.png"), image, "fast")
+        try:
+            UnifiedIO.set_encoding_profile("fast")
+            UnifiedIO.write(os.path.join(self.tmp_dir, "default.png"), image)
+        finally:
+            UnifiedIO.set_encoding_profile(None)
+        with open(os.path.join(self.tmp_dir, "fast.png"), "rb") as f, \
+                open(os.path.join(self.tmp_dir, "default.png"), "rb") as g:
+            self.assertEqual(f.read(), g.read())
+
+        with self.assertRaises(ImageIOError):
+            UnifiedIO.set_encoding_profile("tiny")
+        for extension in (".png", ".bmp", ".npy"):
+            with self.assertRaises(ImageIOError):
+                UnifiedIO.write(os.path.join(self.tmp_dir, "image" + extension), image, "tiny")
+
+class DecodedImageCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.image = np.random.default_rng(0).integers(0, 256, (20, 30, 3), dtype=np.uint8)
+        self.path = os.path.join(self.tmp_dir, "image.png")
+        UnifiedIO.write(self.path, self.image)
+        UnifiedIO.enable_cache(10 * self.image.nbytes)
+
+    def tearDown(self):
+        UnifiedIO.disable_cache()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_hit_is_not_decoded(self):
+        image = UnifiedIO.read(self.path)
+        with mock.patch.object(UnifiedIO.io_handlers[".png"], "read", side_effect=AssertionError("decoded")):
+            # Every read gets its own read-only view of the cached image
+            self.assertTrue(np.shares_memory(UnifiedIO.read(self.path), image))
+        np.testing.assert_array_equal(image, self.image)
+        self.assertEqual(UnifiedIO.cache_stats()["hits"], 1)
+        self.assertEqual(UnifiedIO.cache_stats()["misses"], 1)
+
+    def test_cached_images_are_read_only(self):
+        image = UnifiedIO.read(self.path)
+        self.assertFalse(image.flags.writeable)
+        with self.assertRaises(ValueError):
+            image[0, 0] = 0
+        # The flag cannot be set back to corrupt the cached image
+        with self.assertRaises(ValueError):
+            image.flags.writeable = True
+
+        # Actions fall back to a new output instead of working in place
+        np.testing.assert_array_equal(InvertTransformer().apply(image), 255 - self.image)
+        np.testing.assert_array_equal(UnifiedIO.read(self.path), self.image)
+
+    def test_modified_file_is_decoded_again(self):
+        UnifiedIO.read(self.path)
+        os.utime(self.path, ns=(0, 0))
+        UnifiedIO.read(self.path)
+        self.assertEqual(UnifiedIO.cache_stats()["misses"], 2)
+
+    def test_size_cap(self):
+        cache = DecodedImageCache(2 * self.image.nbytes)
+        for i in range(3):
+            cache.put(("image", i), self.image.copy())
+        self.assertIsNone(cache.get(("image", 0)))
+        self.assertIsNotNone(cache.get(("image", 2)))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["nbytes"], 2 * self.image.nbytes)
+
+        # The most recently used entries are kept
+        cache.get(("image", 1))
+        cache.put(("image", 3), self.image.copy())
+        self.assertIsNotNone(cache.get(("image", 1)))
+        self.assertIsNone(cache.get(("image", 2)))
+
+        # Images too large to be cached stay writeable
+        large = cache.put(("large", 0), np.zeros(3 * self.image.nbytes, np.uint8))
+        self.assertIsNone(cache.get(("large", 0)))
+        self.assertTrue(large.flags.writeable)
+
+    def test_disabled_by_default(self):
+        UnifiedIO.disable_cache()
+        self.assertIsNone(UnifiedIO.cache_stats())
+        self.assertTrue(UnifiedIO.read(self.path).flags.writeable)
+
+
+if __name__ == '__main__':
+    unittest.main()
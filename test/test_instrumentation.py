@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import numpy as np
+from PIL import Image
+
+from pixelpioneers import instrumentation
+from pixelpioneers.actions.adjustments import BrightnessAdjustment
+from pixelpioneers.actions.pipeline import Pipeline
+from pixelpioneers.actions.transformers import InvertTransformer, ResizeTransformer
+from pixelpioneers.batch import run_batch
+from pixelpioneers.main import main
+from pixelpioneers.utils import get_output_paths
+
+
+class InstrumentationTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        instrumentation.disable()
+
+    def test_disabled(self):
+        self.assertIsNone(instrumentation.get_stats())
+        with instrumentation.timer("read"):
+            pass
+        instrumentation.count("images")
+        self.assertIsNone(instrumentation.get_stats())
+
+    def test_timers_and_counters(self):
+        stats = instrumentation.enable()
+        for _ in range(3):
+            with instrumentation.timer("read", "total"):
+                pass
+        instrumentation.record("write", 0.015)
+        instrumentation.count("bytes_read", 100)
+        instrumentation.count("bytes_read", 20)
+
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["counters"], {"bytes_read": 120})
+        self.assertEqual(snapshot["timers"]["read"]["count"], 3)
+        self.assertEqual(snapshot["timers"]["total"]["count"], 3)
+        # 15 ms falls in the (10, 20] ms bucket
+        self.assertEqual(snapshot["timers"]["write"]["histogram"][4], 1)
+        self.assertEqual(sum(snapshot["timers"]["write"]["histogram"]), 1)
+
+    def test_snapshot_and_merge(self):
+        worker = instrumentation.Stats()
+        worker.record("read", 0.002)
+        worker.count("images", 2)
+        snapshot = worker.snapshot(reset=True)
+        self.assertEqual(worker.snapshot(), {"timers": {}, "counters": {}})
+
+        stats = instrumentation.Stats()
+        stats.record("read", 0.5)
+        stats.merge(snapshot)
+        stats.merge(snapshot)
+        self.assertEqual(stats.counters["images"], 4)
+        self.assertEqual(stats.timers["read"]["count"], 3)
+        self.assertEqual(stats.timers["read"]["max_s"], 0.5)
+        self.assertAlmostEqual(stats.timers["read"]["total_s"], 0.504)
+
+    def test_hooks(self):
+        events = []
+        instrumentation.add_hook(lambda *event: events.append(event))
+        try:
+            instrumentation.count("images")
+            instrumentation.enable()
+            instrumentation.count("images", 2)
+            instrumentation.record("read", 0.1)
+        finally:
+            instrumentation._hooks.clear()
+        self.assertEqual(events, [("counter", "images", 2), ("timer", "read", 0.1)])
+
+
+class BatchInstrumentationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.input_paths = []
+        for i in range(3):
+            path = os.path.join(self.tmp_dir, f"image_{i}.png")
+            Image.fromarray(np.full((20, 30, 3), i * 50, dtype=np.uint8)).save(path)
+            self.input_paths.append(path)
+        self.input_paths.append(os.path.join(self.tmp_dir, "missing.png"))
+
+    def tearDown(self):
+        instrumentation.disable()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_run_batch(self):
+        action_ob = Pipeline([ResizeTransformer(15, 10), InvertTransformer(), BrightnessAdjustment(10)])
+        for jobs, io_threads in [(1, 0), (1, 2), (2, 0)]:
+            with self.subTest(jobs=jobs, io_threads=io_threads):
+                stats = instrumentation.enable()
+                output_paths = get_output_paths(self.input_paths, os.path.join(self.tmp_dir, "out"), "pipeline")
+                list(run_batch(action_ob, self.input_paths, output_paths, jobs=jobs, io_threads=io_threads))
+
+                counters, timers = stats.counters, stats.timers
+                self.assertEqual(counters["images"], 4)
+                self.assertEqual(counters["errors"], 1)
+                self.assertEqual(counters["pixels"], 3 * 20 * 30)
+                self.assertEqual(counters["bytes_read"], sum(os.path.getsize(p) for p in self.input_paths[:3]))
+                self.assertEqual(counters["bytes_written"], sum(os.path.getsize(p) for p in output_paths[:3]))
+                for name in ["read", "compute", "write", "action:ResizeTransformer",
+                             "action:InvertTransformer+BrightnessAdjustment"]:
+                    self.assertEqual(timers[name]["count"], 3, name)
+                # Failed images are timed too
+                self.assertEqual(timers["image"]["count"], 4)
+
+    def test_stats_options(self):
+        stats_path = os.path.join(self.tmp_dir, "stats.json")
+        stdout = StringIO()
+        with redirect_stdout(stdout):
+            main(["-i"] + self.input_paths[:3] + ["-dest", os.path.join(self.tmp_dir, "out"), "--stats",
+                                                  "--stats-json", stats_path, "invert"])
+        self.assertIn("Processed 3 images (0 errors)", stdout.getvalue())
+        self.assertIn("Image latency:", stdout.getvalue())
+        with open(stats_path) as f:
+            summary = json.load(f)
+        self.assertEqual(summary["counters"]["images"], 3)
+        self.assertGreater(summary["images_per_s"], 0)
+        self.assertEqual(summary["timers"]["action:InvertTransformer"]["count"], 3)
+        self.assertIsNone(instrumentation.get_stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
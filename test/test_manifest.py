@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from pixelpioneers.actions.adjustments import BrightnessAdjustment
+from pixelpioneers.actions.transformers import InvertTransformer
+from pixelpioneers.exceptions import ImageIOError
+from pixelpioneers.image_io.unified_io import UnifiedIO
+from pixelpioneers.main import main
+from pixelpioneers.manifest import MANIFEST_NAME, Manifest
+
+
+class ManifestTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dest = os.path.join(self.tmp_dir, "dest")
+        self.input_paths = []
+        for i in range(3):
+            path = os.path.join(self.tmp_dir, f"image_{i}.png")
+            Image.fromarray(np.full((20, 30, 3), i * 50, dtype=np.uint8)).save(path)
+            self.input_paths.append(path)
+        self.output_paths = [os.path.join(self.dest, f"image_{i}_invert.png") for i in range(3)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def run_incremental(self, action="invert"):
+        with mock.patch("builtins.print") as print_mock:
+            main(["-i", self.tmp_dir, "-dest", self.dest, "--incremental", action])
+        return int(print_mock.call_args_list[0].args[0].split()[1])
+
+    def test_rerun_skips_up_to_date_images(self):
+        self.assertEqual(self.run_incremental(), 0)
+        self.assertTrue(all(os.path.exists(path) for path in self.output_paths))
+        self.assertEqual(self.run_incremental(), 3)
+
+        # Modified inputs, and deleted or modified outputs, are done again
+        Image.fromarray(np.zeros((20, 30, 3), dtype=np.uint8)).save(self.input_paths[0])
+        os.unlink(self.output_paths[1])
+        with open(self.output_paths[2], "ab") as f:
+            f.write(b"\0")
+        self.assertEqual(self.run_incremental(), 0)
+        np.testing.assert_array_equal(np.array(Image.open(self.output_paths[0])), 255)
+        self.assertEqual(self.run_incremental(), 3)
+
+    def test_other_action_is_done_again(self):
+        self.run_incremental()
+        manifest = Manifest(self.dest, InvertTransformer())
+        self.assertTrue(manifest.is_up_to_date(self.input_paths[0], self.output_paths[0]))
+        manifest.close()
+        with Manifest(self.dest, BrightnessAdjustment(10)) as manifest:
+            self.assertFalse(manifest.is_up_to_date(self.input_paths[0], self.output_paths[0]))
+
+    def test_cut_line_is_ignored(self):
+        self.run_incremental()
+        manifest_path = os.path.join(self.dest, MANIFEST_NAME)
+        with open(manifest_path, "rb") as f:
+            content = f.read()
+        # An interrupted run leaves the last line incomplete
+        with open(manifest_path, "wb") as f:
+            f.write(content[:-20])
+
+        with Manifest(self.dest, InvertTransformer()) as manifest:
+            self.assertEqual(len(manifest.entries), 2)
+            self.assertEqual(list(manifest.pending(zip(self.input_paths, self.output_paths))),
+                             [(self.input_paths[2], self.output_paths[2])])
+            manifest.record(self.input_paths[2], self.output_paths[2])
+        with Manifest(self.dest, InvertTransformer()) as manifest:
+            self.assertEqual(len(manifest.entries), 3)
+
+    def test_write_is_atomic(self):
+        path = os.path.join(self.tmp_dir, "atomic.png")
+        UnifiedIO.write(path, np.zeros((4, 4), dtype=np.uint8))
+        handler = UnifiedIO.io_handlers[".png"]
+        with mock.patch.object(handler, "write", side_effect=ImageIOError("disk full")):
+            with self.assertRaises(ImageIOError):
+                UnifiedIO.write(path, np.ones((4, 4), dtype=np.uint8))
+        # The previous image is kept and no temporary file is left behind
+        self.assertEqual(os.listdir(os.path.dirname(path)).count("atomic.png"), 1)
+        self.assertFalse([name for name in os.listdir(self.tmp_dir) if name.endswith(".tmp")])
+        np.testing.assert_array_equal(UnifiedIO.read(path), 0)
+
+        with self.assertRaises(RuntimeError):
+            with UnifiedIO.open_writer(os.path.join(self.tmp_dir, "strips.npy"), (4, 4), np.uint8) as writer:
+                writer.write_rows(0, np.zeros((2, 4), dtype=np.uint8))
+                raise RuntimeError("interrupted")
+        self.assertFalse([name for name in os.listdir(self.tmp_dir) if "strips" in name])
+
+
+if __name__ == '__main__':
+    unittest.main()
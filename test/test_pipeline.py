@@ -0,0 +1,181 @@
+import unittest
+
+import numpy as np
+
+from pixelpioneers.actions._lookup_table import compile_lookup_table
+from pixelpioneers.actions.adjustments import BrightnessAdjustment, ContrastAdjustment, SaturationAdjustment
+from pixelpioneers.actions.pipeline import Pipeline
+from pixelpioneers.actions.transformers import (CropTransformer, FlipTransformer, GrayscaleTransformer,
+                                                InvertTransformer, ResizeTransformer, RotateTransformer)
+from pixelpioneers.actions.unified_actions import UnifiedActions
+from pixelpioneers.exceptions import ActionError
+from pixelpioneers.precision import quantize, to_working
+
+
+class PipelineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.image = np.random.default_rng(0).integers(0, 256, (40, 60, 3), dtype=np.uint8)
+
+    def test_apply_matches_sequential_actions(self):
+        steps = [ResizeTransformer(30, 20), GrayscaleTransformer(), BrightnessAdjustment(20)]
+        expected = self.image
+        for step in steps:
+            expected = step.apply(expected)
+
+        result = Pipeline(steps).apply(self.image)
+
+        np.testing.assert_array_equal(result, expected)
+        self.assertEqual(result.shape, (20, 30))
+
+    def test_pointwise_steps_are_fused(self):
+        steps = [BrightnessAdjustment(40), ContrastAdjustment(1.5), InvertTransformer(), BrightnessAdjustment(-10)]
+        expected = self.image
+        for step in steps:
+            expected = step.apply(expected)
+
+        pipeline = Pipeline(steps + [ResizeTransformer(30, 20), InvertTransformer()])
+        self.assertEqual([len(stage) for stage in pipeline._stages()], [4, 1, 1])
+
+        table = compile_lookup_table(steps, self.image)
+        self.assertEqual(table.shape, (3, 256))
+        fused = table[np.arange(3), self.image]
+        # The fused contrast uses channel means derived from the histogram instead of np.mean
+        self.assertLessEqual(np.abs(fused.astype(int) - expected).max(), 1)
+
+        result = pipeline.apply(self.image)
+        np.testing.assert_array_equal(result, InvertTransformer().apply(ResizeTransformer(30, 20).apply(fused)))
+
+    def test_geometric_steps_are_fused(self):
+        exact_chains = [
+            [CropTransformer(5, 3, 50, 33), FlipTransformer("horizontal"), RotateTransformer(90)],
+            [RotateTransformer(270), CropTransformer(2, 4, 30, 50), RotateTransformer(180)],
+            [CropTransformer(10, 0, 50, 40), FlipTransformer("vertical"), ResizeTransformer(20, 20)],
+            [CropTransformer(10, 0, 50, 40), RotateTransformer(90), ResizeTransformer(20, 10)],
+            [ResizeTransformer(30, 20), CropTransformer(3, 3, 20, 15)],
+        ]
+        for steps in exact_chains:
+            with self.subTest(steps=[type(step).__name__ for step in steps]):
+                pipeline = Pipeline(steps)
+                self.assertEqual([len(stage) for stage in pipeline._stages()], [len(steps)])
+                expected = self.image
+                for step in steps:
+                    expected = step.apply(expected)
+                np.testing.assert_array_equal(pipeline.apply(self.image), expected)
+
+        # Flips, quarter turns and crops stay views of the input
+        pipeline = Pipeline(exact_chains[0])
+        self.assertTrue(np.shares_memory(pipeline.apply(self.image), self.image))
+
+    def test_geometric_steps_resample_once(self):
+        y, x = np.mgrid[0:120, 0:160]
+        image = np.dstack([x, y, x + y]).astype(np.uint8)
+        steps = [CropTransformer(20, 10, 140, 110), RotateTransformer(7), ResizeTransformer(60, 50)]
+        expected = image
+        for step in steps:
+            expected = step.apply(expected)
+
+        result = Pipeline(steps).apply(image)
+
+        self.assertEqual(result.shape, expected.shape)
+        # Pixels cropped away by the first step stay outside the result, the rotated corners are black
+        self.assertEqual(result[0, 0].tolist(), [0, 0, 0])
+        self.assertLessEqual(np.abs(result[5:-5, 5:-5].astype(int) - expected[5:-5, 5:-5]).mean(), 1)
+
+    def test_free_rotations_keep_their_canvas(self):
+        # The canvas of the first rotation clips the corners of the image, the second one must not bring them back
+        for steps in ([RotateTransformer(33), RotateTransformer(-33)], [RotateTransformer(45), RotateTransformer(45)],
+                      [RotateTransformer(20), FlipTransformer("horizontal"), RotateTransformer(-20)]):
+            with self.subTest(steps=[type(step).__name__ for step in steps]):
+                expected = self.image
+                for step in steps:
+                    expected = step.apply(expected)
+                pipeline = Pipeline(steps)
+                np.testing.assert_array_equal(pipeline.apply(self.image), expected)
+                np.testing.assert_array_equal(pipeline.apply_batch(self.image[None])[0], expected)
+                self.assertEqual(expected[0, 0].tolist(), [0, 0, 0])
+
+    def test_size_hint(self):
+        self.assertEqual(Pipeline([BrightnessAdjustment(10), ResizeTransformer(30, 20), CropTransformer(0, 0, 5, 5)])
+                         .size_hint(), (30, 20))
+        self.assertIsNone(Pipeline([CropTransformer(0, 0, 5, 5), ResizeTransformer(30, 20)]).size_hint())
+        self.assertIsNone(Pipeline([BrightnessAdjustment(10), InvertTransformer()]).size_hint())
+
+    def test_apply_with_output_buffer(self):
+        steps = [BrightnessAdjustment(40), ContrastAdjustment(1.5), InvertTransformer()]
+        expected = Pipeline(steps).apply(self.image)
+
+        in_place = self.image.copy()
+        pipeline = Pipeline(steps + [BrightnessAdjustment(0)])
+        self.assertTrue(pipeline.supports_inplace)
+        self.assertIs(pipeline.apply(in_place, out=in_place), in_place)
+        np.testing.assert_array_equal(in_place, expected)
+
+        pipeline = Pipeline([ResizeTransformer(30, 20), GrayscaleTransformer(), InvertTransformer()])
+        self.assertFalse(pipeline.supports_inplace)
+        self.assertEqual(pipeline.output_spec(self.image.shape, self.image.dtype), ((20, 30), np.uint8))
+        out = np.empty((20, 30), dtype=np.uint8)
+        self.assertIs(pipeline.apply(self.image, out=out), out)
+        np.testing.assert_array_equal(out, Pipeline(pipeline.steps).apply(self.image))
+
+        with self.assertRaises(ActionError):
+            pipeline.apply(self.image, out=self.image)
+
+    def test_float32_precision(self):
+        # Rounding after the first step loses half of the levels, the float32 pipeline gets them back
+        steps = [ContrastAdjustment(0.5), ContrastAdjustment(2.0)]
+        native = Pipeline(steps).apply(self.image)
+        result = Pipeline(steps, precision="float32").apply(self.image)
+
+        self.assertEqual(result.dtype, np.float32)
+        self.assertEqual(Pipeline(steps, precision="float32").output_spec(self.image.shape, np.uint8),
+                         (self.image.shape, np.dtype(np.float32)))
+        self.assertLessEqual(np.abs(quantize(result).astype(int) - self.image).max(), 1)
+        self.assertGreater(np.abs(native.astype(int) - self.image).max(), 1)
+
+    def test_float32_precision_matches_native(self):
+        steps = [ResizeTransformer(30, 20), SaturationAdjustment(1.3), BrightnessAdjustment(-20), InvertTransformer(),
+                 RotateTransformer(90), GrayscaleTransformer()]
+        pipeline = Pipeline(steps, precision="float32")
+        result = pipeline.apply(self.image)
+
+        self.assertEqual(result.shape, (30, 20))
+        self.assertLessEqual(np.abs(quantize(result).astype(int) - Pipeline(steps).apply(self.image)).max(), 2)
+        # Working precision input is not converted again
+        np.testing.assert_array_equal(pipeline.apply(to_working(self.image)), result)
+        np.testing.assert_array_equal(pipeline.apply_batch(np.stack([self.image] * 2))[1], result)
+
+        with self.assertRaises(ActionError):
+            Pipeline(steps, precision="float16")
+
+    def test_apply_with_none_image(self):
+        with self.assertRaises(ActionError):
+            Pipeline([InvertTransformer()]).apply(None)
+
+    def test_empty_pipeline(self):
+        with self.assertRaises(ActionError):
+            Pipeline([])
+
+    def test_invalid_step(self):
+        with self.assertRaises(ActionError):
+            Pipeline([InvertTransformer(), "grayscale"])
+
+    def test_get_pipeline_instance(self):
+        pipeline = UnifiedActions.get_pipeline_instance([("resize", {"width": 30, "height": 20}),
+                                                         ("invert", {})])
+        self.assertIsInstance(pipeline, Pipeline)
+        self.assertEqual([type(step) for step in pipeline.steps], [ResizeTransformer, InvertTransformer])
+
+        single = UnifiedActions.get_pipeline_instance([("invert", {})])
+        self.assertIsInstance(single, InvertTransformer)
+
+        with self.assertRaises(ActionError):
+            UnifiedActions.get_pipeline_instance([("invert", {}), ("unknown", {})])
+
+        single = UnifiedActions.get_pipeline_instance([("invert", {})], precision="float32")
+        self.assertIsInstance(single, Pipeline)
+        self.assertEqual(single.precision, "float32")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from pixelpioneers.actions.adjustments import BrightnessAdjustment
+from pixelpioneers.actions.pipeline import Pipeline
+from pixelpioneers.actions.transformers import InvertTransformer, ResizeTransformer
+from pixelpioneers.batch import run_batch
+from pixelpioneers.image_io.unified_io import UnifiedIO
+from pixelpioneers.result_cache import ResultCache
+from pixelpioneers.utils import get_output_paths
+
+
+class ResultCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+        rng = np.random.default_rng(0)
+        self.input_paths = []
+        for i in range(3):
+            path = os.path.join(self.tmp_dir, f"image_{i}.png")
+            Image.fromarray(rng.integers(0, 256, (30, 40, 3), dtype=np.uint8)).save(path)
+            self.input_paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def run_cached(self, cache, action_ob, directory="out", jobs=1, io_threads=0):
+        output_paths = get_output_paths(self.input_paths, os.path.join(self.tmp_dir, directory), "action")
+        results = list(run_batch(action_ob, self.input_paths, output_paths, jobs=jobs, io_threads=io_threads,
+                                 cache=cache))
+        for _, _, error in results:
+            self.assertIsNone(error)
+        return output_paths
+
+    def test_key(self):
+        cache = ResultCache(self.cache_dir, 2 ** 20)
+        input_path = self.input_paths[0]
+        key = cache.key(input_path, BrightnessAdjustment(20), "out.png")
+
+        self.assertEqual(key, cache.key(input_path, BrightnessAdjustment(20), "other/out.png"))
+        self.assertNotEqual(key, cache.key(input_path, BrightnessAdjustment(30), "out.png"))
+        self.assertNotEqual(key, cache.key(input_path, InvertTransformer(), "out.png"))
+        self.assertNotEqual(key, cache.key(input_path, BrightnessAdjustment(20), "out.bmp"))
+        self.assertNotEqual(key, cache.key(self.input_paths[1], BrightnessAdjustment(20), "out.png"))
+        self.assertNotEqual(cache.key(input_path, ResizeTransformer(20, 10), "out.png"),
+                            cache.key(input_path, ResizeTransformer(10, 20), "out.png"))
+        self.assertNotEqual(cache.key(input_path, Pipeline([InvertTransformer(), BrightnessAdjustment(20)]), "a.png"),
+                            cache.key(input_path, Pipeline([BrightnessAdjustment(20), InvertTransformer()]), "a.png"))
+
+        with mock.patch.object(UnifiedIO, "encoding_profile", "balanced"):
+            self.assertEqual(key, cache.key(input_path, BrightnessAdjustment(20), "out.png"))
+        with mock.patch.object(UnifiedIO, "encoding_profile", "small"):
+            self.assertNotEqual(key, cache.key(input_path, BrightnessAdjustment(20), "out.png"))
+
+    def test_hit_is_not_decoded(self):
+        action_ob = Pipeline([ResizeTransformer(20, 15), InvertTransformer()])
+        cache = ResultCache(self.cache_dir, 2 ** 20)
+        expected_paths = self.run_cached(cache, action_ob, "first")
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+        for jobs, io_threads in [(1, 0), (1, 2), (2, 0)]:
+            with self.subTest(jobs=jobs, io_threads=io_threads):
+                cache = ResultCache(self.cache_dir, 2 ** 20)
+                with mock.patch("pixelpioneers.batch.UnifiedIO.read", side_effect=AssertionError("decoded")):
+                    output_paths = self.run_cached(cache, action_ob, f"again_{jobs}_{io_threads}", jobs, io_threads)
+                if jobs == 1:
+                    self.assertEqual((cache.hits, cache.misses), (3, 0))
+                for expected_path, output_path in zip(expected_paths, output_paths):
+                    with open(expected_path, "rb") as expected, open(output_path, "rb") as output:
+                        self.assertEqual(expected.read(), output.read())
+
+    def test_parallel_counters(self):
+        action_ob = InvertTransformer()
+        self.run_cached(ResultCache(self.cache_dir, 2 ** 20), action_ob, "first")
+
+        cache = ResultCache(self.cache_dir, 2 ** 20)
+        self.run_cached(cache, action_ob, "again", jobs=2)
+        self.assertEqual((cache.hits, cache.misses), (3, 0))
+
+    def test_lru_eviction(self):
+        action_ob = InvertTransformer()
+        entry_size = os.path.getsize(self.run_cached(ResultCache(self.cache_dir, 2 ** 20), action_ob)[0])
+        shutil.rmtree(self.cache_dir)
+
+        # Room for two of the three results
+        cache = ResultCache(self.cache_dir, entry_size * 2 + entry_size // 2)
+        self.run_cached(cache, action_ob)
+        self.assertEqual(cache.evictions, 1)
+
+        # The first result was the least recently used one
+        cache = ResultCache(self.cache_dir, entry_size * 2 + entry_size // 2)
+        self.run_cached(cache, action_ob)
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        self.assertEqual(cache.evictions, 3)
+
+    def test_lru_eviction_with_workers(self):
+        action_ob = InvertTransformer()
+        entry_size = os.path.getsize(self.run_cached(ResultCache(self.cache_dir, 2 ** 20), action_ob)[0])
+        shutil.rmtree(self.cache_dir)
+
+        # The process that opened the cache evicts the results stored by the workers
+        cache = ResultCache(self.cache_dir, entry_size * 2 + entry_size // 2)
+        self.run_cached(cache, action_ob, jobs=2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(len(list(Path(self.cache_dir).glob("*/*"))), 2)
+
+    def test_directory_is_scanned_once(self):
+        action_ob = InvertTransformer()
+        self.run_cached(ResultCache(self.cache_dir, 2 ** 20), action_ob)
+        cache = ResultCache(self.cache_dir, 2 ** 20)
+        with mock.patch.object(Path, "glob", side_effect=AssertionError("scanned")):
+            self.run_cached(cache, action_ob)
+            self.run_cached(cache, BrightnessAdjustment(10))
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+
+    def test_hardlink(self):
+        action_ob = InvertTransformer()
+        cache = ResultCache(self.cache_dir, 2 ** 20, hardlink=True)
+        self.run_cached(cache, action_ob)
+        output_paths = self.run_cached(cache, action_ob)
+        self.assertEqual(cache.hits, 3)
+        self.assertEqual(os.stat(output_paths[0]).st_nlink, 2)
+
+        # Hits leave the modification time of the shared file alone, so the outputs stay up to date
+        mtime = os.stat(output_paths[0]).st_mtime_ns
+        self.run_cached(cache, action_ob)
+        self.assertEqual(os.stat(output_paths[0]).st_mtime_ns, mtime)
+
+        # A miss replaces the linked output instead of overwriting the cached result
+        entry = cache._entry(cache.key(self.input_paths[0], action_ob, output_paths[0]), output_paths[0])
+        with open(entry, "rb") as f:
+            cached = f.read()
+        self.run_cached(cache, BrightnessAdjustment(10))
+        with open(entry, "rb") as f:
+            self.assertEqual(f.read(), cached)
+
+
+if __name__ == '__main__':
+    unittest.main()
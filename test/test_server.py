@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from pixelpioneers.cli_parser import serve_parser
+from pixelpioneers.server import JobServer, send_request
+
+
+class JobServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tmp_dir, "server.sock")
+        self.image = np.random.default_rng(0).integers(0, 256, (20, 30, 3), dtype=np.uint8)
+        self.input_paths = []
+        for i in range(3):
+            path = os.path.join(self.tmp_dir, f"image_{i}.png")
+            Image.fromarray(self.image).save(path)
+            self.input_paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def start(self, **kwargs):
+        server = JobServer(self.socket_path, **kwargs)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            thread.join()
+
+        self.addCleanup(stop)
+        return server
+
+    def request(self, **request):
+        return send_request(self.socket_path, request, timeout=30)
+
+    def assert_processed(self, response):
+        self.assertNotIn("error", response)
+        self.assertEqual([result["input"] for result in response["results"]], self.input_paths)
+        for result in response["results"]:
+            self.assertIsNone(result["error"])
+            with Image.open(result["output"]) as img:
+                np.testing.assert_array_equal(np.asarray(img), 255 - self.image[::-1])
+
+    def test_process(self):
+        self.start(workers=2)
+        response = self.request(id=7, images=self.input_paths, dest=os.path.join(self.tmp_dir, "out"),
+                                actions=[["flip", {"mode": "vertical"}], ["invert"]])
+        self.assertEqual(response["id"], 7)
+        self.assert_processed(response)
+        self.assertEqual(os.path.basename(response["results"][0]["output"]), "image_0_flip_invert.png")
+
+    def test_worker_processes(self):
+        self.start(workers=2, processes=True)
+        output_paths = [os.path.join(self.tmp_dir, "out", f"{i}.png") for i in range(3)]
+        response = self.request(images=self.input_paths, outputs=output_paths,
+                                actions=[["flip", {"mode": "vertical"}], ["invert", {}]])
+        self.assert_processed(response)
+        self.assertEqual([result["output"] for result in response["results"]], output_paths)
+
+    def test_errors(self):
+        self.start()
+        dest = os.path.join(self.tmp_dir, "out")
+
+        response = self.request(images=self.input_paths, dest=dest, actions=[["sharpen"]])
+        self.assertIn("Unsupported Action", response["error"])
+        response = self.request(images=self.input_paths, actions=[["invert"]])
+        self.assertIn("Invalid request", response["error"])
+        response = self.request(images=self.input_paths, dest=dest, actions=[["brightness", {"level": 3}]])
+        self.assertIn("Invalid request", response["error"])
+        for actions in ([[]], ["invert"], [[{"mode": "vertical"}]], [["flip", "vertical"]], [["invert", {}, {}]]):
+            response = self.request(images=self.input_paths, dest=dest, actions=actions)
+            self.assertIn("Invalid request", response["error"])
+
+        # A missing image fails on its own
+        missing_path = os.path.join(self.tmp_dir, "missing.png")
+        response = self.request(images=[missing_path] + self.input_paths, dest=dest, actions=[["invert"]])
+        self.assertIsNotNone(response["results"][0]["error"])
+        self.assertEqual([result["error"] for result in response["results"][1:]], [None] * 3)
+
+    def test_queue_limit(self):
+        self.start(max_queue=2)
+        response = self.request(id="big", images=self.input_paths, dest=self.tmp_dir, actions=[["invert"]])
+        self.assertEqual(response["id"], "big")
+        self.assertIn("Server busy", response["error"])
+        self.assertEqual(self.request(op="ping"), {"id": None, "pending": 0})
+
+    def test_submit_error(self):
+        server = self.start(max_queue=3)
+        # Images that cannot be submitted fail and leave the queue, later requests are still accepted
+        with mock.patch.object(server, "_submit", side_effect=RuntimeError("shut down")):
+            for _ in range(2):
+                response = self.request(images=self.input_paths, dest=self.tmp_dir, actions=[["invert"]])
+                self.assertEqual([result["error"] for result in response["results"]], ["shut down"] * 3)
+        self.assertEqual(self.request(op="ping"), {"id": None, "pending": 0})
+
+    def test_command_line_rejects_empty_pools(self):
+        socket_path = os.path.join(self.tmp_dir, "cli.sock")
+        for options in (["-w", "0"], ["--max-queue", "0"], ["-w", "-2"]):
+            with self.assertRaises(SystemExit), mock.patch("sys.stderr"):
+                serve_parser.parse_args(["--socket", socket_path] + options)
+
+
+if __name__ == '__main__':
+    unittest.main()
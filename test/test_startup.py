@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from pixelpioneers.actions.unified_actions import UnifiedActions
+from pixelpioneers.image_io.unified_io import UnifiedIO
+from pixelpioneers.registry import LazyRegistry
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+
+
+def loaded_modules(code: str) -> set:
+    # Runs code in a fresh interpreter and returns the heavy modules it imported
+    script = code + "\nimport sys\nprint(*(m for m in ('numpy', 'cv2', 'PIL') if m in sys.modules), file=sys.stderr)"
+    env = dict(os.environ, PYTHONPATH=SOURCE_DIR)
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+    return set(result.stderr.split())
+
+
+class LazyRegistryTestCase(unittest.TestCase):
+
+    def test_lookup(self):
+        registry = LazyRegistry({"join": "os.path:join", "getcwd": os.getcwd})
+        self.assertEqual(list(registry), ["join", "getcwd"])
+        self.assertIn("join", registry)
+        self.assertIs(registry["join"], os.path.join)
+        self.assertIs(registry["getcwd"], os.getcwd)
+        with self.assertRaises(KeyError):
+            registry["missing"]
+
+    def test_instantiate(self):
+        registry = LazyRegistry({"list": "builtins:list"}, instantiate=True)
+        self.assertEqual(registry["list"], [])
+        self.assertIs(registry["list"], registry["list"])
+
+    def test_registered_actions_and_formats(self):
+        for name in UnifiedActions.actions:
+            self.assertTrue(callable(UnifiedActions.actions[name]), name)
+        for extension in UnifiedIO.io_handlers:
+            self.assertTrue(hasattr(UnifiedIO.io_handlers[extension], "read"), extension)
+
+
+class StartupTestCase(unittest.TestCase):
+
+    def test_help_does_not_import_heavy_modules(self):
+        self.assertEqual(loaded_modules("from pixelpioneers.main import main\n"
+                                        "try:\n    main(['--help'])\nexcept SystemExit:\n    pass"), set())
+
+    def test_only_needed_modules_are_imported(self):
+        self.assertEqual(loaded_modules("from pixelpioneers.actions.unified_actions import UnifiedActions\n"
+                                        "UnifiedActions.get_pipeline_instance([('invert', {}), ('flip', "
+                                        "{'mode': 'vertical'})])\n"
+                                        "from pixelpioneers.image_io.unified_io import UnifiedIO\n"
+                                        "UnifiedIO.io_handlers['.npy']"), {"numpy"})
+
+
+if __name__ == '__main__':
+    unittest.main()
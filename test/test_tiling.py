@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from pixelpioneers.actions.adjustments import BrightnessAdjustment, ContrastAdjustment, SaturationAdjustment
+from pixelpioneers.actions.pipeline import Pipeline
+from pixelpioneers.actions.transformers import (CropTransformer, FlipTransformer, GrayscaleTransformer,
+                                                InvertTransformer, ResizeTransformer, RotateTransformer)
+from pixelpioneers.batch import process_image
+from pixelpioneers.image_io._abstract_io import BufferedStripWriter
+from pixelpioneers.precision import quantize
+from pixelpioneers.tiling import apply_tiled, prepare_tiled
+
+
+class _MemoryWriter:
+    def write(self, path, image, profile=None):
+        self.image = image
+        return True
+
+
+class TilingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.image = np.random.default_rng(0).integers(0, 256, (120, 90, 3), dtype=np.uint8)
+        # A few rows per strip
+        self.strip_bytes = 4 * 90 * 3 * 2
+
+    def apply_tiled(self, action_ob):
+        plan = prepare_tiled(action_ob, self.image, self.strip_bytes)
+        self.assertIsNotNone(plan)
+        tiled_action, strips = plan
+        self.assertGreater(len(strips), 1)
+
+        memory_writer = _MemoryWriter()
+        with BufferedStripWriter(memory_writer, None, *tiled_action.output_spec(self.image.shape,
+                                                                                self.image.dtype)) as writer:
+            apply_tiled(tiled_action, self.image, writer, strips)
+        return memory_writer.image
+
+    def assert_tiled_matches_whole_image(self, action_ob):
+        np.testing.assert_array_equal(self.apply_tiled(action_ob), action_ob.apply(self.image))
+
+    def test_pointwise_actions(self):
+        for action_ob in [BrightnessAdjustment(30), InvertTransformer(), GrayscaleTransformer(),
+                          SaturationAdjustment(1.5)]:
+            with self.subTest(action=type(action_ob).__name__):
+                self.assert_tiled_matches_whole_image(action_ob)
+
+    def test_contrast_is_frozen_from_the_histogram(self):
+        self.assert_tiled_matches_whole_image(ContrastAdjustment(1.8))
+        self.assert_tiled_matches_whole_image(Pipeline([BrightnessAdjustment(-20), ContrastAdjustment(0.5),
+                                                        FlipTransformer("vertical")]))
+
+    def test_geometric_actions(self):
+        for action_ob in [CropTransformer(10, 15, 80, 110), FlipTransformer("vertical"),
+                          FlipTransformer("horizontal"), RotateTransformer(180), ResizeTransformer(60, 80),
+                          ResizeTransformer(45, 48)]:
+            with self.subTest(action=type(action_ob).__name__):
+                self.assert_tiled_matches_whole_image(action_ob)
+
+    def test_pipeline(self):
+        self.assert_tiled_matches_whole_image(Pipeline([CropTransformer(5, 10, 85, 110), FlipTransformer("vertical"),
+                                                        ResizeTransformer(40, 50), GrayscaleTransformer(),
+                                                        BrightnessAdjustment(10), InvertTransformer()]))
+
+    def test_fallback(self):
+        # Heights 120 and 49 are coprime, every strip of the resize would read the whole image
+        for action_ob in [RotateTransformer(30), RotateTransformer(90), ResizeTransformer(180, 240),
+                          ResizeTransformer(45, 49), Pipeline([ResizeTransformer(45, 60), ContrastAdjustment(1.5)])]:
+            with self.subTest(action=type(action_ob).__name__):
+                self.assertIsNone(prepare_tiled(action_ob, self.image, self.strip_bytes))
+
+        # Images fitting in a single strip are processed as a whole
+        self.assertIsNone(prepare_tiled(InvertTransformer(), self.image, self.image.nbytes * 2))
+
+    def test_process_image_with_strip_budget(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            input_path = os.path.join(tmp_dir, "image.png")
+            output_path = os.path.join(tmp_dir, "out", "image.png")
+            Image.fromarray(self.image).save(input_path)
+
+            action_ob = Pipeline([FlipTransformer("vertical"), InvertTransformer()])
+            process_image(action_ob, input_path, output_path, strip_bytes=self.strip_bytes)
+
+            with Image.open(output_path) as img:
+                np.testing.assert_array_equal(np.asarray(img), action_ob.apply(self.image))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_process_image_with_channel_axis(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            # Gray images saved as .npy may keep a channel axis of length 1
+            image = self.image[..., :1].copy()
+            input_path = os.path.join(tmp_dir, "image.npy")
+            np.save(input_path, image)
+
+            for action_ob in [ResizeTransformer(45, 48), RotateTransformer(30),
+                              Pipeline([CropTransformer(5, 10, 85, 110), ResizeTransformer(40, 50)])]:
+                self.assertEqual(action_ob.apply(image).shape, action_ob.output_spec(image.shape, image.dtype)[0])
+                for strip_bytes in (None, self.strip_bytes // 3):
+                    with self.subTest(action=type(action_ob).__name__, strip_bytes=strip_bytes):
+                        output_path = os.path.join(tmp_dir, "out", f"image_{strip_bytes}.npy")
+                        process_image(action_ob, input_path, output_path, strip_bytes=strip_bytes)
+                        np.testing.assert_array_equal(np.load(output_path), action_ob.apply(image)[..., 0])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_process_image_in_float32_precision(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            input_path = os.path.join(tmp_dir, "image.png")
+            Image.fromarray(self.image).save(input_path)
+
+            action_ob = Pipeline([FlipTransformer("vertical"), SaturationAdjustment(1.5), InvertTransformer()],
+                                 precision="float32")
+            self.assertIsNone(prepare_tiled(Pipeline([ContrastAdjustment(1.5)], precision="float32"), self.image,
+                                            self.strip_bytes))
+            # Rows are quantized as they are written, like whole images
+            for strip_bytes in (None, self.strip_bytes * 4):
+                output_path = os.path.join(tmp_dir, "out", f"image_{strip_bytes}.png")
+                process_image(action_ob, input_path, output_path, strip_bytes=strip_bytes)
+                with Image.open(output_path) as img:
+                    np.testing.assert_array_equal(np.asarray(img), quantize(action_ob.apply(self.image)))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,6 +19,16 @@ class CropTransformerTestCase(unittest.TestCase):
         expected_result = np.array([[1, 2], [4, 5]])
         np.testing.assert_array_equal(transformed_image, expected_result)
 
+    def test_apply_with_output_buffer(self):
+        image = np.arange(20).reshape(4, 5)
+        crop_transformer = CropTransformer(1, 1, 3, 10)
+        self.assertEqual(crop_transformer.output_spec(image.shape, image.dtype), ((3, 2), image.dtype))
+        self.assertTrue(np.shares_memory(crop_transformer.apply(image), image))
+
+        out = np.empty((3, 2), dtype=image.dtype)
+        self.assertIs(crop_transformer.apply(image, out=out), out)
+        np.testing.assert_array_equal(out, image[1:, 1:3])
+
     def test_apply_with_invalid_image(self):
         # Create an invalid image (None)
         image = None
@@ -20,6 +20,23 @@ class FlipTransformerTests(unittest.TestCase):
         expected_image = cv2.flip(self.image, 0)
         np.testing.assert_array_equal(transformed_image, expected_image)
 
+    def test_flip_is_a_view(self):
+        image = np.arange(60, dtype=np.uint8).reshape(4, 5, 3)
+        for mode, flip_code in [("horizontal", 1), ("vertical", 0)]:
+            self.transformer.mode = mode
+            transformed_image = self.transformer.apply(image)
+            self.assertTrue(np.shares_memory(transformed_image, image))
+            np.testing.assert_array_equal(transformed_image, cv2.flip(image, flip_code))
+
+            out = np.empty_like(image)
+            self.assertIs(self.transformer.apply(image, out=out), out)
+            np.testing.assert_array_equal(out, cv2.flip(image, flip_code))
+
+    def test_flip_in_place_is_rejected(self):
+        image = np.arange(60, dtype=np.uint8).reshape(4, 5, 3)
+        with self.assertRaises(ImageTransformationError):
+            self.transformer.apply(image, out=image)
+
     def test_none_image(self):
         with self.assertRaises(ImageTransformationError):
             self.transformer.apply(None)
@@ -1,25 +1,77 @@
 import unittest
 import numpy as np
 from pixelpioneers.exceptions import ImageTransformationError
-from pixelpioneers.actions.transformers import GrayscaleTransformer
+from pixelpioneers.actions.adjustments import BrightnessAdjustment, ContrastAdjustment, SaturationAdjustment
+from pixelpioneers.actions.transformers import GrayscaleTransformer, InvertTransformer
+from pixelpioneers.precision import quantize, to_working
 
 class GrayscaleTransformerTestCase(unittest.TestCase):
     def setUp(self):
         self.transformer = GrayscaleTransformer()
 
-    # def test_apply_with_valid_input(self):
-    #     # Arrange
-    #     image = np.array([[[255, 0, 0], [0, 255, 0], [0, 0, 255]],
-    #                       [[127, 127, 127], [255, 255, 255], [0, 0, 0]]], dtype=np.uint8)
-    #
-    #     expected_output = np.array([[76, 150, 29],
-    #                                 [127, 255, 0]], dtype=np.uint8)
-    #
-    #     # Act
-    #     result = self.transformer.apply(image)
-    #
-    #     # Assert
-    #     self.assertTrue(np.array_equal(result, expected_output))
+    def test_apply_with_valid_input(self):
+        # Arrange
+        image = np.array([[[255, 0, 0], [0, 255, 0], [0, 0, 255]],
+                          [[127, 127, 127], [255, 255, 255], [0, 0, 0]]], dtype=np.uint8)
+
+        expected_output = np.array([[76, 150, 29],
+                                    [127, 255, 0]], dtype=np.uint8)
+
+        # Act
+        result = self.transformer.apply(image)
+
+        # Assert
+        self.assertTrue(np.array_equal(result, expected_output))
+
+    def test_fixed_point_matches_float_luma(self):
+        image = np.random.default_rng(0).integers(0, 256, (50, 40, 4), dtype=np.uint8)
+        expected = np.dot(image[..., :3], [0.2989, 0.5870, 0.1140])
+
+        result = self.transformer.apply(image)
+
+        # The alpha channel of RGBA images is kept
+        self.assertEqual(result.shape, (50, 40, 2))
+        self.assertEqual(result.dtype, np.uint8)
+        self.assertLessEqual(np.abs(result[..., 0] - expected).max(), 0.51)
+        np.testing.assert_array_equal(result[..., 1], image[..., 3])
+
+    def test_uint16_luma(self):
+        image = np.random.default_rng(0).integers(0, 65536, (50, 40, 3), dtype=np.uint16)
+        expected = np.dot(image, [0.2989, 0.5870, 0.1140])
+
+        result = self.transformer.apply(image)
+
+        self.assertEqual(result.dtype, np.uint16)
+        self.assertLessEqual(np.abs(result - expected).max(), 0.51)
+
+    def test_single_channel_stays_single_channel(self):
+        image = self.transformer.apply(np.random.default_rng(0).integers(0, 256, (20, 30, 3), dtype=np.uint8))
+
+        result = self.transformer.apply(image)
+        self.assertIsNot(result, image)
+        np.testing.assert_array_equal(result, image)
+        for action in (InvertTransformer(), ContrastAdjustment(1.5), SaturationAdjustment(1.5),
+                       BrightnessAdjustment(10)):
+            self.assertEqual(action.apply(image).shape, (20, 30))
+
+    def test_single_channel_axis(self):
+        # Gray images saved as .npy may keep a channel axis of length 1
+        image = np.random.default_rng(0).integers(0, 256, (20, 30, 1), dtype=np.uint8)
+
+        result = self.transformer.apply(image)
+        np.testing.assert_array_equal(result, image)
+        self.assertEqual(self.transformer.output_spec(image.shape, image.dtype), (result.shape, result.dtype))
+        np.testing.assert_array_equal(self.transformer.apply_batch(np.stack([image, image])), np.stack([image, image]))
+
+    def test_float32_precision_matches_native(self):
+        image = np.random.default_rng(0).integers(0, 256, (200, 300, 3), dtype=np.uint8)
+        native = self.transformer.apply(image)
+
+        working = quantize(self.transformer.apply(to_working(image)))
+        # Both round, with the same weights, only exact ties may round the other way
+        self.assertLessEqual(np.abs(working.astype(int) - native).max(), 1)
+        self.assertLessEqual(np.count_nonzero(working != native), native.size // 10000)
+        np.testing.assert_array_equal(self.transformer.apply(image.astype(np.int16)), native)
 
     def test_apply_with_none_image(self):
         # Arrange
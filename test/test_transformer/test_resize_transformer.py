@@ -20,6 +20,17 @@ class ResizeTransformerTests(unittest.TestCase):
         # Assert the transformed image has the correct shape
         self.assertEqual(transformed_image.shape, (50, 50, 3))
 
+    def test_resize_transformer_apply_with_output_buffer(self):
+        transformer = ResizeTransformer(50, 40)
+        self.assertEqual(transformer.output_spec(self.test_image.shape, np.uint8), ((40, 50, 3), np.uint8))
+
+        out = np.full((40, 50, 3), 255, dtype=np.uint8)
+        self.assertIs(transformer.apply(self.test_image, out=out), out)
+        np.testing.assert_array_equal(out, 0)
+
+        with self.assertRaises(ImageTransformationError):
+            transformer.apply(self.test_image, out=np.empty((50, 40, 3), dtype=np.uint8))
+
     def test_resize_transformer_apply_with_none_image(self):
         # Create an instance of ResizeTransformer
         transformer = ResizeTransformer(50, 50)
@@ -23,6 +23,21 @@ class RotateTransformerTest(unittest.TestCase):
         self.assertIsNotNone(rotated_image)
         self.assertEqual(rotated_image.shape, image.shape)
 
+    def test_quarter_turns_are_exact_views(self):
+        image = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+        for angle, k in [(0, 0), (90, 1), (180, 2), (270, 3), (-90, 3), (450, 1)]:
+            transformer = RotateTransformer(angle)
+            rotated_image = transformer.apply(image)
+            self.assertTrue(np.shares_memory(rotated_image, image))
+            np.testing.assert_array_equal(rotated_image, np.rot90(image, k))
+            self.assertEqual(transformer.output_spec(image.shape, image.dtype), (rotated_image.shape, image.dtype))
+            self.assertFalse(transformer.needs_output_buffer)
+
+        out = np.empty((6, 4, 3), dtype=np.uint8)
+        self.assertIs(RotateTransformer(90).apply(image, out=out), out)
+        np.testing.assert_array_equal(out, np.rot90(image))
+        self.assertTrue(self.transformer.needs_output_buffer)
+
     def test_apply_with_none_image(self):
         # Assert that applying transformation with None image raises an ImageTransformationError
         with self.assertRaises(ImageTransformationError):